@@ -0,0 +1,78 @@
+"""
+基准：批量不规则特征提取 vs 逐条循环
+Benchmark: batched ragged feature extraction vs the per-trace loop
+
+把内置 CSV 轨迹（加少量抖动）复制到所需条数，测量两种实现的耗时；逐条循环
+只测到 ``--loop_max`` 条，更大的规模按其单条耗时外推。
+The bundled CSV trajectories (with a little jitter) are replicated up to each
+size and both implementations are timed; the loop is only run up to
+``--loop_max`` trajectories and extrapolated from its per-trace cost beyond.
+
+Usage:
+    python benchmarks/bench_features.py [--sizes 300 3000 30000 300000 1000000] [--K 30]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(parent_dir, "src"))
+
+from humanmouse.models.features import extract_features
+from humanmouse.models.trajectory_model import HumanMouseModel
+from humanmouse.models.traces import TraceSet, load_traces
+
+
+def replicate(traces, M, seed=0):
+    """复制到 M 条并加亚像素抖动 / Replicate to M trajectories with sub-pixel jitter"""
+    rng = np.random.default_rng(seed)
+    pick = np.arange(M) % len(traces)
+    xy_list = [traces[i][0] + rng.uniform(-0.5, 0.5, traces[i][0].shape).astype("float32") for i in pick]
+    return TraceSet.from_lists(xy_list, [traces[i][1] for i in pick])
+
+
+def loop_features(traces, K):
+    """原逐条实现 / The original per-trace loop"""
+    shapes, globals_ = [], []
+    for xy, dts in zip(*traces.split()):
+        xy_n, *_ = HumanMouseModel._affine_normalise(xy)
+        shapes.append(HumanMouseModel._resample_by_arclength(xy_n, K)[:, 1])
+        globals_.append(HumanMouseModel._global_features(xy, dts))
+    return np.stack(shapes), np.stack(globals_)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[300, 3000, 30000, 300000, 1000000],
+                        help="Numbers of trajectories")
+    parser.add_argument("--K", type=int, default=30, help="Arc-length resampling points")
+    parser.add_argument("--loop_max", type=int, default=30000, help="Largest size the loop is actually run at")
+    args = parser.parse_args()
+
+    base, _ = load_traces(os.path.join(parent_dir, "csv_data"))
+    print(f"{'M':>9} {'loop (s)':>10} {'batched (s)':>12} {'speedup':>8} {'batched us/trace':>17}")
+    per_trace = None
+    for M in args.sizes:
+        traces = replicate(base, M)
+        t0 = time.perf_counter()
+        shapes, globals_ = extract_features(traces, args.K)
+        batched = time.perf_counter() - t0
+
+        if M <= args.loop_max:
+            t0 = time.perf_counter()
+            ref_shapes, ref_globals = loop_features(traces, args.K)
+            loop = time.perf_counter() - t0
+            per_trace = loop / M
+            assert np.array_equal(shapes, ref_shapes) and np.array_equal(globals_, ref_globals)
+            loop_s = f"{loop:10.2f}"
+        else:
+            loop = per_trace * M
+            loop_s = f"~{loop:9.0f}"
+        print(f"{M:>9} {loop_s} {batched:12.3f} {loop / batched:7.0f}x {batched / M * 1e6:17.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+基准：融合形状算子 vs 逐次构建 CubicSpline
+Benchmark: fused shape operator vs building a CubicSpline on every call
+
+Usage:
+    python benchmarks/bench_shape_operator.py [--N 100] [--repeat 2000]
+"""
+import argparse
+import os
+import sys
+import timeit
+import warnings
+
+import numpy as np
+from scipy import interpolate
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(parent_dir, "src"))
+
+from humanmouse.models import get_default_model_path
+from humanmouse.models.trajectory_model import HumanMouseModel
+
+
+def spline_shape(model, coeff, N):
+    """原实现的第 2‑3 步 / Steps 2-3 as originally implemented"""
+    xs_k = model._min_jerk_position(np.linspace(0, 1, model.K, dtype="float32"))
+    shape = np.stack([xs_k, coeff @ model.pca.components_ + model.pca.mean_], axis=1)
+    spl = interpolate.CubicSpline(shape[:, 0], shape[:, 1])
+    xs_N = model._min_jerk_position(np.linspace(0, 1, N, dtype="float32"))
+    return np.stack([xs_N, spl(xs_N).astype("float32")], axis=1)
+
+
+def fused_shape(model, coeff, N):
+    """融合算子实现 / Fused operator implementation"""
+    return model._normalized_shapes(coeff[None, :], N)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--N", type=int, default=100, help="Number of trajectory points")
+    parser.add_argument("--repeat", type=int, default=2000, help="Calls per measurement")
+    args = parser.parse_args()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        model = HumanMouseModel.load(get_default_model_path())
+    coeff = model.gmm_shape.means_[0].astype("float32")
+
+    ref, new = spline_shape(model, coeff, args.N), fused_shape(model, coeff, args.N)
+    print(f"max |fused - spline| = {np.abs(ref - new).max():.3e}")
+
+    for name, fn in [("CubicSpline per call", spline_shape), ("fused operator", fused_shape)]:
+        best = min(timeit.repeat(lambda: fn(model, coeff, args.N), number=args.repeat, repeat=5))
+        print(f"{name:>22}: {best / args.repeat * 1e6:8.1f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+基准：外存流式训练 vs 批量训练
+Benchmark: out-of-core streaming training vs batch training
+
+把内置 CSV 轨迹（加少量抖动）复制成所需条数的数据集，分别用 ``fit`` 与
+``fit_streaming`` 训练，比较耗时、Python 堆峰值（tracemalloc）以及在全部数据上
+的平均对数似然（形状 GMM 在各自 PCA 系数上、全局 GMM 在全局特征上）。
+The bundled CSV trajectories (with a little jitter) are replicated into a
+dataset of each size and trained with ``fit`` and ``fit_streaming``; the
+benchmark compares wall time, peak Python heap (tracemalloc) and the mean
+log-likelihood over all data (the shape GMM on each model's own PCA
+coefficients, the global GMM on the global features).
+
+Usage:
+    python benchmarks/bench_streaming.py [--sizes 10000 100000] [--chunk_size 16384]
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(parent_dir, "src"))
+
+from humanmouse.models.dataset import build_dataset, load_dataset
+from humanmouse.models.features import extract_features
+from humanmouse.models.trajectory_model import HumanMouseModel
+from humanmouse.models.traces import load_traces
+
+
+def write_corpus(base, M, csv_dir, seed=0):
+    """复制到 M 条带亚像素抖动的 CSV / Write M jittered copies of the bundled traces as CSVs"""
+    rng = np.random.default_rng(seed)
+    os.makedirs(csv_dir, exist_ok=True)
+    for i in range(M):
+        xy, dt = base[i % len(base)]
+        xy = xy + rng.uniform(-0.5, 0.5, xy.shape)
+        rows = "\n".join(f"{x:.2f},{y:.2f},{t:.4f}" for (x, y), t in zip(xy, dt))
+        with open(os.path.join(csv_dir, f"t{i:07d}.csv"), "w") as f:
+            f.write("x_coordinate,y_coordinate,time_interval_seconds\n" + rows + "\n")
+
+
+def measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    seconds = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000], help="Numbers of trajectories")
+    parser.add_argument("--chunk_size", type=int, default=16384, help="Streaming chunk size")
+    parser.add_argument("--batch_size", type=int, default=4096, help="Online-EM mini-batch size")
+    parser.add_argument("--n_epochs", type=int, default=5, help="Online-EM epochs")
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+
+    base, _ = load_traces(os.path.join(parent_dir, "csv_data"))
+    print(f"{'M':>8} {'mode':>9} {'time (s)':>9} {'peak heap':>10} {'shape LL':>9} {'global LL':>10}")
+    for M in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            write_corpus(base, M, os.path.join(tmp, "csv"))
+            build_dataset(os.path.join(tmp, "csv"), os.path.join(tmp, "ds"))
+            dataset = os.path.join(tmp, "ds")
+            shapes, globals_ = extract_features(load_dataset(dataset)[0], 30)
+
+            runs = [("batch", lambda m: m.fit(dataset)),
+                    ("streaming", lambda m: m.fit_streaming(dataset, chunk_size=args.chunk_size,
+                                                            batch_size=args.batch_size,
+                                                            n_epochs=args.n_epochs))]
+            for name, train in runs:
+                model = HumanMouseModel()
+                seconds, peak = measure(lambda: train(model))
+                shape_ll = model.gmm_shape.score(model.pca.transform(shapes))
+                global_ll = model.gmm_global.score(globals_)
+                print(f"{M:>8} {name:>9} {seconds:9.2f} {peak / 2**20:8.1f}MB {shape_ll:9.3f} {global_ll:10.3f}")
+
+
+if __name__ == "__main__":
+    main()
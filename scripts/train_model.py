@@ -4,8 +4,10 @@ import sys
 # Add parent directory to path
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, parent_dir)
+sys.path.insert(0, os.path.join(parent_dir, "src"))
 
 from human_mouse.human_mouse_stat_mj import train_mouse_model
+from humanmouse.models.trajectory_model import HumanMouseModel
 
 def train_and_save_model():
     """Train model and save to multiple locations for compatibility"""
@@ -19,6 +21,8 @@ def train_and_save_model():
         # Package location (for PyPI distribution)
         os.path.join(parent_dir, "src", "humanmouse", "models", "data", "mouse_model.pkl")
     ]
+    # Compact (pickle-free, memory-mappable) copies next to each pickle
+    compact_paths = [os.path.splitext(path)[0] + ".hmc" for path in output_paths]
     
     # Train model and save to root first
     print(f"Training model from CSV files in: {csv_data_path}")
@@ -33,10 +37,17 @@ def train_and_save_model():
         print(f"Model also copied to: {output_paths[1]}")
     except Exception as e:
         print(f"Warning: Could not copy model to package location: {e}")
+
+    # Export the compact format alongside the pickles
+    model = HumanMouseModel.load(output_paths[0])
+    for path in compact_paths:
+        if os.path.isdir(os.path.dirname(path)):
+            model.export_compact(path)
+            print(f"Compact model written to: {path}")
     
     print("\nModel training completed successfully!")
     print("The model has been saved to the following locations:")
-    for path in output_paths:
+    for path in output_paths + compact_paths:
         if os.path.exists(path):
             print(f"  [OK] {path}")
 
@@ -8,14 +8,31 @@ __author__ = "TomokotoKiyoshi"
 __email__ = ""  # Add email if needed for PyPI
 __description__ = "A human-like mouse movement automation tool based on real trajectory data"
 
-# 导出主要接口
-from .controllers.mouse_controller import HumanMouseController
+# 导出主要接口（延迟导入，仅生成轨迹时无需 pyautogui）
+# Main exports, imported lazily so generation-only users do not need pyautogui
+_LAZY_EXPORTS = {
+    "HumanMouseController": ".controllers.mouse_controller",
+}
 
 __all__ = [
     "HumanMouseController",
     "__version__",
 ]
 
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
+
 # 简化的使用示例
 def create_controller(**kwargs):
     """
@@ -28,4 +45,5 @@ def create_controller(**kwargs):
     Returns:
         HumanMouseController: 配置好的鼠标控制器实例
     """
+    from .controllers.mouse_controller import HumanMouseController
     return HumanMouseController(**kwargs)
\ No newline at end of file
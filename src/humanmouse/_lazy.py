@@ -0,0 +1,57 @@
+"""
+延迟导入工具
+Lazy import helpers
+"""
+import importlib
+from types import ModuleType
+from typing import Callable, Optional
+
+
+class LazyModule:
+    """
+    首次访问属性时才导入的模块代理
+    Module proxy that performs the import on first attribute access.
+
+    适用于 pyautogui、pandas、scipy、scikit-learn 等只在部分代码路径中用到的
+    重依赖：仅生成轨迹的进程不会为它们付出导入开销（或因无显示器而失败）。
+    Meant for heavy dependencies such as pyautogui, pandas, scipy and
+    scikit-learn that only some code paths need: generation-only processes
+    never pay their import cost (or fail without a display).
+    """
+
+    def __init__(self, name: str, on_load: Optional[Callable[[ModuleType], None]] = None):
+        """
+        Args:
+            name: 模块名 / Module name.
+            on_load: 导入后调用一次的回调，用于配置模块 / Called once after import, e.g. to configure the module.
+        """
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_on_load", on_load)
+        object.__setattr__(self, "_module", None)
+
+    def _load(self) -> ModuleType:
+        module = object.__getattribute__(self, "_module")
+        if module is None:
+            module = importlib.import_module(object.__getattribute__(self, "_name"))
+            on_load = object.__getattribute__(self, "_on_load")
+            if on_load is not None:
+                on_load(module)
+            object.__setattr__(self, "_module", module)
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        return object.__getattribute__(self, "_module") is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<lazy module {object.__getattribute__(self, '_name')!r} ({state})>"
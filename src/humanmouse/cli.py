@@ -31,6 +31,12 @@ Examples:
   
   # Set custom speed
   humanmouse move --to 800 600 --speed 2.0
+  
+  # Build a bank of one million normalized trajectories
+  humanmouse bank build --out bank.hmb --count 1000000 --points 100
+  
+  # Compact a CSV directory into a training dataset (re-runs only read new or changed files)
+  humanmouse dataset build csv_data --out dataset --jobs 4
         """
     )
     
@@ -113,6 +119,84 @@ Examples:
         help='End position (x y)'
     )
     
+    # bank 命令
+    bank_parser = subparsers.add_parser(
+        'bank',
+        help='Manage normalized-trajectory banks'
+    )
+    bank_subparsers = bank_parser.add_subparsers(
+        dest='bank_command',
+        help='Bank commands'
+    )
+    bank_build_parser = bank_subparsers.add_parser(
+        'build',
+        help='Generate a memory-mapped bank of normalized trajectories'
+    )
+    bank_build_parser.add_argument(
+        '--out',
+        required=True,
+        help='Output bank file (.hmb)'
+    )
+    bank_build_parser.add_argument(
+        '--model',
+        default=None,
+        help='Model file (.pkl or .hmc, default: built-in model)'
+    )
+    bank_build_parser.add_argument(
+        '--count',
+        type=int,
+        default=1_000_000,
+        help='Trajectories per point count (default: 1000000)'
+    )
+    bank_build_parser.add_argument(
+        '--points',
+        nargs='+',
+        type=int,
+        default=[100],
+        help='Point counts N to build (default: 100)'
+    )
+    bank_build_parser.add_argument(
+        '--seed',
+        type=int,
+        default=None,
+        help='Random seed'
+    )
+    bank_build_parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=65536,
+        help='Trajectories sampled per batch (default: 65536)'
+    )
+    
+    # dataset 命令
+    dataset_parser = subparsers.add_parser(
+        'dataset',
+        help='Manage consolidated training datasets'
+    )
+    dataset_subparsers = dataset_parser.add_subparsers(
+        dest='dataset_command',
+        help='Dataset commands'
+    )
+    dataset_build_parser = dataset_subparsers.add_parser(
+        'build',
+        help='Build or update a memory-mappable dataset from a CSV directory'
+    )
+    dataset_build_parser.add_argument(
+        'csv_dir',
+        help='Directory of trajectory CSV files'
+    )
+    dataset_build_parser.add_argument(
+        '--out',
+        required=True,
+        help='Dataset directory (updated incrementally if it exists)'
+    )
+    dataset_build_parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Worker processes used to read new or changed files (default: 1)'
+    )
+    
     # 解析参数
     args = parser.parse_args(argv)
     
@@ -120,18 +204,37 @@ Examples:
         parser.print_help()
         return 1
     
+    if args.command == 'bank':
+        if args.bank_command != 'build':
+            bank_parser.print_help()
+            return 1
+        try:
+            return _bank_build(args)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+    
+    if args.command == 'dataset':
+        if args.dataset_command != 'build':
+            dataset_parser.print_help()
+            return 1
+        try:
+            return _dataset_build(args)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+    
     try:
         # 创建控制器
         controller = HumanMouseController()
         
         # 获取当前鼠标位置
-        import pyautogui
-        current_pos = pyautogui.position()
+        current_pos = controller.backend.position()
         
         # 执行命令
         if args.command == 'move':
             controller.move(
-                start_point=(current_pos.x, current_pos.y),
+                start_point=current_pos,
                 end_point=tuple(args.to)
             )
             if hasattr(args, 'speed'):
@@ -140,24 +243,24 @@ Examples:
         elif args.command == 'click':
             if args.double:
                 controller.move_and_double_click(
-                    start_point=(current_pos.x, current_pos.y),
+                    start_point=current_pos,
                     end_point=tuple(args.at)
                 )
             elif args.button == 'right':
                 controller.move_and_right_click(
-                    start_point=(current_pos.x, current_pos.y),
+                    start_point=current_pos,
                     end_point=tuple(args.at)
                 )
             else:
                 controller.move_and_click(
-                    start_point=(current_pos.x, current_pos.y),
+                    start_point=current_pos,
                     end_point=tuple(args.at)
                 )
                 
         elif args.command == 'drag':
             # 先移动到起始位置
             controller.move(
-                start_point=(current_pos.x, current_pos.y),
+                start_point=current_pos,
                 end_point=tuple(getattr(args, 'from'))
             )
             # 执行拖拽
@@ -173,5 +276,40 @@ Examples:
         return 1
 
 
+def _bank_build(args) -> int:
+    """
+    生成归一化轨迹库
+    Build a normalized-trajectory bank
+    """
+    import time
+    from .models import get_default_model_path, get_model
+    from .models.bank import build_bank
+
+    model = get_model(args.model or get_default_model_path(compact=True))
+    t0 = time.perf_counter()
+    header = build_bank(model, args.out, args.count, sizes=args.points,
+                        batch_size=args.batch_size, seed=args.seed)
+    elapsed = time.perf_counter() - t0
+    total = header["count"] * len(header["sizes"])
+    print(f"Wrote {total} trajectories (N={header['sizes']}) to {args.out} "
+          f"in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} trajectories/s)")
+    return 0
+
+
+def _dataset_build(args) -> int:
+    """
+    构建或增量更新训练数据集
+    Build or incrementally update a training dataset
+    """
+    from .models.dataset import build_dataset
+
+    summary = build_dataset(args.csv_dir, args.out, jobs=args.jobs)
+    print(f"{summary['files']} files: {summary['ingested']} ingested, {summary['reused']} reused, "
+          f"{summary['removed']} removed, {summary['skipped']} skipped")
+    print(f"Wrote {summary['count']} trajectories ({summary['points']} points) to {args.out} "
+          f"in {summary['seconds']:.2f}s")
+    return 0
+
+
 if __name__ == '__main__':
     sys.exit(main())
\ No newline at end of file
@@ -3,6 +3,29 @@
 Controllers module - Mouse control implementations
 """
 
-from .mouse_controller import HumanMouseController
+# 延迟导入 / Imported lazily
+_LAZY_EXPORTS = {
+    "HumanMouseController": ".mouse_controller",
+    "MouseAction": ".mouse_controller",
+    "AsyncHumanMouseController": ".async_controller",
+    "BackendMouseController": ".backend_controller",
+    "PyAutoGUIBackend": ".backends",
+    "NullBackend": ".backends",
+    "RecordingBackend": ".backends",
+}
 
-__all__ = ["HumanMouseController"]
\ No newline at end of file
+__all__ = ["HumanMouseController", "MouseAction", "AsyncHumanMouseController",
+           "BackendMouseController", "PyAutoGUIBackend", "NullBackend", "RecordingBackend"]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
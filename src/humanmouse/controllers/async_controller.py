@@ -0,0 +1,170 @@
+"""
+asyncio 原生的鼠标控制器
+asyncio-native mouse controller
+"""
+import asyncio
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..models.trajectory_model import HumanMouseModel
+from .mouse_controller import HumanMouseController, MouseAction
+from .playback import PlaybackReport
+
+
+class AsyncHumanMouseController(HumanMouseController):
+    """
+    HumanMouseController 的 asyncio 版本
+    asyncio version of HumanMouseController.
+
+    与同步控制器共享构造参数、模型注册表、轨迹生成与输出后端；所有动作方法都是
+    协程，轨迹点通过 ``loop.call_at`` 按事件循环时钟调度，等待期间不占用线程。
+    取消正在执行的任务会在一个点间隔内停止回放（拖拽时会先释放按键）。
+    Shares the constructor arguments, model registry, trajectory generation
+    and output backend with the synchronous controller. Every action method is
+    a coroutine; points are scheduled with ``loop.call_at`` on the event-loop
+    clock, so no thread is held while waiting. Cancelling a running task stops
+    playback within one point interval (a drag releases the button first).
+
+    ``preload``、``reload``、``set_speed`` 仍为同步方法。
+    ``preload``, ``reload`` and ``set_speed`` stay synchronous.
+    """
+
+    async def _get_model_async(self) -> HumanMouseModel:
+        if self._model is None or self._load_thread is not None:
+            # 加载模型会阻塞，放到默认线程池中 / Loading blocks, so it runs in the default executor
+            await asyncio.get_running_loop().run_in_executor(None, self._get_model)
+        return self._model
+
+    async def move(self,
+                   start_point: Tuple[float, float],
+                   end_point: Tuple[float, float],
+                   seed: Optional[int] = None) -> PlaybackReport:
+        """单纯移动鼠标 / Moves the mouse only."""
+        return (await self.run([MouseAction("move", end_point, seed)], start_point))[0]
+
+    async def move_and_click(self,
+                             start_point: Tuple[float, float],
+                             end_point: Tuple[float, float],
+                             seed: Optional[int] = None) -> PlaybackReport:
+        """移动后单击 / Moves the mouse and then clicks."""
+        return (await self.run([MouseAction("click", end_point, seed)], start_point))[0]
+
+    async def move_and_double_click(self,
+                                    start_point: Tuple[float, float],
+                                    end_point: Tuple[float, float],
+                                    seed: Optional[int] = None) -> PlaybackReport:
+        """移动后双击 / Moves the mouse and then double-clicks."""
+        return (await self.run([MouseAction("double_click", end_point, seed)], start_point))[0]
+
+    async def move_and_right_click(self,
+                                   start_point: Tuple[float, float],
+                                   end_point: Tuple[float, float],
+                                   seed: Optional[int] = None) -> PlaybackReport:
+        """移动后右击 / Moves the mouse and then right-clicks."""
+        return (await self.run([MouseAction("right_click", end_point, seed)], start_point))[0]
+
+    async def drag(self,
+                   start_point: Tuple[float, float],
+                   end_point: Tuple[float, float],
+                   seed: Optional[int] = None) -> PlaybackReport:
+        """按住左键拖拽移动 / Drags the mouse with the left button held down."""
+        return (await self.run([MouseAction("drag", end_point, seed)], start_point))[0]
+
+    async def move_to(self, end_point: Tuple[float, float], seed: Optional[int] = None) -> PlaybackReport:
+        """从当前鼠标位置移动到目标位置 / Moves from current mouse position to target position."""
+        return await self.move(self.backend.position(), end_point, seed)
+
+    async def click_at(self, end_point: Tuple[float, float], seed: Optional[int] = None) -> PlaybackReport:
+        """从当前鼠标位置移动到目标位置并单击 / Moves from current mouse position to target and clicks."""
+        return await self.move_and_click(self.backend.position(), end_point, seed)
+
+    async def double_click_at(self, end_point: Tuple[float, float], seed: Optional[int] = None) -> PlaybackReport:
+        """从当前鼠标位置移动到目标位置并双击 / Moves from current mouse position to target and double-clicks."""
+        return await self.move_and_double_click(self.backend.position(), end_point, seed)
+
+    async def right_click_at(self, end_point: Tuple[float, float], seed: Optional[int] = None) -> PlaybackReport:
+        """从当前鼠标位置移动到目标位置并右击 / Moves from current mouse position to target and right-clicks."""
+        return await self.move_and_right_click(self.backend.position(), end_point, seed)
+
+    async def drag_to(self, end_point: Tuple[float, float], seed: Optional[int] = None) -> PlaybackReport:
+        """从当前鼠标位置拖拽到目标位置 / Drags from current mouse position to target position."""
+        return await self.drag(self.backend.position(), end_point, seed)
+
+    async def run(self,
+                  actions: Sequence[Union[MouseAction, tuple]],
+                  start_point: Optional[Tuple[float, float]] = None) -> List[PlaybackReport]:
+        """
+        ``HumanMouseController.run`` 的协程版本：回放第 i 条轨迹时在线程池中生成第 i+1 条
+        Coroutine version of ``HumanMouseController.run``: trajectory i+1 is
+        generated in the default executor while trajectory i plays back.
+        """
+        actions = [a if isinstance(a, MouseAction) else MouseAction(*a) for a in actions]
+        if not actions:
+            return []
+        if start_point is None:
+            start_point = self.backend.position()
+        starts = [start_point] + [a.end_point for a in actions[:-1]]
+        seeds = [a.seed for a in actions]
+        indices = [self._draw_index() if a.seed is None else None for a in actions]
+        await self._get_model_async()
+
+        loop = asyncio.get_running_loop()
+
+        def submit(i):
+            return loop.run_in_executor(None, self._generate_trajectory,
+                                        starts[i], actions[i].end_point, seeds[i], indices[i])
+
+        reports = []
+        pending = submit(0)
+        try:
+            t = None
+            for i, action in enumerate(actions):
+                xy, dt = await pending
+                pending = submit(i + 1) if i + 1 < len(actions) else None
+                if t is None:
+                    t = loop.time()
+                t, report = await self._play_action_async(action, xy, dt, t)
+                reports.append(report)
+        finally:
+            if pending is not None:
+                pending.cancel()
+        return reports
+
+    async def _play_action_async(self, action: MouseAction, xy: np.ndarray, dt: np.ndarray,
+                                 start: float) -> Tuple[float, PlaybackReport]:
+        """
+        从 start（``loop.time()``）开始执行一个动作，返回 (计划结束时间, 回放报告)
+        Performs one action starting at ``start`` (``loop.time()``); returns (planned end, report).
+        """
+        scheduler, backend = self.scheduler, self.backend
+        if action.kind == "drag":
+            t = start
+            await scheduler.sleep_until(t)
+            backend.move_to(float(xy[0, 0]), float(xy[0, 1]))
+            t += self._pause_ns(0.05, 0.1) / 1e9
+            await scheduler.sleep_until(t)
+            backend.mouse_down()
+            try:
+                report = await scheduler.play_async(xy[1:], dt[1:], backend.move_to,
+                                                    self.speed_factor, start=t)
+                t += report.planned + self._pause_ns(0.05, 0.1) / 1e9
+                await scheduler.sleep_until(t)
+            finally:
+                backend.mouse_up()
+            self.last_playback = report
+            return t, report
+
+        report = await scheduler.play_async(xy, dt, backend.move_to, self.speed_factor, start=start)
+        self.last_playback = report
+        t = start + report.planned
+        if action.kind != "move":
+            t += self._pause_ns(0.05, 0.15) / 1e9
+            await scheduler.sleep_until(t)
+            if action.kind == "click":
+                backend.click()
+            elif action.kind == "double_click":
+                backend.click(clicks=2)
+            else:
+                backend.click(button='right')
+        return t, report
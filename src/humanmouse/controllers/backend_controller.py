@@ -0,0 +1,69 @@
+"""
+基于光标后端的 IMouseController 实现
+IMouseController implementation on top of a cursor backend
+"""
+from typing import Optional
+
+import numpy as np
+
+from ..core.interfaces import ICursorBackend, IMouseController
+from ..core.trajectory import Trajectory
+from .playback import PlaybackReport, PlaybackScheduler
+
+
+class BackendMouseController(IMouseController):
+    """
+    按 Trajectory 的时间戳回放，输出到任意 ICursorBackend
+    Plays ``Trajectory`` objects back by their timestamps into any ``ICursorBackend``.
+    """
+
+    def __init__(self,
+                 backend: ICursorBackend,
+                 speed_factor: float = 1.0,
+                 scheduler: Optional[PlaybackScheduler] = None):
+        """
+        Args:
+            backend: 光标输出后端 / Cursor output backend.
+            speed_factor: 速度因子 / Speed factor.
+            scheduler: 回放调度器，默认 PlaybackScheduler() / Playback scheduler, defaults to PlaybackScheduler().
+        """
+        self.backend = backend
+        self.scheduler = scheduler if scheduler is not None else PlaybackScheduler()
+        self.last_playback: Optional[PlaybackReport] = None
+        self.set_speed(speed_factor)
+
+    @staticmethod
+    def _as_arrays(trajectory: Trajectory):
+        xy = np.array([(p.x, p.y) for p in trajectory.points], dtype="float64").reshape(-1, 2)
+        t = np.array([p.timestamp for p in trajectory.points], dtype="float64")
+        # dt[i] 为第 i-1 点到第 i 点的间隔 / dt[i] is the gap before point i
+        dt = np.diff(t, prepend=t[:1]) if len(t) else t
+        return xy, np.maximum(dt, 0.0)
+
+    def move(self, trajectory: Trajectory) -> None:
+        """按照轨迹移动鼠标 / Move the cursor along the trajectory."""
+        xy, dt = self._as_arrays(trajectory)
+        self.last_playback = self.scheduler.play(xy, dt, self.backend.move_to, self.speed_factor)
+
+    def click(self, button: str = 'left') -> None:
+        """在当前位置点击 / Click at the current position."""
+        self.backend.click(button=button)
+
+    def drag(self, trajectory: Trajectory) -> None:
+        """按住左键沿轨迹拖拽 / Drag along the trajectory with the left button held."""
+        xy, dt = self._as_arrays(trajectory)
+        if len(xy) == 0:
+            return
+        self.backend.move_to(float(xy[0, 0]), float(xy[0, 1]))
+        self.backend.mouse_down()
+        try:
+            self.last_playback = self.scheduler.play(xy[1:], dt[1:], self.backend.move_to,
+                                                     self.speed_factor)
+        finally:
+            self.backend.mouse_up()
+
+    def set_speed(self, speed_factor: float) -> None:
+        """设置速度因子 / Set the speed factor."""
+        if speed_factor <= 0:
+            raise ValueError("Speed factor must be greater than 0")
+        self.speed_factor = speed_factor
@@ -0,0 +1,197 @@
+"""
+光标输出后端
+Cursor output backends
+
+- PyAutoGUIBackend: 真实光标（默认）/ The real cursor (default).
+- NullBackend:      不做任何事，用于基准测试 / Does nothing, for benchmarks.
+- RecordingBackend: 把带时间戳的事件写入预分配的 numpy 数组 / Records timestamped events into preallocated numpy arrays.
+"""
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+
+from .._lazy import LazyModule
+from ..core.interfaces import ICursorBackend
+
+
+def _configure_pyautogui(module):
+    """配置 pyautogui / Configure pyautogui"""
+    module.MINIMUM_DURATION = 0.0  # 最小移动时间 / Minimum duration for a move
+    module.MINIMUM_SLEEP = 0.0     # 最小睡眠时间 / Minimum sleep time
+    module.PAUSE = 0.0             # 命令间暂停时间 / Pause between commands
+
+
+# 首次使用时才导入并配置（无显示器时导入 pyautogui 会失败）
+# Imported and configured on first use (importing pyautogui fails without a display)
+pyautogui = LazyModule("pyautogui", on_load=_configure_pyautogui)
+
+
+class PyAutoGUIBackend(ICursorBackend):
+    """
+    基于 pyautogui 的后端
+    Backend driving the real cursor through pyautogui.
+    """
+
+    def __init__(self, fast_moves: bool = False):
+        """
+        Args:
+            fast_moves: 移动时直接调用平台层，跳过 pyautogui 的 failsafe 检查与暂停处理
+                        Call the platform layer directly for moves, skipping
+                        pyautogui's failsafe check and pause handling.
+        """
+        self.fast_moves = fast_moves
+        self._fast_move = None
+
+    def move_to(self, x: float, y: float) -> None:
+        if self.fast_moves:
+            if self._fast_move is None:
+                self._fast_move = self._resolve_fast_move()
+            self._fast_move(x, y)
+        else:
+            pyautogui.moveTo(x, y, duration=0)
+
+    @staticmethod
+    def _resolve_fast_move():
+        """
+        平台层的私有 ``_moveTo``；新版 pyautogui 中不存在时退回不暂停的 ``moveTo``
+        The platform layer's private ``_moveTo``, falling back to ``moveTo``
+        without the pause when a pyautogui version does not have it.
+        """
+        platform_move = getattr(getattr(pyautogui, "platformModule", None), "_moveTo", None)
+        if platform_move is None:
+            return lambda x, y: pyautogui.moveTo(x, y, duration=0, _pause=False)
+        return lambda x, y: platform_move(int(round(x)), int(round(y)))
+
+    def mouse_down(self, button: str = 'left') -> None:
+        pyautogui.mouseDown(button=button)
+
+    def mouse_up(self, button: str = 'left') -> None:
+        pyautogui.mouseUp(button=button)
+
+    def click(self, button: str = 'left', clicks: int = 1) -> None:
+        pyautogui.click(button=button, clicks=clicks)
+
+    def position(self) -> Tuple[float, float]:
+        pos = pyautogui.position()
+        return (pos.x, pos.y)
+
+
+class NullBackend(ICursorBackend):
+    """
+    零开销后端：只记住当前位置
+    Zero-overhead backend that only remembers the current position.
+    """
+
+    def __init__(self, position: Tuple[float, float] = (0.0, 0.0)):
+        self._x, self._y = position
+
+    def move_to(self, x: float, y: float) -> None:
+        self._x = x
+        self._y = y
+
+    def mouse_down(self, button: str = 'left') -> None:
+        pass
+
+    def mouse_up(self, button: str = 'left') -> None:
+        pass
+
+    def click(self, button: str = 'left', clicks: int = 1) -> None:
+        pass
+
+    def position(self) -> Tuple[float, float]:
+        return (self._x, self._y)
+
+
+class RecordingBackend(NullBackend):
+    """
+    内存录制后端：事件写入预分配的 numpy 数组，容量不足时倍增
+    In-memory recording backend: events go into preallocated numpy arrays that
+    double in size when full.
+
+    事件字段 / Event fields: ``t_ns`` (perf_counter_ns), ``kind`` (MOVE / DOWN /
+    UP / CLICK), ``x``, ``y``, ``button``, ``clicks``.
+    """
+
+    MOVE, DOWN, UP, CLICK = 0, 1, 2, 3
+    BUTTONS = {'left': 0, 'middle': 1, 'right': 2}
+
+    def __init__(self, capacity: int = 4096, position: Tuple[float, float] = (0.0, 0.0)):
+        super().__init__(position)
+        self._allocate(max(int(capacity), 1))
+        self._clock = time.perf_counter_ns
+
+    def _allocate(self, capacity):
+        self._t = np.empty(capacity, dtype="int64")
+        self._xy = np.empty((capacity, 2), dtype="float64")
+        self._kind = np.empty(capacity, dtype="int8")
+        self._button = np.empty(capacity, dtype="int8")
+        self._clicks = np.empty(capacity, dtype="int16")
+        self._n = 0
+
+    def _grow(self):
+        n = self._n
+        old = (self._t, self._xy, self._kind, self._button, self._clicks)
+        self._allocate(2 * len(self._t))
+        for new, prev in zip((self._t, self._xy, self._kind, self._button, self._clicks), old):
+            new[:n] = prev[:n]
+        self._n = n
+
+    def _record(self, kind, button=0, clicks=0):
+        i = self._n
+        if i == len(self._t):
+            self._grow()
+        self._t[i] = self._clock()
+        self._xy[i, 0] = self._x
+        self._xy[i, 1] = self._y
+        self._kind[i] = kind
+        self._button[i] = button
+        self._clicks[i] = clicks
+        self._n = i + 1
+
+    def move_to(self, x: float, y: float) -> None:
+        self._x = x
+        self._y = y
+        self._record(self.MOVE)
+
+    def mouse_down(self, button: str = 'left') -> None:
+        self._record(self.DOWN, self.BUTTONS[button])
+
+    def mouse_up(self, button: str = 'left') -> None:
+        self._record(self.UP, self.BUTTONS[button])
+
+    def click(self, button: str = 'left', clicks: int = 1) -> None:
+        self._record(self.CLICK, self.BUTTONS[button], clicks)
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def capacity(self) -> int:
+        return len(self._t)
+
+    def events(self) -> Dict[str, np.ndarray]:
+        """
+        已录制事件的只读视图
+        Read-only views of the recorded events.
+        """
+        views = {"t_ns": self._t, "kind": self._kind, "x": self._xy[:, 0], "y": self._xy[:, 1],
+                 "button": self._button, "clicks": self._clicks}
+        out = {}
+        for name, a in views.items():
+            v = a[:self._n]
+            v.flags.writeable = False
+            out[name] = v
+        return out
+
+    def moves(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        仅移动事件：(t_ns, xy)
+        Move events only: (t_ns, xy).
+        """
+        mask = self._kind[:self._n] == self.MOVE
+        return self._t[:self._n][mask], self._xy[:self._n][mask]
+
+    def clear(self) -> None:
+        """清空事件（保留已分配的容量）/ Drop recorded events, keeping the allocated capacity."""
+        self._n = 0
@@ -5,14 +5,43 @@ Human_Mouse_Controller.py
 Generates simulated mouse trajectories using the human_mouse_stat_mj model and performs various mouse operations.
 """
 
+import itertools
 import time
-import random
-from typing import Tuple, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple, Union
 import numpy as np
-import pyautogui
 import importlib.resources
-# 导入轨迹生成函数 / Import the trajectory generation function
-from ..models.trajectory_model import generate_mouse_trajectory
+from ..core.interfaces import ICursorBackend
+from ..core.timing import timed
+# 导入共享模型注册表 / Import the shared model registry
+from ..models.cache import TrajectoryCache
+from ..models.prefetch import ShapePrefetchPool
+from ..models.registry import ModelRegistry, default_registry
+from ..models.trajectory_model import HumanMouseModel
+from .backends import PyAutoGUIBackend
+from .playback import PlaybackReport, PlaybackScheduler
+
+
+@dataclass
+class MouseAction:
+    """
+    动作序列中的一个动作
+    One action of an action sequence.
+
+    kind 取值 / kind is one of: "move", "click", "double_click", "right_click", "drag".
+    """
+    kind: str
+    end_point: Tuple[float, float]
+    seed: Optional[int] = None
+
+    KINDS = ("move", "click", "double_click", "right_click", "drag")
+
+    def __post_init__(self):
+        if self.kind not in self.KINDS:
+            raise ValueError(f"Unknown action {self.kind!r}, expected one of {self.KINDS}")
+
 
 class HumanMouseController:
     """
@@ -31,7 +60,15 @@ class HumanMouseController:
                  model_pkl: Optional[str] = None,
                  num_points: int = 100,
                  jitter_amplitude: float = 0.3,
-                 speed_factor: float = 1.0):
+                 speed_factor: float = 1.0,
+                 background_load: bool = False,
+                 registry: Optional[ModelRegistry] = None,
+                 scheduler: Optional[PlaybackScheduler] = None,
+                 backend: Optional[ICursorBackend] = None,
+                 polling_rate: Optional[float] = None,
+                 prefetch_depth: int = 0,
+                 cache: Optional[TrajectoryCache] = None,
+                 seed: Optional[int] = None):
         """
         初始化鼠标控制器
         Initializes the mouse controller.
@@ -41,16 +78,42 @@ class HumanMouseController:
             num_points: 轨迹采样点数，默认100 / Number of points for trajectory sampling, default is 100.
             jitter_amplitude: 抖动幅度，默认0.3 / Amplitude of the jitter, default is 0.3.
             speed_factor: 速度因子，默认1.0，值越大移动越快 / Speed factor, default is 1.0, higher values mean faster movement.
+            background_load: 是否在后台线程中预加载模型 / Preload the model on a background thread.
+            registry: 模型注册表，默认使用进程级共享注册表 / Model registry, defaults to the process-wide one.
+            scheduler: 回放调度器，默认 PlaybackScheduler() / Playback scheduler, defaults to PlaybackScheduler().
+            backend: 光标输出后端，默认 PyAutoGUIBackend() / Cursor output backend, defaults to PyAutoGUIBackend().
+            polling_rate: 按鼠标轮询率（Hz，如 125/500/1000）重新定时轨迹，点数随时长变化；
+                          None 表示固定 num_points 个点
+                          Re-time trajectories onto a mouse polling rate (Hz, e.g.
+                          125/500/1000) so the point count scales with duration;
+                          None keeps a fixed num_points.
+            prefetch_depth: > 0 时启用后台预取池，每个 N 预先采样这么多条归一化轨迹，
+                            未指定 seed 的移动只需做仿射映射与抖动
+                            When > 0, a background pool keeps this many pre-sampled
+                            normalized trajectories per N, so moves without a seed only
+                            pay for the affine mapping and jitter.
+                            给定控制器 seed 时不启用，以保持输出可复现
+                            Ignored when the controller has a ``seed``, so its output
+                            stays reproducible.
+            cache: 有种子轨迹的结果缓存，给定 seed 的移动重复时直接复用结果，
+                   例如 ``TrajectoryCache.from_config(config.system)``
+                   Result cache for seeded trajectories, so repeated moves with the
+                   same seed reuse the result, e.g. ``TrajectoryCache.from_config(config.system)``.
+            seed: 控制器随机流的基础种子；未指定 seed 的第 i 条轨迹使用 (seed, i) 的
+                  计数器随机流，停顿时长也来自该种子。None 表示取新熵
+                  Base seed of the controller's random stream: the i-th trajectory
+                  without an explicit seed uses the counter-based stream for
+                  (seed, i), and pause lengths derive from it too. None draws fresh entropy.
         """
         if model_pkl is None:
             # If no path is given, find the default model inside the package.
             # 'human_mouse' is the name of your package.
             try:
-                self.model_pkl = importlib.resources.files('humanmouse').joinpath('models/data/mouse_model.pkl')
+                self.model_pkl = importlib.resources.files('humanmouse').joinpath('models/data/mouse_model.hmc')
             except ModuleNotFoundError:
                 # Fallback for cases where the package isn't installed, e.g., local testing
                 from ..models import get_default_model_path
-                self.model_pkl = get_default_model_path()
+                self.model_pkl = get_default_model_path(compact=True)
         else:
             # If the user provides a path, use it.
             self.model_pkl = model_pkl
@@ -58,16 +121,110 @@ class HumanMouseController:
         self.num_points = num_points
         self.jitter_amplitude = jitter_amplitude
         self.speed_factor = speed_factor
+        self.polling_rate = polling_rate
+        self.prefetch_depth = prefetch_depth
+        self.prefetch_pool: Optional[ShapePrefetchPool] = None
+        # 预取池的轨迹不来自控制器随机流，有种子时不用 / Pool entries are not drawn from the controller's stream, so a seed disables it
+        self._use_prefetch = prefetch_depth > 0 and seed is None
+        self.cache = cache
+        # 控制器自己的随机流，不使用全局 random 模块
+        # The controller's own random streams; the global random module is not touched
+        self.base_seed = seed if seed is not None else np.random.SeedSequence().entropy
+        self._trajectory_index = itertools.count()
+        self._rng = np.random.Generator(np.random.Philox(np.random.SeedSequence(self.base_seed)))
+        self.scheduler = scheduler if scheduler is not None else PlaybackScheduler()
+        self.backend = backend if backend is not None else PyAutoGUIBackend()
+        # 最近一次回放的计划/实际时间 / Planned vs achieved timing of the last playback
+        self.last_playback: Optional[PlaybackReport] = None
+
+        # 模型只加载一次，由注册表在控制器之间共享
+        # The model is loaded once and shared between controllers by the registry
+        self._registry = registry if registry is not None else default_registry
+        self._model: Optional[HumanMouseModel] = None
+        self._load_thread: Optional[threading.Thread] = None
+        self._load_error: Optional[BaseException] = None
+        if background_load:
+            self._load_thread = threading.Thread(target=self._background_preload,
+                                                 name="humanmouse-preload",
+                                                 daemon=True)
+            self._load_thread.start()
+
+    # ----------------- 模型加载 / Model loading -----------------
+
+    def preload(self) -> HumanMouseModel:
+        """
+        立即加载模型（已加载则直接返回）
+        Loads the model now, or returns it if it is already loaded.
+
+        每次都经由注册表取模型（命中时只检查文件指纹），因此磁盘上被替换的
+        模型文件与其他控制器的 ``reload()`` 都会在下一次移动时生效。
+        The model is fetched through the registry on every call (a hit only
+        checks the file fingerprint), so a model file replaced on disk or a
+        ``reload()`` by another controller takes effect on the next move.
+        """
+        self._model = self._registry.get(self.model_pkl)
+        self._ensure_prefetch_pool()
+        return self._model
 
-        # 配置 pyautogui / Configure pyautogui
-        pyautogui.MINIMUM_DURATION = 0.0  # 最小移动时间 / Minimum duration for a move
-        pyautogui.MINIMUM_SLEEP = 0.0     # 最小睡眠时间 / Minimum sleep time
-        pyautogui.PAUSE = 0.0             # 命令间暂停时间 / Pause between commands
+    def reload(self) -> HumanMouseModel:
+        """
+        从磁盘重新读取模型文件，例如在重新训练之后
+        Re-reads the model file from disk, e.g. after retraining.
+        """
+        self._wait_for_background_load()
+        self._model = self._registry.reload(self.model_pkl)
+        self._ensure_prefetch_pool()
+        return self._model
 
+    def _ensure_prefetch_pool(self):
+        """
+        预取池跟随当前模型 / Keeps the prefetch pool bound to the current model
+        """
+        if not self._use_prefetch:
+            return
+        pool = self.prefetch_pool
+        if pool is not None and pool.model is self._model:
+            return
+        if pool is not None:
+            pool.close()
+        self.prefetch_pool = ShapePrefetchPool(self._model, depth=self.prefetch_depth,
+                                               sizes=(self.num_points,))
+
+    def close(self):
+        """
+        停止后台预取线程（如有）并把缓存写入磁盘
+        Stops the background prefetch thread, if any, and saves the cache to disk.
+        """
+        if self.cache is not None:
+            self.cache.save()
+        if self.prefetch_pool is not None:
+            self.prefetch_pool.close()
+            self.prefetch_pool = None
+
+    def _background_preload(self):
+        try:
+            self.preload()
+        except BaseException as e:  # 在前台重新抛出 / Re-raised in the foreground
+            self._load_error = e
+
+    def _wait_for_background_load(self):
+        if self._load_thread is not None:
+            self._load_thread.join()
+            self._load_thread = None
+        if self._load_error is not None:
+            error, self._load_error = self._load_error, None
+            raise error
+
+    def _get_model(self) -> HumanMouseModel:
+        self._wait_for_background_load()
+        return self.preload()
+
+    @timed("controller.generate")
     def _generate_trajectory(self,
                              start_point: Tuple[float, float],
                              end_point: Tuple[float, float],
-                             seed: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+                             seed: Optional[int] = None,
+                             index: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
         """
         生成鼠标轨迹
         Generates the mouse trajectory.
@@ -76,25 +233,47 @@ class HumanMouseController:
             start_point: 起始坐标 (x, y) / Starting coordinates (x, y).
             end_point: 结束坐标 (x, y) / Ending coordinates (x, y).
             seed: 随机种子，默认None表示随机 / Random seed, None means random.
+            index: 无种子时使用的轨迹序号，默认取下一个 / Trajectory index used
+                   without a seed, defaults to the next one.
 
         Returns:
             xy: 轨迹坐标数组 (N, 2) / Trajectory coordinate array (N, 2).
             dt: 时间间隔数组 (N,) / Time interval array (N,).
         """
-        # 如果没有指定seed，生成随机seed / If no seed is specified, generate a random one.
+        model = self._get_model()
+        # 轮询率按实际时间给出，换算到模型时间 / The polling rate is wall-clock, convert it to model time
+        rate_hz = None if self.polling_rate is None else self.polling_rate / self.speed_factor
+
+        if seed is None and index is None and self.prefetch_pool is not None:
+            # 无种子：从预取池取归一化轨迹 / No seed: take a normalized trajectory from the prefetch pool
+            return self.prefetch_pool.generate(start_point, end_point, N=self.num_points,
+                                               amp_jitter_px=self.jitter_amplitude, rate_hz=rate_hz)
+
+        if seed is not None and self.cache is not None:
+            # 指定种子的结果可复用 / Results for an explicit seed can be reused
+            return self.cache.generate(model, start_point, end_point, N=self.num_points,
+                                       amp_jitter_px=self.jitter_amplitude, seed=seed,
+                                       rate_hz=rate_hz)
+
         if seed is None:
-            seed = random.randint(0, 1000000)
-
-        return generate_mouse_trajectory(
-            model_path=self.model_pkl,
-            start_point=start_point,
-            end_point=end_point,
-            num_points=self.num_points,
-            jitter_amplitude=self.jitter_amplitude,
-            seed=seed
+            # 无种子：使用控制器随机流的第 index 条 / No seed: use trajectory `index` of the controller's stream
+            if index is None:
+                index = next(self._trajectory_index)
+            return model.generate(start_point, end_point, N=self.num_points,
+                                  amp_jitter_px=self.jitter_amplitude,
+                                  base_seed=self.base_seed, index=index, rate_hz=rate_hz)
+
+        return model.generate(
+            start_point,
+            end_point,
+            N=self.num_points,
+            amp_jitter_px=self.jitter_amplitude,
+            seed=seed,
+            rate_hz=rate_hz
         )
 
-    def _execute_trajectory(self, xy: np.ndarray, dt: np.ndarray):
+    @timed("controller.execute")
+    def _execute_trajectory(self, xy: np.ndarray, dt: np.ndarray) -> PlaybackReport:
         """
         执行鼠标轨迹移动
         Executes the mouse trajectory movement.
@@ -102,19 +281,14 @@ class HumanMouseController:
         Args:
             xy: 轨迹坐标数组 (N, 2) / Trajectory coordinate array (N, 2).
             dt: 时间间隔数组 (N,) / Time interval array (N,).
-        """
-        # 移动到第一个点（瞬间移动）/ Move to the first point (instantaneously).
-        pyautogui.moveTo(xy[0, 0], xy[0, 1], duration=0)
 
-        # 沿轨迹移动 / Move along the trajectory.
-        for i in range(1, len(xy)):
-            # 移动到下一个点 / Move to the next point.
-            pyautogui.moveTo(xy[i, 0], xy[i, 1], duration=0)
-            # 等待对应的时间间隔，根据速度因子调整 / Wait for the time interval, adjusted by speed factor.
-            if dt[i] > 0:
-                adjusted_delay = dt[i] / self.speed_factor
-                if adjusted_delay > 0:
-                    time.sleep(adjusted_delay)
+        Returns:
+            PlaybackReport: 计划与实际时间 / Planned vs achieved timing.
+        """
+        # 按绝对时间表回放，移动调用与 sleep 的误差不会累积
+        # Play against an absolute schedule so move latency and sleep overshoot do not accumulate
+        self.last_playback = self.scheduler.play(xy, dt, self.backend.move_to, self.speed_factor)
+        return self.last_playback
 
     def move(self,
              start_point: Tuple[float, float],
@@ -148,8 +322,8 @@ class HumanMouseController:
         # 先移动 / First, move the mouse.
         self.move(start_point, end_point, seed)
         # 短暂延迟后单击 / Click after a short delay.
-        time.sleep(random.uniform(0.05, 0.15) / self.speed_factor)
-        pyautogui.click()
+        time.sleep(self._rng.uniform(0.05, 0.15) / self.speed_factor)
+        self.backend.click()
 
     def move_and_double_click(self,
                               start_point: Tuple[float, float],
@@ -167,8 +341,8 @@ class HumanMouseController:
         # 先移动 / First, move the mouse.
         self.move(start_point, end_point, seed)
         # 短暂延迟后双击 / Double-click after a short delay.
-        time.sleep(random.uniform(0.05, 0.15) / self.speed_factor)
-        pyautogui.doubleClick()
+        time.sleep(self._rng.uniform(0.05, 0.15) / self.speed_factor)
+        self.backend.click(clicks=2)
 
     def move_and_right_click(self,
                              start_point: Tuple[float, float],
@@ -186,8 +360,8 @@ class HumanMouseController:
         # 先移动 / First, move the mouse.
         self.move(start_point, end_point, seed)
         # 短暂延迟后右击 / Right-click after a short delay.
-        time.sleep(random.uniform(0.05, 0.15) / self.speed_factor)
-        pyautogui.rightClick()
+        time.sleep(self._rng.uniform(0.05, 0.15) / self.speed_factor)
+        self.backend.click(button='right')
 
     def drag(self,
              start_point: Tuple[float, float],
@@ -205,23 +379,18 @@ class HumanMouseController:
         xy, dt = self._generate_trajectory(start_point, end_point, seed)
 
         # 移动到起始点 / Move to the starting point.
-        pyautogui.moveTo(xy[0, 0], xy[0, 1], duration=0)
-        time.sleep(random.uniform(0.05, 0.1) / self.speed_factor)
+        self.backend.move_to(float(xy[0, 0]), float(xy[0, 1]))
+        time.sleep(self._rng.uniform(0.05, 0.1) / self.speed_factor)
 
         # 按下鼠标左键 / Press the left mouse button down.
-        pyautogui.mouseDown()
+        self.backend.mouse_down()
 
         # 沿轨迹拖拽 / Drag along the trajectory.
-        for i in range(1, len(xy)):
-            pyautogui.moveTo(xy[i, 0], xy[i, 1], duration=0)
-            if dt[i] > 0:
-                adjusted_delay = dt[i] / self.speed_factor
-                if adjusted_delay > 0:
-                    time.sleep(adjusted_delay)
+        self.last_playback = self.scheduler.play(xy[1:], dt[1:], self.backend.move_to, self.speed_factor)
 
         # 释放鼠标左键 / Release the left mouse button.
-        time.sleep(random.uniform(0.05, 0.1) / self.speed_factor)
-        pyautogui.mouseUp()
+        time.sleep(self._rng.uniform(0.05, 0.1) / self.speed_factor)
+        self.backend.mouse_up()
 
     def set_speed(self, speed_factor: float):
         """
@@ -246,8 +415,8 @@ class HumanMouseController:
             end_point: 目标坐标 (x, y) / Target coordinates (x, y).
             seed: 随机种子，默认None表示随机 / Random seed, None means random.
         """
-        current_pos = pyautogui.position()
-        self.move((current_pos.x, current_pos.y), end_point, seed)
+        current_pos = self.backend.position()
+        self.move(current_pos, end_point, seed)
     
     def click_at(self, end_point: Tuple[float, float], seed: Optional[int] = None):
         """
@@ -258,8 +427,8 @@ class HumanMouseController:
             end_point: 目标坐标 (x, y) / Target coordinates (x, y).
             seed: 随机种子，默认None表示随机 / Random seed, None means random.
         """
-        current_pos = pyautogui.position()
-        self.move_and_click((current_pos.x, current_pos.y), end_point, seed)
+        current_pos = self.backend.position()
+        self.move_and_click(current_pos, end_point, seed)
     
     def double_click_at(self, end_point: Tuple[float, float], seed: Optional[int] = None):
         """
@@ -270,8 +439,8 @@ class HumanMouseController:
             end_point: 目标坐标 (x, y) / Target coordinates (x, y).
             seed: 随机种子，默认None表示随机 / Random seed, None means random.
         """
-        current_pos = pyautogui.position()
-        self.move_and_double_click((current_pos.x, current_pos.y), end_point, seed)
+        current_pos = self.backend.position()
+        self.move_and_double_click(current_pos, end_point, seed)
     
     def right_click_at(self, end_point: Tuple[float, float], seed: Optional[int] = None):
         """
@@ -282,8 +451,8 @@ class HumanMouseController:
             end_point: 目标坐标 (x, y) / Target coordinates (x, y).
             seed: 随机种子，默认None表示随机 / Random seed, None means random.
         """
-        current_pos = pyautogui.position()
-        self.move_and_right_click((current_pos.x, current_pos.y), end_point, seed)
+        current_pos = self.backend.position()
+        self.move_and_right_click(current_pos, end_point, seed)
     
     def drag_to(self, end_point: Tuple[float, float], seed: Optional[int] = None):
         """
@@ -294,8 +463,111 @@ class HumanMouseController:
             end_point: 目标坐标 (x, y) / Target coordinates (x, y).
             seed: 随机种子，默认None表示随机 / Random seed, None means random.
         """
-        current_pos = pyautogui.position()
-        self.drag((current_pos.x, current_pos.y), end_point, seed)
+        current_pos = self.backend.position()
+        self.drag(current_pos, end_point, seed)
+
+    # ===== 动作序列 / Action sequences =====
+
+    def run(self,
+            actions: Sequence[Union[MouseAction, tuple]],
+            start_point: Optional[Tuple[float, float]] = None) -> List[PlaybackReport]:
+        """
+        流水线执行动作序列：回放第 i 条轨迹时在工作线程中生成第 i+1 条
+        Runs an action sequence as a pipeline: trajectory i+1 is generated on a
+        worker thread while trajectory i plays back.
+
+        所有移动、点击前停顿和按键都排在同一条绝对时间线上，动作之间的间隔
+        只有仿人停顿，不包含计算时间。
+        Moves, pre-click pauses and button events share one absolute timeline,
+        so the gap between actions is only the humanlike pause, never compute time.
+
+        Args:
+            actions: MouseAction 或 (kind, end_point[, seed]) 元组 / MouseAction
+                     objects or (kind, end_point[, seed]) tuples.
+            start_point: 第一个动作的起点，默认当前光标位置 / Start of the first
+                         action, defaults to the current cursor position.
+
+        Returns:
+            每个动作的回放报告 / One playback report per action.
+        """
+        actions = [a if isinstance(a, MouseAction) else MouseAction(*a) for a in actions]
+        if not actions:
+            return []
+        if start_point is None:
+            start_point = self.backend.position()
+        starts = [start_point] + [a.end_point for a in actions[:-1]]
+        # 轨迹序号在调用线程按顺序分配 / Trajectory indices are assigned in order on the calling thread
+        seeds = [a.seed for a in actions]
+        indices = [self._draw_index() if a.seed is None else None for a in actions]
+        self._get_model()
+
+        reports = []
+        pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="humanmouse-gen")
+        try:
+            pending = pool.submit(self._generate_trajectory,
+                                  starts[0], actions[0].end_point, seeds[0], indices[0])
+            t = None
+            for i, action in enumerate(actions):
+                xy, dt = pending.result()
+                if i + 1 < len(actions):
+                    pending = pool.submit(self._generate_trajectory,
+                                          starts[i + 1], actions[i + 1].end_point,
+                                          seeds[i + 1], indices[i + 1])
+                if t is None:
+                    # 第一条轨迹的生成无法被隐藏 / The first generation cannot be hidden
+                    t = self.scheduler.clock()
+                t, report = self._play_action(action, xy, dt, t)
+                reports.append(report)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+        return reports
+
+    def _draw_index(self) -> Optional[int]:
+        # 启用预取时，无种子的动作交给预取池 / With prefetching, unseeded actions go to the pool
+        if self._use_prefetch:
+            return None
+        return next(self._trajectory_index)
+
+    def _pause_ns(self, low: float, high: float) -> int:
+        return int(self._rng.uniform(low, high) / self.speed_factor * 1e9)
+
+    @timed("controller.play_action")
+    def _play_action(self, action: MouseAction, xy: np.ndarray, dt: np.ndarray,
+                     start_ns: int) -> Tuple[int, PlaybackReport]:
+        """
+        从 start_ns 开始执行一个动作，返回 (计划结束时间, 回放报告)
+        Performs one action starting at start_ns; returns (planned end, report).
+        """
+        scheduler, backend = self.scheduler, self.backend
+        if action.kind == "drag":
+            t = start_ns
+            scheduler.wait_until(t)
+            backend.move_to(float(xy[0, 0]), float(xy[0, 1]))
+            t += self._pause_ns(0.05, 0.1)
+            scheduler.wait_until(t)
+            backend.mouse_down()
+            try:
+                report = scheduler.play(xy[1:], dt[1:], backend.move_to, self.speed_factor, start_ns=t)
+                t += int(round(report.planned * 1e9)) + self._pause_ns(0.05, 0.1)
+                scheduler.wait_until(t)
+            finally:
+                backend.mouse_up()
+            self.last_playback = report
+            return t, report
+
+        report = scheduler.play(xy, dt, backend.move_to, self.speed_factor, start_ns=start_ns)
+        self.last_playback = report
+        t = start_ns + int(round(report.planned * 1e9))
+        if action.kind != "move":
+            t += self._pause_ns(0.05, 0.15)
+            scheduler.wait_until(t)
+            if action.kind == "click":
+                backend.click()
+            elif action.kind == "double_click":
+                backend.click(clicks=2)
+            else:
+                backend.click(button='right')
+        return t, report
 
 
 # 使用示例 / Example Usage
@@ -0,0 +1,429 @@
+"""
+轨迹回放调度器 - 基于绝对截止时间、无累积漂移
+Trajectory playback scheduler - absolute deadlines, no accumulated drift
+"""
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional, Tuple
+
+import numpy as np
+
+
+@dataclass
+class PlaybackReport:
+    """
+    一次回放的计划与实际时间
+    Planned versus achieved timing of one playback.
+    """
+    planned: float          # 计划总时长（秒）/ Planned duration (s)
+    achieved: float         # 实际总时长（秒）/ Achieved duration (s)
+    points_total: int       # 轨迹点数 / Points in the trajectory
+    points_emitted: int     # 实际发出的移动次数 / Move calls actually issued
+    points_skipped: int     # 落后时跳过的点数 / Points skipped while behind
+    max_lateness: float     # 相对截止时间的最大延迟（秒）/ Worst lateness against a deadline (s)
+    points_coalesced: int = 0   # 预处理阶段合并的点数 / Points merged away before playback
+
+    @property
+    def drift(self) -> float:
+        """实际与计划时长之差（秒）/ Achieved minus planned duration (s)"""
+        return self.achieved - self.planned
+
+
+def coalesce_points(xy: np.ndarray,
+                    times: np.ndarray,
+                    min_interval: float,
+                    dedupe_pixels: bool = True,
+                    previous: Optional[np.ndarray] = None,
+                    final: bool = True):
+    """
+    把轨迹点合并为按最小发送间隔对齐的事件
+    Merge trajectory points into events aligned to a minimum emit interval.
+
+    每个间隔格 ``(k-1)*min_interval < t <= k*min_interval`` 只保留其中最后一个点，
+    并在格点 ``k*min_interval`` 发出（与按轮询率采样光标的效果相同）；随后去掉
+    取整后与前一事件同像素的点。终点的坐标和时间始终保持不变。
+    Only the last point of each tick ``(k-1)*min_interval < t <= k*min_interval``
+    is kept and emitted at ``k*min_interval``, which is what sampling the cursor
+    at a polling rate would see. Events that round to the same integer pixel as
+    the previous event are then dropped. The end point keeps its exact position
+    and time.
+
+    Args:
+        xy: 轨迹坐标 (N, 2) / Trajectory coordinates (N, 2).
+        times: 累积时间 (N,)，非递减；整数（如纳秒）或浮点 / Cumulative times (N,),
+               non-decreasing; integers (e.g. nanoseconds) or floats.
+        min_interval: 最小发送间隔，与 times 同单位；<= 0 时不合并
+                      Minimum emit interval in the units of ``times``; no merging when <= 0.
+        dedupe_pixels: 是否去掉连续的重复整数像素 / Drop consecutive duplicate integer pixels.
+        previous: 上一个已发出事件的坐标，与之同像素的首点也被去掉（用于分块回放）
+                  Coordinates of the previously emitted event; a first point on
+                  the same pixel is dropped too (for chunked playback).
+        final: 这些点是否以终点结束；为 False 时最后一格同样对齐到格点且不强制保留，
+               用于分块回放中只含完整格的中间部分
+               Whether the points end with the end point. When False, the last
+               tick is aligned like the others and not force-kept, for the
+               middle parts of a chunked playback that hold only complete ticks.
+
+    Returns:
+        (xy, times): 合并后的坐标和时间 / The merged coordinates and times.
+    """
+    xy = np.asarray(xy)
+    times = np.asarray(times)
+    if len(xy) == 0 or (len(xy) == 1 and final):
+        return xy, times
+
+    if min_interval > 0:
+        if np.issubdtype(times.dtype, np.integer):
+            ticks = -(-times // int(min_interval))
+        else:
+            ticks = np.ceil(times / min_interval)
+        last = np.flatnonzero(np.append(ticks[1:] != ticks[:-1], True))
+        xy = xy[last]
+        aligned = ticks[last] * min_interval
+        times = (np.minimum(aligned, times[-1]) if final else aligned).astype(times.dtype)
+
+    if dedupe_pixels and (len(xy) > 1 or previous is not None or not final):
+        px = np.rint(xy)
+        keep = np.empty(len(px), dtype=bool)
+        keep[0] = previous is None or bool(np.any(px[0] != np.rint(previous)))
+        keep[1:] = np.any(px[1:] != px[:-1], axis=1)
+        if final:
+            keep[-1] = True
+        xy, times = xy[keep], times[keep]
+    return xy, times
+
+
+def _wake(waiter: "asyncio.Future") -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class PlaybackScheduler:
+    """
+    按绝对时间表回放轨迹
+    Plays trajectories back against an absolute schedule.
+
+    截止时间为 ``t0 + cumsum(dt) / speed_factor``（``time.perf_counter_ns``），
+    每个点先 sleep 到截止时间前 ``spin_threshold`` 秒，再自旋等待，因此移动调用
+    本身的耗时和 sleep 的超调不会累积。落后时直接跳到最新已到期的点（终点
+    永远发出）。
+    Deadlines are ``t0 + cumsum(dt) / speed_factor`` on ``time.perf_counter_ns``.
+    Each point sleeps until ``spin_threshold`` seconds before its deadline and
+    then spins, so neither the move call's latency nor sleep overshoot
+    accumulates. When behind, playback jumps to the latest point that is
+    already due (the end point is always emitted).
+    """
+
+    def __init__(self,
+                 spin_threshold: float = 0.002,
+                 skip_when_behind: bool = True,
+                 min_interval: float = 0.0,
+                 dedupe_pixels: bool = True,
+                 clock: Callable[[], int] = time.perf_counter_ns,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Args:
+            spin_threshold: 截止时间前改为自旋等待的时长（秒）/ Seconds before a deadline to switch from sleeping to spinning.
+            skip_when_behind: 落后时是否合并已到期的点 / Coalesce points that are already due when behind.
+            min_interval: 最小发送间隔（秒，按实际时间），例如鼠标轮询周期 0.001；
+                          > 0 时回放前先用 ``coalesce_points`` 合并点
+                          Minimum emit interval in wall-clock seconds, e.g. a 0.001 s
+                          mouse polling period; when > 0, points are merged with
+                          ``coalesce_points`` before playback.
+            dedupe_pixels: 合并时去掉连续的重复整数像素 / Drop consecutive duplicate integer pixels when merging.
+            clock: 纳秒时钟 / Nanosecond clock.
+            sleep: 休眠函数 / Sleep function.
+        """
+        if spin_threshold < 0:
+            raise ValueError("spin_threshold must be non-negative")
+        if min_interval < 0:
+            raise ValueError("min_interval must be non-negative")
+        self.spin_threshold = spin_threshold
+        self.skip_when_behind = skip_when_behind
+        self.min_interval = min_interval
+        self.dedupe_pixels = dedupe_pixels
+        self.clock = clock
+        self.sleep = sleep
+
+    def schedule(self, dt: np.ndarray, speed_factor: float = 1.0) -> np.ndarray:
+        """
+        相对起点的截止时间（纳秒，int64）
+        Deadlines in nanoseconds relative to the start (int64).
+        """
+        if speed_factor <= 0:
+            raise ValueError("Speed factor must be greater than 0")
+        return np.round(np.cumsum(np.asarray(dt, dtype="float64")) / speed_factor * 1e9).astype("int64")
+
+    def _prepare(self, xy, dt, speed_factor):
+        """
+        相对截止时间（纳秒），按需合并点；返回 (xy, deadlines, 合并掉的点数)
+        Relative deadlines in nanoseconds, merging points if configured;
+        returns (xy, deadlines, number of points merged away).
+        """
+        deadlines = self.schedule(dt, speed_factor)
+        if self.min_interval <= 0:
+            return xy, deadlines, 0
+        n = len(xy)
+        xy, deadlines = coalesce_points(xy, deadlines, int(round(self.min_interval * 1e9)),
+                                        self.dedupe_pixels)
+        return xy, deadlines, n - len(xy)
+
+    def wait_until(self, deadline: int) -> None:
+        """
+        等待到绝对截止时间（纳秒）：先 sleep，最后 ``spin_threshold`` 秒自旋
+        Wait until an absolute deadline in nanoseconds: sleep first, then spin
+        for the last ``spin_threshold`` seconds.
+        """
+        clock = self.clock
+        remaining = deadline - clock()
+        if remaining <= 0:
+            return
+        spin = int(self.spin_threshold * 1e9)
+        if remaining > spin:
+            self.sleep((remaining - spin) / 1e9)
+        while clock() < deadline:
+            pass
+
+    def play(self,
+             xy: np.ndarray,
+             dt: np.ndarray,
+             move: Callable[[float, float], None],
+             speed_factor: float = 1.0,
+             start_ns: Optional[int] = None) -> PlaybackReport:
+        """
+        回放一条轨迹：在第 i 个截止时间调用 ``move(x_i, y_i)``
+        Play one trajectory, calling ``move(x_i, y_i)`` at the i-th deadline.
+
+        Args:
+            xy: 轨迹坐标 (N, 2) / Trajectory coordinates (N, 2).
+            dt: 时间间隔 (N,)，dt[i] 为第 i-1 点到第 i 点的间隔 / Intervals (N,), dt[i] is the gap before point i.
+            move: 移动回调 / Move callback.
+            speed_factor: 速度因子 / Speed factor.
+            start_ns: 时间表的绝对起点（``clock()`` 的读数），默认为现在；用于把多段
+                      轨迹接在同一条时间线上
+                      Absolute start of the schedule (a ``clock()`` reading),
+                      defaults to now; lets several trajectories share one timeline.
+        """
+        total = len(xy)
+        if total == 0:
+            return PlaybackReport(0.0, 0.0, 0, 0, 0, 0.0)
+        clock = self.clock
+        t0 = clock() if start_ns is None else start_ns
+        xy, deadlines, coalesced = self._prepare(xy, dt, speed_factor)
+        deadlines += t0
+        emitted, skipped, max_late = self._emit(xy, deadlines, move)
+
+        return PlaybackReport(planned=(int(deadlines[-1]) - t0) / 1e9,
+                              achieved=(clock() - t0) / 1e9,
+                              points_total=total,
+                              points_emitted=emitted,
+                              points_skipped=skipped,
+                              max_lateness=max_late / 1e9,
+                              points_coalesced=coalesced)
+
+    def _emit(self, xy, deadlines, move):
+        """
+        在绝对截止时间（纳秒）发出各点；返回 (发出数, 跳过数, 最大延迟纳秒)
+        Emit each point at its absolute deadline (ns); returns (emitted, skipped, max lateness in ns).
+        """
+        clock = self.clock
+        n = len(xy)
+        due = deadlines.tolist()      # Python int 比较更快 / Python ints compare faster
+
+        emitted = skipped = 0
+        max_late = 0
+        i = 0
+        while i < n:
+            now = clock()
+            if now < due[i]:
+                self.wait_until(due[i])
+            elif self.skip_when_behind and i < n - 1:
+                # 落后：跳到最新已到期的点 / Behind: jump to the latest point already due
+                latest = int(np.searchsorted(deadlines, now, side="right")) - 1
+                if latest > i:
+                    skipped += latest - i
+                    i = latest
+            max_late = max(max_late, clock() - due[i])
+            move(float(xy[i, 0]), float(xy[i, 1]))
+            emitted += 1
+            i += 1
+        return emitted, skipped, max_late
+
+    def play_stream(self,
+                    chunks: Iterable[Tuple[np.ndarray, np.ndarray]],
+                    move: Callable[[float, float], None],
+                    speed_factor: float = 1.0,
+                    start_ns: Optional[int] = None) -> PlaybackReport:
+        """
+        边生成边回放：逐块消费 ``(xy, dt)``，第一块到达即开始发出
+        Play a trajectory while it is generated: ``(xy, dt)`` chunks are
+        consumed one at a time and emission starts as soon as the first arrives.
+
+        各块接在同一条时间表上（dt 跨块累积），例如
+        ``scheduler.play_stream(model.generate_stream(a, b), backend.move_to)``。
+        落后时只在块内跳点，每块的最后一个点总会发出。
+        Chunks share one schedule (dt accumulates across chunks), e.g.
+        ``scheduler.play_stream(model.generate_stream(a, b), backend.move_to)``.
+        When behind, points are skipped only within a chunk, so the last point
+        of every chunk is always emitted.
+
+        启用合并时，每块最后一格可能延续到下一块，因此留到下一块一起合并；上一个
+        发出的像素也跨块保留，结果与整条 ``play`` 相同。
+        With coalescing, the last tick of a chunk may continue into the next
+        one, so it is held back and merged with the next chunk; the last
+        emitted pixel also carries across chunks, giving the same events as
+        ``play`` on the whole trajectory.
+
+        Args:
+            chunks: ``(xy (k,2), dt (k,))`` 块的可迭代对象 / Iterable of ``(xy (k,2), dt (k,))`` chunks.
+            start_ns: 时间表的绝对起点，默认为第一次调用时 / Absolute start of the schedule, defaults to now.
+        """
+        if speed_factor <= 0:
+            raise ValueError("Speed factor must be greater than 0")
+        clock = self.clock
+        t0 = clock() if start_ns is None else start_ns
+        min_interval_ns = int(round(self.min_interval * 1e9))
+
+        parts = self._stream_deadlines(chunks, speed_factor)
+        if min_interval_ns > 0:
+            parts = self._coalesce_stream(parts, min_interval_ns)
+
+        last_due = t0
+        total = emitted = skipped = coalesced = 0
+        max_late = 0
+        for xy, deadlines, n in parts:
+            total += n
+            coalesced += n - len(xy)
+            if not len(xy):
+                continue
+            deadlines = deadlines + t0
+            e, s, late = self._emit(xy, deadlines, move)
+            emitted += e
+            skipped += s
+            max_late = max(max_late, late)
+            last_due = int(deadlines[-1])
+
+        return PlaybackReport(planned=(last_due - t0) / 1e9,
+                              achieved=(clock() - t0) / 1e9,
+                              points_total=total,
+                              points_emitted=emitted,
+                              points_skipped=skipped,
+                              max_lateness=max_late / 1e9,
+                              points_coalesced=coalesced)
+
+    @staticmethod
+    def _stream_deadlines(chunks, speed_factor):
+        """
+        各块的相对截止时间（纳秒），dt 跨块累积；产出 (xy, deadlines, 点数)
+        Relative deadlines (ns) of each chunk with dt accumulated across
+        chunks; yields (xy, deadlines, point count).
+        """
+        elapsed = 0.0
+        for xy, dt in chunks:
+            if len(xy) == 0:
+                continue
+            cum = elapsed + np.cumsum(np.asarray(dt, dtype="float64"))
+            elapsed = float(cum[-1])
+            yield xy, np.round(cum / speed_factor * 1e9).astype("int64"), len(xy)
+
+    def _coalesce_stream(self, parts, min_interval_ns):
+        """
+        跨块合并：格点相对于整条时间表，每块最后一格留到下一块；产出 (xy, deadlines, 消耗的点数)
+        Coalesce across chunks: ticks are relative to the whole schedule and
+        each chunk's last tick is held for the next one; yields (xy,
+        deadlines, points consumed).
+        """
+        held_xy = held_t = previous = None
+        for xy, deadlines, _ in parts:
+            if held_xy is not None:
+                xy = np.concatenate([held_xy, xy])
+                deadlines = np.concatenate([held_t, deadlines])
+            ticks = -(-deadlines // min_interval_ns)
+            cut = int(np.searchsorted(ticks, ticks[-1]))
+            held_xy, held_t = xy[cut:], deadlines[cut:]
+            out_xy, out_t = coalesce_points(xy[:cut], deadlines[:cut], min_interval_ns,
+                                            self.dedupe_pixels, previous=previous, final=False)
+            if len(out_xy):
+                previous = out_xy[-1]
+            yield out_xy, out_t, cut
+        if held_xy is not None:
+            out_xy, out_t = coalesce_points(held_xy, held_t, min_interval_ns,
+                                            self.dedupe_pixels, previous=previous)
+            yield out_xy, out_t, len(held_xy)
+
+    # ----------------- asyncio -----------------
+
+    @staticmethod
+    async def sleep_until(deadline: float) -> None:
+        """
+        在事件循环时钟上等待到绝对截止时间（秒），通过 ``loop.call_at`` 唤醒
+        Wait until an absolute deadline on the event-loop clock (seconds),
+        woken by ``loop.call_at``.
+        """
+        # 同步回放路径不导入 asyncio / The synchronous playback path does not import asyncio
+        import asyncio
+        loop = asyncio.get_running_loop()
+        if deadline <= loop.time():
+            return
+        waiter = loop.create_future()
+        handle = loop.call_at(deadline, _wake, waiter)
+        try:
+            await waiter
+        finally:
+            handle.cancel()
+
+    async def play_async(self,
+                         xy: np.ndarray,
+                         dt: np.ndarray,
+                         move: Callable[[float, float], None],
+                         speed_factor: float = 1.0,
+                         start: Optional[float] = None) -> PlaybackReport:
+        """
+        ``play`` 的 asyncio 版本：截止时间基于 ``loop.time()``，等待期间不占用线程
+        The asyncio version of ``play``: deadlines are on ``loop.time()`` and no
+        thread is held while waiting.
+
+        取消任务时，回放在当前等待的点处停止（至多一个点间隔）。
+        Cancelling the task stops playback at the point being waited for, i.e.
+        within one point interval.
+
+        Args:
+            start: 时间表的绝对起点（``loop.time()`` 的读数），默认为现在
+                   Absolute start of the schedule (a ``loop.time()`` reading), defaults to now.
+        """
+        total = len(xy)
+        if total == 0:
+            return PlaybackReport(0.0, 0.0, 0, 0, 0, 0.0)
+        import asyncio
+        loop = asyncio.get_running_loop()
+        t0 = loop.time() if start is None else start
+        xy, deadlines, coalesced = self._prepare(xy, dt, speed_factor)
+        deadlines = t0 + deadlines / 1e9
+        n = len(xy)
+        due = deadlines.tolist()
+
+        emitted = skipped = 0
+        max_late = 0.0
+        i = 0
+        while i < n:
+            now = loop.time()
+            if now < due[i]:
+                await self.sleep_until(due[i])
+            elif self.skip_when_behind and i < n - 1:
+                # 落后：跳到最新已到期的点 / Behind: jump to the latest point already due
+                latest = int(np.searchsorted(deadlines, now, side="right")) - 1
+                if latest > i:
+                    skipped += latest - i
+                    i = latest
+            max_late = max(max_late, loop.time() - due[i])
+            move(float(xy[i, 0]), float(xy[i, 1]))
+            emitted += 1
+            i += 1
+
+        return PlaybackReport(planned=due[-1] - t0,
+                              achieved=loop.time() - t0,
+                              points_total=total,
+                              points_emitted=emitted,
+                              points_skipped=skipped,
+                              max_lateness=max_late,
+                              points_coalesced=coalesced)
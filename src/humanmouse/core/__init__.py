@@ -9,7 +9,9 @@ from .interfaces import (
     ITrajectoryGenerator,
     ITrajectoryStorage,
     IMouseController,
+    ICursorBackend,
 )
+from .timing import enable_stats, get_stats, reset_stats
 from .exceptions import (
     HumanMouseError,
     ConfigurationError,
@@ -24,8 +26,12 @@ __all__ = [
     "ITrajectoryGenerator", 
     "ITrajectoryStorage",
     "IMouseController",
+    "ICursorBackend",
     "HumanMouseError",
     "ConfigurationError",
     "TrajectoryError",
     "ModelError",
+    "enable_stats",
+    "get_stats",
+    "reset_stats",
 ]
\ No newline at end of file
@@ -88,4 +88,33 @@ class IMouseController(ABC):
     @abstractmethod
     def set_speed(self, speed_factor: float) -> None:
         """设置移动速度"""
-        pass
\ No newline at end of file
+        pass
+
+
+class ICursorBackend(ABC):
+    """光标输出后端接口"""
+    
+    @abstractmethod
+    def move_to(self, x: float, y: float) -> None:
+        """立即把光标移动到 (x, y)"""
+        pass
+    
+    @abstractmethod
+    def mouse_down(self, button: str = 'left') -> None:
+        """按下鼠标按键"""
+        pass
+    
+    @abstractmethod
+    def mouse_up(self, button: str = 'left') -> None:
+        """释放鼠标按键"""
+        pass
+    
+    @abstractmethod
+    def click(self, button: str = 'left', clicks: int = 1) -> None:
+        """在当前位置点击"""
+        pass
+    
+    @abstractmethod
+    def position(self) -> Tuple[float, float]:
+        """返回当前光标位置"""
+        pass
@@ -0,0 +1,204 @@
+"""
+分阶段计时统计 - 进程内聚合的次数与延迟直方图
+Per-stage timing - counts and latency histograms aggregated in-process
+
+默认关闭；关闭时每个计时点只多一次全局标志判断。用 ``enable_stats()`` 或环境
+变量 ``HUMANMOUSE_STATS=1`` 开启，用 ``get_stats()`` 读取。
+Disabled by default; when disabled each probe costs one global flag check.
+Turn it on with ``enable_stats()`` or the ``HUMANMOUSE_STATS=1`` environment
+variable and read the results with ``get_stats()``.
+
+用法 / Usage::
+
+    with stage("generate.sample"):
+        ...
+
+    t = lap_start()
+    ...                       # 阶段 A / stage A
+    t = lap("stage_a", t)
+    ...                       # 阶段 B / stage B
+    lap("stage_b", t)
+
+延迟按纳秒的 2 的幂分桶：桶 b 统计 ``2**(b-1) <= ns < 2**b`` 的样本。
+Latencies go into power-of-two nanosecond buckets: bucket b counts samples
+with ``2**(b-1) <= ns < 2**b``.
+"""
+import os
+import threading
+import time
+from functools import wraps
+from typing import Callable, Dict, Optional
+
+_clock = time.perf_counter_ns
+_enabled = os.environ.get("HUMANMOUSE_STATS", "") not in ("", "0")
+_lock = threading.Lock()
+_stages: Dict[str, "_StageStats"] = {}
+
+# 直方图桶数（覆盖到约 2**63 ns）/ Number of histogram buckets (up to ~2**63 ns)
+_BUCKETS = 64
+
+
+class _StageStats:
+    """单个阶段的聚合数据 / Aggregates for one stage."""
+
+    __slots__ = ("count", "total_ns", "min_ns", "max_ns", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+        self.buckets = [0] * _BUCKETS
+
+    def add(self, ns: int) -> None:
+        self.count += 1
+        self.total_ns += ns
+        if self.min_ns is None or ns < self.min_ns:
+            self.min_ns = ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        self.buckets[min(ns.bit_length(), _BUCKETS - 1)] += 1
+
+    def quantile(self, q: float) -> float:
+        """按直方图估计分位数（桶上界，秒）/ Quantile estimated from the histogram (bucket upper bound, s)."""
+        target = q * self.count
+        seen = 0
+        for b, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= target:
+                return min(2 ** b, self.max_ns) / 1e9
+        return self.max_ns / 1e9
+
+    def as_dict(self) -> dict:
+        return {"count": self.count,
+                "total": self.total_ns / 1e9,
+                "mean": self.total_ns / self.count / 1e9,
+                "min": self.min_ns / 1e9,
+                "max": self.max_ns / 1e9,
+                "p50": self.quantile(0.5),
+                "p99": self.quantile(0.99),
+                "histogram": {2 ** b / 1e9: n for b, n in enumerate(self.buckets) if n}}
+
+
+def record(name: str, ns: int) -> None:
+    """
+    记录一次阶段耗时（纳秒）；关闭时忽略
+    Record one stage duration in nanoseconds; ignored when disabled.
+    """
+    if not _enabled:
+        return
+    with _lock:
+        stats = _stages.get(name)
+        if stats is None:
+            stats = _stages[name] = _StageStats()
+        stats.add(ns)
+
+
+def lap_start() -> int:
+    """
+    开始一串连续阶段；关闭时返回 0 且不读时钟
+    Start a run of consecutive stages; returns 0 without reading the clock when disabled.
+    """
+    return _clock() if _enabled else 0
+
+
+def lap(name: str, start: int) -> int:
+    """
+    记录从 ``start`` 到现在的阶段耗时并返回现在，作为下一阶段的起点
+    Record the stage from ``start`` to now and return now as the next stage's start.
+    """
+    if not _enabled:
+        return 0
+    now = _clock()
+    if start:
+        record(name, now - start)
+    return now
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = _clock()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, _clock() - self.start)
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str):
+    """
+    计时 ``with`` 块的上下文管理器；关闭时返回共享的空对象
+    Context manager timing a ``with`` block; returns a shared no-op object when disabled.
+    """
+    return _Stage(name) if _enabled else _NULL_STAGE
+
+
+def timed(name: str) -> Callable:
+    """
+    计时整个函数调用的装饰器（开关在调用时判断）
+    Decorator timing each call of a function (the switch is checked per call).
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = _clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, _clock() - start)
+        return wrapper
+    return decorator
+
+
+def enable_stats(enabled: bool = True) -> None:
+    """开启或关闭计时 / Turn timing on or off."""
+    global _enabled
+    _enabled = enabled
+
+
+def stats_enabled() -> bool:
+    """计时是否开启 / Whether timing is on."""
+    return _enabled
+
+
+def get_stats(prefix: Optional[str] = None) -> Dict[str, dict]:
+    """
+    各阶段的次数与延迟统计（秒）
+    Counts and latency statistics (seconds) per stage.
+
+    Args:
+        prefix: 只返回以此开头的阶段，如 ``"generate."`` / Only stages starting with this, e.g. ``"generate."``.
+
+    Returns:
+        ``{stage: {count, total, mean, min, max, p50, p99, histogram}}``，
+        ``histogram`` 为 ``{桶上界秒 / bucket upper bound in s: count}``。
+    """
+    with _lock:
+        return {name: s.as_dict() for name, s in sorted(_stages.items())
+                if prefix is None or name.startswith(prefix)}
+
+
+def reset_stats() -> None:
+    """清空已聚合的统计 / Clear the aggregated statistics."""
+    with _lock:
+        _stages.clear()
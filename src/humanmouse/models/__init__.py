@@ -8,22 +8,28 @@ from pathlib import Path
 
 # 获取默认模型路径
 DEFAULT_MODEL_PATH = Path(__file__).parent / "data" / "mouse_model.pkl"
+# 紧凑格式（仅需 numpy 即可加载）/ Compact format (loadable with numpy alone)
+DEFAULT_COMPACT_MODEL_PATH = Path(__file__).parent / "data" / "mouse_model.hmc"
 
-def get_default_model_path():
+def get_default_model_path(compact: bool = False):
     """
     获取默认模型文件路径
     Get the default model file path
+
+    Args:
+        compact: 返回紧凑格式（.hmc）而非 pickle / Return the compact (.hmc) model instead of the pickle.
     """
-    if DEFAULT_MODEL_PATH.exists():
-        return str(DEFAULT_MODEL_PATH)
+    default = DEFAULT_COMPACT_MODEL_PATH if compact else DEFAULT_MODEL_PATH
+    if default.exists():
+        return str(default)
     
     # 如果包内没有找到，尝试从当前目录查找
-    local_model = Path("mouse_model.pkl")
+    local_model = Path(default.name)
     if local_model.exists():
         return str(local_model)
     
     raise FileNotFoundError(
-        "Default model file 'mouse_model.pkl' not found. "
+        f"Default model file '{default.name}' not found. "
         "Please ensure the model file is in the package or current directory."
     )
 
@@ -31,8 +37,64 @@ def get_default_model_path():
 from .trajectory_model import (
     generate_mouse_trajectory,
 )
+from .registry import ModelRegistry, default_registry, get_model
+from .sampling import FrozenGMM
+from .resample import POLLING_RATES, resample_batch, resample_to_rate
+from .prefetch import ShapePrefetchPool
+from .bank import BankGenerator, build_bank
+from .cache import TrajectoryCache, model_fingerprint
+
+# 训练相关接口延迟导入，控制器与生成路径不加载它们
+# Training exports are imported lazily, so the controller and generation paths do not load them
+_LAZY_EXPORTS = {
+    "LoadReport": ".traces",
+    "TraceSet": ".traces",
+    "load_traces": ".traces",
+    "build_dataset": ".dataset",
+    "load_dataset": ".dataset",
+    "FEATURE_VERSION": ".features",
+    "FeatureCache": ".features",
+    "extract_features": ".features",
+    "OnlineGMM": ".streaming",
+    "fit_streaming": ".streaming",
+}
 
 __all__ = [
     "generate_mouse_trajectory", 
-    "get_default_model_path"
-]
\ No newline at end of file
+    "get_default_model_path",
+    "ModelRegistry",
+    "default_registry",
+    "get_model",
+    "FrozenGMM",
+    "POLLING_RATES",
+    "resample_batch",
+    "resample_to_rate",
+    "ShapePrefetchPool",
+    "BankGenerator",
+    "build_bank",
+    "TrajectoryCache",
+    "model_fingerprint",
+    "LoadReport",
+    "TraceSet",
+    "load_traces",
+    "build_dataset",
+    "load_dataset",
+    "FEATURE_VERSION",
+    "FeatureCache",
+    "extract_features",
+    "OnlineGMM",
+    "fit_streaming",
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
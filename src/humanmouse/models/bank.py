@@ -0,0 +1,278 @@
+"""
+归一化轨迹库 - 预先采样、内存映射
+Normalized-trajectory bank - presampled and memory-mapped
+
+轨迹库用模型预先生成大量归一化轨迹（起点 (0,0)、终点 (1,0)）及其全局特征
+(D_hat, T_hat)，存为一个连续的 float32 数组加索引（紧凑文件格式，见
+``compact``）。``BankGenerator`` 随机取一行并做仿射映射，完全不运行 GMM。
+A bank holds many normalized trajectories (from (0,0) to (1,0)) generated by
+the model, together with their global features (D_hat, T_hat), stored as one
+contiguous float32 array plus an index (in the compact file format, see
+``compact``). ``BankGenerator`` picks a row at random and affine-maps it
+without running the GMM at all.
+
+数组 / Arrays:
+
+- ``data``  float32：每个 N 一段，每行为 ``[y_0 … y_{N-1}, D_hat, T_hat]``
+            One section per N; each row is ``[y_0 ... y_{N-1}, D_hat, T_hat]``.
+- ``index`` int64 (S, 3)：每段的 ``(N, 元素偏移 / element offset, 行数 / rows)``。
+- ``xs_<N>`` float32 (N,)、``v_w_<N>`` float64 (N-1,)：该 N 共用的 MJ 位移与速度权重
+            The MJ displacement and velocity weights shared by every row of that N.
+"""
+import math
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, NamedTuple, Sequence
+
+import numpy as np
+
+from ..core.interfaces import ITrajectoryGenerator
+from ..core.trajectory import Trajectory, TrajectoryPoint
+from .compact import create_compact, read_compact
+
+if TYPE_CHECKING:
+    from .trajectory_model import HumanMouseModel
+
+BANK_KIND = "trajectory_bank"
+BANK_VERSION = 1
+BANK_SUFFIX = ".hmb"
+
+
+def build_bank(model: "HumanMouseModel",
+               path: str | Path,
+               count: int,
+               sizes: Sequence[int] = (100,),
+               batch_size: int = 65536,
+               seed: int | None = None,
+               progress: Callable[[int, int], None] | None = None) -> dict:
+    """
+    用模型生成轨迹库文件，按批写入内存映射，内存占用与 count 无关
+    Build a bank file from the model, writing batch by batch through a memory
+    map so memory use does not grow with ``count``.
+
+    Parameters
+    ----------
+    count      : 每个 N 的轨迹条数 / Trajectories per N.
+    sizes      : 点数 N 的列表 / Point counts N.
+    batch_size : 每批采样条数 / Trajectories sampled per batch.
+    seed       : 随机种子 / Random seed.
+    progress   : 每批完成后调用 ``progress(done, total)`` / Called as ``progress(done, total)`` after each batch.
+
+    Returns
+    -------
+    header : 写入文件的元数据 / The metadata written to the file.
+    """
+    if not model._is_trained:
+        raise RuntimeError("Model is not trained yet. Please call fit() first.")
+    if count < 1:
+        raise ValueError("count must be at least 1")
+    sizes = sorted({int(N) for N in sizes})
+    if not sizes or sizes[0] < 2:
+        raise ValueError("sizes must contain point counts of at least 2")
+
+    index = np.zeros((len(sizes), 3), dtype="int64")
+    offset = 0
+    for s, N in enumerate(sizes):
+        index[s] = N, offset, count
+        offset += count * (N + 2)
+
+    specs = {"data": ("float32", (offset,)), "index": ("int64", index.shape)}
+    for N in sizes:
+        specs[f"xs_{N}"] = ("float32", (N,))
+        specs[f"v_w_{N}"] = ("float64", (N - 1,))
+    header = {"kind": BANK_KIND,
+              "bank_version": BANK_VERSION,
+              "count": count,
+              "sizes": sizes,
+              "model": {"K": model.K, "n_shape_pc": model.n_shape_pc,
+                        "n_mix_shape": model.n_mix_shape, "n_mix_global": model.n_mix_global}}
+    arrays = create_compact(path, header, specs)
+    arrays["index"][:] = index
+
+    rng = np.random.default_rng(seed)
+    gmm_shape, gmm_global = model._samplers()
+    done, total = 0, count * len(sizes)
+    for N, start, _ in index:
+        N = int(N)
+        shape_op = model._shape_operator(N)
+        arrays[f"xs_{N}"][:] = shape_op.xs_N
+        arrays[f"v_w_{N}"][:] = shape_op.v_w
+        rows = arrays["data"][start:start + count * (N + 2)].reshape(count, N + 2)
+        for lo in range(0, count, batch_size):
+            b = min(batch_size, count - lo)
+            # 1)‑3) 与 generate() 相同的采样与形状重建 / Same sampling and shape reconstruction as generate()
+            coeffs = gmm_shape.sample(b, rng).astype("float32")
+            globals_ = gmm_global.sample(b, rng)
+            rows[lo:lo + b, :N] = model._normalized_shapes(coeffs, N)[:, :, 1]
+            rows[lo:lo + b, N] = globals_[:, 0]
+            rows[lo:lo + b, N + 1] = globals_[:, 1]
+            done += b
+            if progress is not None:
+                progress(done, total)
+
+    for a in arrays.values():
+        if isinstance(a, np.memmap):
+            a.flush()
+    return header
+
+
+class _BankSection(NamedTuple):
+    """
+    某个 N 的行视图与预分配的临时缓冲
+    Row view and preallocated scratch buffers for one N.
+    """
+    N: int
+    rows: np.ndarray      # (count, N+2) float32 内存映射 / memory-mapped
+    xs: np.ndarray        # (N,) float32
+    xs_col: np.ndarray    # (N,1) xs 的视图 / view of xs
+    v_w: np.ndarray       # (N-1,) float64
+    tmp: np.ndarray       # (N,) float32 临时缓冲 / scratch
+    noise: np.ndarray     # (N,2) float32 临时缓冲 / scratch
+
+
+class BankGenerator(ITrajectoryGenerator):
+    """
+    从轨迹库随机取一行并映射到起终点的生成器
+    Generator that picks a random bank row and maps it onto the endpoints.
+
+    除输出数组外每次调用不做任何数组分配（``generate_arrays`` 传入 ``out_xy`` /
+    ``out_dt`` 时连输出也不分配）。临时缓冲属于实例，因此每个线程应使用
+    各自的 BankGenerator；多个实例共享同一份内存映射页。
+    No array is allocated per call beyond the output (and not even that when
+    ``generate_arrays`` gets ``out_xy`` / ``out_dt``). Scratch buffers belong
+    to the instance, so use one BankGenerator per thread; instances share the
+    same memory-mapped pages.
+    """
+
+    def __init__(self,
+                 bank: str | Path | None = None,
+                 amp_jitter_px: float = 1.0,
+                 seed: int | None = None):
+        """
+        Args:
+            bank          : 轨迹库文件路径 / Path to a bank file.
+            amp_jitter_px : 抖动幅度（像素）/ Jitter amplitude in pixels.
+            seed          : 选行与抖动的随机种子 / Seed for row selection and jitter.
+        """
+        self.amp_jitter_px = amp_jitter_px
+        self.header: dict = {}
+        self._sections: dict[int, _BankSection] = {}
+        self._rng = np.random.default_rng(seed)
+        if bank is not None:
+            self.set_model(bank)
+
+    def set_model(self, model: str | Path) -> None:
+        """
+        打开轨迹库文件（内存映射）
+        Open a bank file (memory-mapped).
+        """
+        header, arrays = read_compact(model, mmap=True)
+        if header.get("kind") != BANK_KIND:
+            raise ValueError(f"{model} is not a trajectory bank")
+        if header.get("bank_version") != BANK_VERSION:
+            raise ValueError(f"Unsupported trajectory bank version {header.get('bank_version')} in {model}")
+        sections = {}
+        for N, offset, count in arrays["index"].tolist():
+            xs = arrays[f"xs_{N}"]
+            sections[N] = _BankSection(N=N,
+                                       rows=arrays["data"][offset:offset + count * (N + 2)].reshape(count, N + 2),
+                                       xs=xs,
+                                       xs_col=xs[:, None],
+                                       v_w=arrays[f"v_w_{N}"],
+                                       tmp=np.empty(N, dtype="float32"),
+                                       noise=np.empty((N, 2), dtype="float32"))
+        self.header = header
+        self._sections = sections
+
+    @property
+    def sizes(self) -> list[int]:
+        """库中可用的点数 N / Point counts available in the bank."""
+        return sorted(self._sections)
+
+    def __len__(self) -> int:
+        return sum(len(s.rows) for s in self._sections.values())
+
+    def _section(self, N):
+        if not self._sections:
+            raise RuntimeError("No trajectory bank loaded. Please call set_model() first.")
+        if N is None:
+            return self._sections[self.sizes[0]]
+        try:
+            return self._sections[N]
+        except KeyError:
+            raise ValueError(f"Bank has no trajectories with N={N}, available: {self.sizes}") from None
+
+    def generate_arrays(self,
+                        start_point: tuple[float, float],
+                        end_point: tuple[float, float],
+                        N: int | None = None,
+                        amp_jitter_px: float | None = None,
+                        out_xy: np.ndarray | None = None,
+                        out_dt: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        随机取一行并映射到起终点
+        Pick a random row and map it onto the endpoints.
+
+        ``N`` 默认取 ``out_xy`` 的长度，否则为库中最小的 N。
+        ``N`` defaults to the length of ``out_xy``, else the smallest N in the bank.
+
+        Returns
+        -------
+        xy : (N,2)  float32  绝对坐标 / Absolute coordinates.
+        dt : (N,)   float64  相邻采样时间间隔（秒），dt[0]=0 / Sample intervals (seconds), dt[0]=0.
+        """
+        if N is None and out_xy is not None:
+            N = len(out_xy)
+        sec = self._section(N)
+        N = sec.N
+        if out_xy is None:
+            out_xy = np.empty((N, 2), dtype="float32")
+        if out_dt is None:
+            out_dt = np.empty(N, dtype="float64")
+        amp = self.amp_jitter_px if amp_jitter_px is None else amp_jitter_px
+
+        row = sec.rows[int(self._rng.integers(len(sec.rows)))]
+        y = row[:N]
+        D_hat, T_hat = float(row[N]), float(row[N + 1])
+        sx, sy = float(start_point[0]), float(start_point[1])
+        vx, vy = float(end_point[0]) - sx, float(end_point[1]) - sy
+        dist = math.hypot(vx, vy)
+
+        # 5) 仿射映射：旋转并缩放 (xs, y)，再平移到起点
+        # 5) Affine mapping: rotate and scale (xs, y), then translate to the start
+        ox, oy, tmp = out_xy[:, 0], out_xy[:, 1], sec.tmp
+        np.multiply(sec.xs, vx, out=ox)
+        np.multiply(y, vy, out=tmp)
+        ox -= tmp
+        ox += sx
+        np.multiply(sec.xs, vy, out=oy)
+        np.multiply(y, vx, out=tmp)
+        oy += tmp
+        oy += sy
+
+        # 6) 距离‑时间自适应缩放 / Distance-time adaptive scaling
+        scale = T_hat * (dist / D_hat if D_hat > 1e-3 else 1.0)
+        out_dt[0] = 0.0
+        np.multiply(sec.v_w, scale, out=out_dt[1:])
+
+        # 7) MJ 加权抖动 / MJ-weighted jitter
+        if amp:
+            noise = sec.noise
+            self._rng.standard_normal(dtype=np.float32, out=noise)
+            noise *= np.float32(amp)
+            noise *= sec.xs_col
+            out_xy += noise
+        return out_xy, out_dt
+
+    def generate(self,
+                 start_point: tuple[float, float],
+                 end_point: tuple[float, float],
+                 **kwargs) -> Trajectory:
+        """
+        生成轨迹（ITrajectoryGenerator 接口）；kwargs 同 ``generate_arrays``
+        Generate a trajectory (ITrajectoryGenerator interface); kwargs as for ``generate_arrays``.
+        """
+        xy, dt = self.generate_arrays(start_point, end_point, **kwargs)
+        t = np.cumsum(dt)
+        points = [TrajectoryPoint(x=float(x), y=float(y), timestamp=float(ts))
+                  for (x, y), ts in zip(xy.tolist(), t.tolist())]
+        return Trajectory(points=points, metadata={"source": BANK_KIND})
@@ -0,0 +1,198 @@
+"""
+多进程批量生成轨迹
+Multi-process bulk trajectory generation
+
+把 ``count`` 条轨迹分成固定大小的块，每块由进程池中的一个工作进程整批生成并
+写成一个 npz 分片；每个工作进程只加载一次模型。默认第 c 块使用
+``trajectory_rng(seed, c)`` 随机流（包括随机起终点），因此在 seed 与
+``chunk_size`` 相同时，输出与进程数无关；但改变 ``chunk_size`` 会改变输出，
+第 i 条也不等于 ``generate(base_seed=seed, index=i)``。``per_index=True`` 时
+第 i 条使用 (seed, i) 的随机流，与 ``generate(base_seed=seed, index=i)`` 逐位
+一致且与分块无关，但整批采样慢约 3 倍。
+``count`` trajectories are split into fixed-size chunks; each chunk is
+generated as one batch by a process-pool worker and written as one npz shard,
+and every worker loads the model only once. By default chunk c draws from
+``trajectory_rng(seed, c)`` (random endpoints included), so for the same seed
+and ``chunk_size`` the output does not depend on the number of jobs; changing
+``chunk_size`` changes the output, and item i is not
+``generate(base_seed=seed, index=i)``. With ``per_index=True`` item i uses the
+stream for (seed, i), so it is bit-identical to
+``generate(base_seed=seed, index=i)`` for any chunking, at about 3x the cost
+of the batched sampling.
+
+输出目录 / Output directory:
+
+- ``shard_<c>.npz``：``xy`` (M,N,2) float32、``dt`` (M,N) float64、``starts`` / ``ends`` (M,2)
+- ``manifest.json``：数量、点数、种子、随机流模式与分片列表 / Counts, point count, seed, stream mode and the shard list.
+"""
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional, Tuple, Union
+
+import numpy as np
+
+from .registry import get_model
+from .sampling import trajectory_rng
+
+PathLike = Union[str, os.PathLike]
+
+MANIFEST_NAME = "manifest.json"
+
+
+def load_pairs(path: PathLike) -> np.ndarray:
+    """
+    读取起终点对：``.npy`` 或逗号分隔的 ``x0,y0,x1,y1`` 文本（可带表头）
+    Read start/end pairs from a ``.npy`` file or comma-separated
+    ``x0,y0,x1,y1`` text (a header line is allowed).
+
+    Returns
+    -------
+    pairs : (P, 4) float64
+    """
+    path = Path(path)
+    if path.suffix == ".npy":
+        pairs = np.load(path, allow_pickle=False)
+    else:
+        pairs = np.genfromtxt(path, delimiter=",", ndmin=2)
+        # 表头等无法解析的行为 NaN / Header and other unparsable lines come back as NaN
+        pairs = pairs[~np.isnan(pairs).any(axis=1)]
+    pairs = np.asarray(pairs, dtype="float64")
+    if pairs.ndim != 2 or pairs.shape[1] != 4 or len(pairs) == 0:
+        raise ValueError(f"{path} must contain rows of x0,y0,x1,y1, got shape {pairs.shape}")
+    return pairs
+
+
+def _endpoint_rng(seed, lo):
+    """
+    逐条模式下随机起终点的流：seed 的根 Philox 流，第 i 条用第 i 个计数块，与分块无关
+    Endpoint stream for per-index mode: the root Philox stream of ``seed``,
+    where trajectory i uses counter block i, independent of the chunking.
+    """
+    bit_generator = np.random.Philox(np.random.SeedSequence(seed))
+    bit_generator.advance(lo)
+    return np.random.Generator(bit_generator)
+
+
+def _write_chunk(model_path, out_dir, chunk, lo, hi, rows, rect, N, amp_jitter_px, seed, per_index):
+    """
+    生成并写出第 chunk 块（在工作进程中运行）；rows 为本块的起终点对，None 表示随机
+    Generate and write chunk ``chunk`` (runs in a worker process); ``rows``
+    holds this chunk's start/end pairs, None for random endpoints.
+    """
+    model = get_model(model_path)
+    M = hi - lo
+    rng = _endpoint_rng(seed, lo) if per_index else trajectory_rng(seed, chunk)
+    if rows is not None:
+        starts, ends = rows[:, :2], rows[:, 2:]
+    else:
+        x0, y0, x1, y1 = rect
+        points = rng.uniform((x0, y0, x0, y0), (x1, y1, x1, y1), size=(M, 4))
+        starts, ends = points[:, :2], points[:, 2:]
+    if per_index:
+        xy, dt = model.generate_many(starts, ends, N=N, amp_jitter_px=amp_jitter_px,
+                                     base_seed=seed, indices=np.arange(lo, hi))
+    else:
+        xy, dt = model.generate_many(starts, ends, N=N, amp_jitter_px=amp_jitter_px, rng=rng)
+
+    name = f"shard_{chunk:05d}.npz"
+    tmp = Path(out_dir) / (name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.savez(f, xy=xy, dt=dt,
+                 starts=starts.astype("float32"), ends=ends.astype("float32"))
+    os.replace(tmp, Path(out_dir) / name)
+    return name, M
+
+
+def _preload(model_path):
+    """工作进程初始化：加载一次模型 / Worker initializer: load the model once."""
+    get_model(model_path)
+
+
+def generate_bulk(model_path: PathLike,
+                  out_dir: PathLike,
+                  count: int,
+                  pairs: Optional[np.ndarray] = None,
+                  rect: Tuple[float, float, float, float] = (0, 0, 1920, 1080),
+                  N: int = 120,
+                  amp_jitter_px: float = 1.0,
+                  seed: Optional[int] = None,
+                  jobs: int = 1,
+                  chunk_size: int = 10000,
+                  per_index: bool = False,
+                  progress: Optional[Callable[[int, int], None]] = None) -> dict:
+    """
+    批量生成 ``count`` 条轨迹，写成 npz 分片与 ``manifest.json``
+    Generate ``count`` trajectories as npz shards plus a ``manifest.json``.
+
+    Parameters
+    ----------
+    pairs      : (P, 4) 起终点对，第 i 条轨迹用 ``pairs[i % P]``；None 表示在 ``rect`` 内随机采样
+                 Start/end pairs, trajectory i uses ``pairs[i % P]``; None samples them inside ``rect``.
+    rect       : 随机起终点的屏幕矩形 (x0, y0, x1, y1) / Screen rectangle (x0, y0, x1, y1) for random endpoints.
+    seed       : 基础种子，None 表示取新熵（写入清单）/ Base seed, None draws fresh entropy (recorded in the manifest).
+    jobs       : 工作进程数，1 表示在当前进程中生成 / Worker processes, 1 generates in the current process.
+    chunk_size : 每个分片的轨迹条数；默认模式下也决定随机流，改变它会改变输出
+                 Trajectories per shard; by default it also keys the random streams, so changing it changes the output.
+    per_index  : 第 i 条与 ``generate(base_seed=seed, index=i)`` 逐位一致，约慢 3 倍
+                 Make item i bit-identical to ``generate(base_seed=seed, index=i)``, about 3x slower.
+    progress   : 每写完一个分片调用 ``progress(done, count)`` / Called as ``progress(done, count)`` after each shard.
+
+    Returns
+    -------
+    manifest : 清单内容，另含 ``seconds`` 与 ``rate`` (条/秒) / The manifest plus ``seconds`` and ``rate`` (trajectories/s).
+    """
+    if count < 1:
+        raise ValueError("count must be at least 1")
+    if jobs < 1 or chunk_size < 1:
+        raise ValueError("jobs and chunk_size must be at least 1")
+    model_path = str(model_path)
+    seed = seed if seed is not None else np.random.SeedSequence().entropy
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    def chunks():
+        # 每块只带自己的起终点对 / Each chunk carries only its own pairs
+        for c, lo in enumerate(range(0, count, chunk_size)):
+            hi = min(lo + chunk_size, count)
+            rows = pairs[np.arange(lo, hi) % len(pairs)] if pairs is not None else None
+            yield c, lo, hi, rows
+
+    args = (tuple(rect), N, amp_jitter_px, seed, per_index)
+
+    t0 = time.perf_counter()
+    shards, done = [], 0
+    if jobs == 1:
+        results = (_write_chunk(model_path, out_dir, c, lo, hi, rows, *args)
+                   for c, lo, hi, rows in chunks())
+        for name, M in results:
+            shards.append(name)
+            done += M
+            if progress is not None:
+                progress(done, count)
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_preload,
+                                 initargs=(model_path,)) as pool:
+            futures = [pool.submit(_write_chunk, model_path, out_dir, c, lo, hi, rows, *args)
+                       for c, lo, hi, rows in chunks()]
+            for future in futures:
+                name, M = future.result()
+                shards.append(name)
+                done += M
+                if progress is not None:
+                    progress(done, count)
+    seconds = time.perf_counter() - t0
+
+    manifest = {"count": count,
+                "N": N,
+                "amp_jitter_px": amp_jitter_px,
+                "seed": seed,
+                "chunk_size": chunk_size,
+                "per_index": per_index,
+                "pairs": "file" if pairs is not None else {"rect": list(rect)},
+                "shards": shards}
+    with open(out_dir / MANIFEST_NAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return {**manifest, "seconds": seconds, "rate": count / max(seconds, 1e-9)}
@@ -0,0 +1,309 @@
+"""
+有种子轨迹的结果缓存
+Result cache for seeded trajectories
+
+给定种子时 ``HumanMouseModel.generate`` 是纯函数，结果可以按
+(模型指纹, 起点, 终点, N, amp_jitter_px, seed, rng_mode) 记忆。缓存是按字节计量的
+内存 LRU，可选地为每个模型指纹在磁盘上保存一个 npz 分片。
+With a seed, ``HumanMouseModel.generate`` is a pure function, so its results
+can be memoized by (model fingerprint, start, end, N, amp_jitter_px, seed,
+rng_mode). The cache is an in-memory LRU with byte-size accounting and an
+optional on-disk store holding one npz shard per model fingerprint.
+"""
+import hashlib
+import json
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Tuple, Union
+
+import numpy as np
+
+from .resample import resample_to_rate
+
+if TYPE_CHECKING:
+    from .trajectory_model import HumanMouseModel
+
+PathLike = Union[str, os.PathLike]
+
+_fingerprints: "weakref.WeakKeyDictionary[HumanMouseModel, str]" = weakref.WeakKeyDictionary()
+_fingerprint_lock = threading.Lock()
+
+
+def model_fingerprint(model: "HumanMouseModel") -> str:
+    """
+    模型生成参数的 SHA-256（同一模型的 .pkl 与 .hmc 指纹相同）
+    SHA-256 of the model's generation parameters; a .pkl model and its .hmc
+    export share the same fingerprint.
+    """
+    with _fingerprint_lock:
+        fingerprint = _fingerprints.get(model)
+    if fingerprint is not None:
+        return fingerprint
+    if not model._is_trained:
+        raise RuntimeError("Model is not trained yet. Please call fit() first.")
+
+    h = hashlib.sha256(json.dumps([model.K, model.n_shape_pc,
+                                   model.n_mix_shape, model.n_mix_global]).encode())
+    arrays = list(model._shape_basis())
+    for gmm in model._samplers():
+        arrays += [gmm.weights, gmm.means, gmm.cholesky]
+    for a in arrays:
+        a = np.ascontiguousarray(a, dtype="float64")
+        h.update(str(a.shape).encode())
+        h.update(a.tobytes())
+    fingerprint = h.hexdigest()[:16]
+    with _fingerprint_lock:
+        _fingerprints[model] = fingerprint
+    return fingerprint
+
+
+def _forget_fingerprint(model: "HumanMouseModel") -> None:
+    """重新训练后丢弃记住的指纹 / Drop the memoized fingerprint after the model is re-trained."""
+    with _fingerprint_lock:
+        _fingerprints.pop(model, None)
+
+
+class TrajectoryCache:
+    """
+    有种子轨迹的 LRU 缓存，按字节限制容量，可选磁盘分片
+    LRU cache of seeded trajectories, bounded in bytes, with optional on-disk shards.
+
+    缓存的数组为只读，命中时直接返回，不做拷贝。``rate_hz`` 重定时在查找之后
+    进行，因此不同轮询率共用同一条缓存结果。
+    Cached arrays are read-only and returned without copying on a hit.
+    ``rate_hz`` re-timing happens after the lookup, so different polling rates
+    share one cached result.
+
+    使用磁盘分片时，尚未写盘就被淘汰的结果会保留到下一次 ``save()``；这些结果
+    超过 ``max_bytes`` 时自动写盘。
+    With on-disk shards, results evicted before they were saved are kept for
+    the next ``save()``, which runs automatically once they exceed ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes: int = 100 * 2**20, directory: Optional[PathLike] = None):
+        """
+        Args:
+            max_bytes : 内存中缓存数组的总字节上限 / Upper bound on the bytes of cached arrays held in memory.
+            directory : 磁盘分片目录，None 表示只用内存 / Directory for on-disk shards, None for memory only.
+        """
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+        self.max_bytes = max_bytes
+        self.directory = Path(directory) if directory is not None else None
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+
+        self._entries: OrderedDict[Tuple, Tuple[np.ndarray, np.ndarray]] = OrderedDict()
+        self._loaded: set = set()   # 已读入磁盘分片的指纹 / Fingerprints whose shard has been read
+        self._dirty: set = set()    # 尚未写盘的键 / Keys whose results are not yet on disk
+        self._evicted: dict = {}    # 未写盘即被淘汰的结果 / Results evicted before they were saved
+        self._evicted_bytes = 0
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_config(cls, config, directory: Optional[PathLike] = None) -> Optional["TrajectoryCache"]:
+        """
+        按配置创建缓存；``enable_caching`` 为假时返回 None
+        Create a cache from a configuration; returns None when ``enable_caching`` is false.
+
+        ``config`` 可以是 ``SystemConfig``，也可以是带 ``system`` 属性的
+        ``ConfigManager``，只读取 ``enable_caching`` 与 ``cache_size_mb``。
+        ``config`` may be a ``SystemConfig`` or a ``ConfigManager`` with a
+        ``system`` attribute; only ``enable_caching`` and ``cache_size_mb`` are read.
+        """
+        system = getattr(config, "system", config)
+        if not system.enable_caching:
+            return None
+        return cls(max_bytes=int(system.cache_size_mb * 2**20), directory=directory)
+
+    # ----------------- 生成 / Generation -----------------
+
+    def generate(self,
+                 model: "HumanMouseModel",
+                 start: Tuple[float, float],
+                 end: Tuple[float, float],
+                 N: int = 120,
+                 amp_jitter_px: float = 1.0,
+                 seed: Optional[int] = None,
+                 rng_mode: Optional[str] = None,
+                 rate_hz: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        与 ``HumanMouseModel.generate`` 相同的签名与返回值；无种子时不缓存
+        Same signature and return values as ``HumanMouseModel.generate``
+        (plus the model); calls without a seed are not cached.
+        """
+        if seed is None:
+            return model.generate(start, end, N=N, amp_jitter_px=amp_jitter_px,
+                                  rng_mode=rng_mode, rate_hz=rate_hz)
+        fingerprint = model_fingerprint(model)
+        key = (fingerprint, rng_mode or model.rng_mode,
+               float(start[0]), float(start[1]), float(end[0]), float(end[1]),
+               int(N), float(amp_jitter_px), int(seed))
+
+        entry = self.get(key)
+        if entry is None:
+            xy, dt = model.generate(start, end, N=N, amp_jitter_px=amp_jitter_px,
+                                    seed=seed, rng_mode=rng_mode)
+            entry = self.put(key, xy, dt)
+        xy, dt = entry
+        if rate_hz is not None:
+            return resample_to_rate(xy, dt, rate_hz)
+        return xy, dt
+
+    # ----------------- LRU -----------------
+
+    def get(self, key: Tuple) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        查找缓存项并标记为最近使用；``key[0]`` 为模型指纹
+        Look up an entry and mark it most recently used; ``key[0]`` is the model fingerprint.
+        """
+        with self._lock:
+            if key[0] not in self._loaded:
+                self._load_shard(key[0])
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Tuple, xy: np.ndarray, dt: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        存入结果（转为只读），必要时淘汰最久未用的项；返回存入的数组
+        Store a result (made read-only), evicting least recently used entries
+        as needed; returns the stored arrays.
+        """
+        entry = self._insert(key, xy, dt)
+        with self._lock:
+            if key in self._entries and self.directory is not None:
+                self._dirty.add(key)
+        return entry
+
+    def _insert(self, key, xy, dt):
+        xy = np.array(xy, dtype="float32")
+        dt = np.array(dt, dtype="float64")
+        xy.setflags(write=False)
+        dt.setflags(write=False)
+        size = xy.nbytes + dt.nbytes
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[0].nbytes + old[1].nbytes
+            if size > self.max_bytes:
+                # 单项超过上限：不缓存 / Larger than the whole budget: not cached
+                return xy, dt
+            self._entries[key] = (xy, dt)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes:
+                old_key, (old_xy, old_dt) = self._entries.popitem(last=False)
+                self.nbytes -= old_xy.nbytes + old_dt.nbytes
+                if old_key in self._dirty:
+                    # 未写盘的结果留到下次写盘 / Unsaved results are kept for the next save
+                    self._evicted[old_key] = (old_xy, old_dt)
+                    self._evicted_bytes += old_xy.nbytes + old_dt.nbytes
+            if self._evicted_bytes > self.max_bytes:
+                self.save()
+        return xy, dt
+
+    def clear(self) -> None:
+        """清空内存中的缓存（不删除磁盘分片）/ Empty the in-memory cache (shards on disk are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._loaded.clear()
+            self._dirty.clear()
+            self._evicted.clear()
+            self._evicted_bytes = 0
+            self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """
+        命中/未命中次数、条目数与占用字节
+        Hit/miss counts, entry count and bytes used.
+        """
+        total = self.hits + self.misses
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes}
+
+    # ----------------- 磁盘分片 / On-disk shards -----------------
+
+    def _shard_path(self, fingerprint: str) -> Path:
+        return self.directory / f"{fingerprint}.npz"
+
+    def _read_shard(self, fingerprint):
+        """读取分片为 {key: (xy, dt)} / Read a shard as {key: (xy, dt)}."""
+        path = self._shard_path(fingerprint)
+        if not path.exists():
+            return {}
+        with np.load(path, allow_pickle=False) as z:
+            params, seeds, modes = z["params"], z["seeds"], z["modes"]
+            xy, dt, offsets = z["xy"], z["dt"], z["offsets"]
+        entries = {}
+        for i, (sx, sy, ex, ey, N, amp) in enumerate(params.tolist()):
+            key = (fingerprint, str(modes[i]), sx, sy, ex, ey, int(N), amp, int(seeds[i]))
+            lo, hi = offsets[i], offsets[i + 1]
+            entries[key] = (xy[lo:hi], dt[lo:hi])
+        return entries
+
+    def _load_shard(self, fingerprint):
+        self._loaded.add(fingerprint)
+        if self.directory is None:
+            return
+        for key, (xy, dt) in self._read_shard(fingerprint).items():
+            if key not in self._entries:
+                self._insert(key, xy, dt)
+
+    def save(self) -> None:
+        """
+        把新结果（包括已被淘汰的）并入各自指纹的磁盘分片（原子替换）
+        Merge new results, including evicted ones, into the on-disk shard of
+        their fingerprint (atomic replace).
+        """
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            for fingerprint in sorted({key[0] for key in self._dirty}):
+                entries = self._read_shard(fingerprint)
+                entries.update((k, v) for k, v in self._evicted.items() if k[0] == fingerprint)
+                entries.update((k, v) for k, v in self._entries.items() if k[0] == fingerprint)
+                self._write_shard(fingerprint, entries)
+            self._dirty.clear()
+            self._evicted.clear()
+            self._evicted_bytes = 0
+
+    def _write_shard(self, fingerprint, entries):
+        keys = list(entries)
+        counts = [len(entries[k][1]) for k in keys]
+        offsets = np.zeros(len(keys) + 1, dtype="int64")
+        np.cumsum(counts, out=offsets[1:])
+        arrays = {
+            "params": np.array([k[2:8] for k in keys], dtype="float64").reshape(-1, 6),
+            "seeds": np.array([str(k[8]) for k in keys], dtype="U"),
+            "modes": np.array([k[1] for k in keys], dtype="U"),
+            "offsets": offsets,
+            "xy": np.concatenate([entries[k][0] for k in keys]) if keys else np.empty((0, 2), "float32"),
+            "dt": np.concatenate([entries[k][1] for k in keys]) if keys else np.empty(0, "float64"),
+        }
+        path = self._shard_path(fingerprint)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp, path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.save()
@@ -0,0 +1,157 @@
+"""
+紧凑模型文件格式 - 无 pickle、可内存映射
+Compact model file format - pickle-free and memory-mappable
+
+文件布局 / File layout::
+
+    MAGIC (8 字节 / bytes) | 头长度 / header length (uint64, little-endian)
+    JSON 头 / JSON header (空格填充到 64 字节对齐 / space-padded to 64-byte alignment)
+    数组数据 / array data (每个数组按 64 字节对齐 / each array 64-byte aligned)
+
+JSON 头包含 ``format_version``、模型超参数，以及每个数组的 dtype / shape /
+文件内偏移。数组以只读 ``np.memmap`` 视图返回，多个工作进程共享同一份页缓存。
+The JSON header holds ``format_version``, the model hyper-parameters and the
+dtype / shape / file offset of every array. Arrays are returned as read-only
+``np.memmap`` views, so worker processes share the same page-cache pages.
+"""
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Tuple, Union
+
+import numpy as np
+
+MAGIC = b"HMMODEL\x00"
+FORMAT_VERSION = 1
+COMPACT_SUFFIX = ".hmc"
+_ALIGN = 64
+
+PathLike = Union[str, os.PathLike]
+
+
+def _aligned(n: int) -> int:
+    return -(-n // _ALIGN) * _ALIGN
+
+
+def is_compact_file(path: PathLike) -> bool:
+    """
+    按魔数判断是否为紧凑格式
+    Tell whether ``path`` is a compact model file by its magic bytes.
+    """
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except (OSError, TypeError):
+        return False
+
+
+def _write_header(f, header: dict, specs: Dict[str, Tuple[np.dtype, tuple]]) -> Dict[str, dict]:
+    """
+    写入魔数与 JSON 头，返回每个数组的布局（绝对偏移）
+    Write the magic and JSON header; return each array's layout (absolute offsets).
+    """
+    layout, offset = {}, 0
+    for name, (dtype, shape) in specs.items():
+        dtype = np.dtype(dtype)
+        layout[name] = {"dtype": dtype.str, "shape": [int(s) for s in shape], "offset": offset}
+        offset = _aligned(offset + dtype.itemsize * int(np.prod(shape, dtype=np.int64)))
+
+    header = dict(header, format_version=FORMAT_VERSION, arrays=layout)
+    # 数组偏移依赖头长度，先估算再写入绝对偏移
+    # Array offsets depend on the header length: size the header, then make offsets absolute
+    prefix = len(MAGIC) + 8
+    body = json.dumps(header).encode("utf-8")
+    data_start = _aligned(prefix + len(body) + 32 * len(layout))
+    for entry in layout.values():
+        entry["offset"] += data_start
+    body = json.dumps(header).encode("utf-8")
+    if prefix + len(body) > data_start:
+        raise ValueError("Compact header does not fit in the reserved space")
+    body = body.ljust(data_start - prefix, b" ")
+
+    f.write(MAGIC)
+    f.write(struct.pack("<Q", len(body)))
+    f.write(body)
+    if layout:
+        # 把文件扩展到最后一个数组末尾 / Extend the file to the end of the last array
+        entry = layout[list(layout)[-1]]
+        end = entry["offset"] + np.dtype(entry["dtype"]).itemsize * int(np.prod(entry["shape"], dtype=np.int64))
+        f.truncate(end)
+    return layout
+
+
+def write_compact(path: PathLike, header: dict, arrays: Dict[str, np.ndarray]) -> None:
+    """
+    写入紧凑模型文件
+    Write a compact model file.
+
+    Args:
+        header: 可 JSON 序列化的元数据 / JSON-serialisable metadata.
+        arrays: 名称 → 数组 / Name -> array.
+    """
+    arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+    with open(path, "wb") as f:
+        layout = _write_header(f, header, {name: (a.dtype, a.shape) for name, a in arrays.items()})
+        for name, a in arrays.items():
+            f.seek(layout[name]["offset"])
+            f.write(a.tobytes())
+
+
+def create_compact(path: PathLike,
+                   header: dict,
+                   specs: Dict[str, Tuple[np.dtype, tuple]]) -> Dict[str, np.memmap]:
+    """
+    预先分配紧凑文件并返回可写的内存映射数组，用于分块写入放不进内存的数据
+    Preallocate a compact file and return writable memory-mapped arrays, for
+    writing data that does not fit in memory chunk by chunk.
+
+    Args:
+        header: 可 JSON 序列化的元数据 / JSON-serialisable metadata.
+        specs: 名称 → (dtype, shape) / Name -> (dtype, shape).
+    """
+    with open(path, "wb") as f:
+        layout = _write_header(f, header, specs)
+    arrays = {}
+    for name, entry in layout.items():
+        shape = tuple(entry["shape"])
+        if int(np.prod(shape, dtype=np.int64)) == 0:
+            arrays[name] = np.empty(shape, dtype=entry["dtype"])
+            continue
+        arrays[name] = np.memmap(path, dtype=entry["dtype"], mode="r+",
+                                 offset=entry["offset"], shape=shape)
+    return arrays
+
+
+def read_compact(path: PathLike, mmap: bool = True) -> Tuple[dict, Dict[str, np.ndarray]]:
+    """
+    读取紧凑模型文件，返回 (header, arrays)
+    Read a compact model file and return (header, arrays).
+
+    Args:
+        mmap: True 时数组为只读内存映射视图，否则读入内存
+              Return read-only memory-mapped views when True, in-memory copies otherwise.
+    """
+    path = Path(path)
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a compact model file")
+        (length,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(length).decode("utf-8"))
+
+    version = header.get("format_version")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported compact model format version {version} in {path}")
+
+    if mmap:
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    else:
+        buffer = np.fromfile(path, dtype=np.uint8)
+    arrays = {}
+    for name, entry in header.pop("arrays").items():
+        dtype = np.dtype(entry["dtype"])
+        shape = tuple(entry["shape"])
+        count = int(np.prod(shape, dtype=np.int64))
+        start = entry["offset"]
+        arrays[name] = buffer[start:start + count * dtype.itemsize].view(dtype).reshape(shape)
+    return header, arrays
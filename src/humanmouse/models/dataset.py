@@ -0,0 +1,274 @@
+"""
+合并的二进制训练数据集
+Consolidated binary training dataset
+
+把 CSV 目录压缩为一个可内存映射的目录：
+Compacts a CSV directory into one memory-mappable directory:
+
+- ``xy-<g>.npy``      (P, 2) float32 全部点 / All points.
+- ``dt-<g>.npy``      (P,) float32 时间间隔 / Time intervals.
+- ``offsets-<g>.npy`` (M+1,) int64 第 i 条轨迹是 ``[offsets[i], offsets[i+1])`` / Trajectory i is ``[offsets[i], offsets[i+1])``.
+- ``files-<g>.json``  每个源文件的名称、大小、mtime、sha256 与所在轨迹或跳过原因
+                      Name, size, mtime, sha256 and trajectory index or skip reason of every source file.
+- ``manifest.json``   当前代数 ``g`` 下的文件名、计数与跳过的文件；不含逐文件记录，
+                      因此打开数据集的开销与文件数无关 / The current generation ``g``'s
+                      file names, counts and skipped files; it holds no per-file
+                      records, so opening a dataset costs the same for any file count.
+
+重新构建时只读取新增或变化的文件：大小与 mtime 不变的文件直接复用，其余
+文件重新读取，内容哈希不变时同样复用。新数组先以下一代文件名写出，清单替换
+之后才删除旧代，因此中途失败不会破坏已有数据集。
+A rebuild only ingests new or changed files: files with unchanged size and
+mtime are reused as-is, the rest are re-read and still reused when their
+content hash is unchanged. New arrays are written under the next generation's
+file names and the old generation is removed only after the manifest has been
+replaced, so a failed build leaves the existing dataset intact.
+"""
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from .traces import LoadReport, PathLike, TraceSet, map_files, parse_trace
+
+MANIFEST_NAME = "manifest.json"
+DATASET_FORMAT = "humanmouse-dataset"
+DATASET_VERSION = 2
+
+_ARRAYS = ("xy", "dt", "offsets")
+
+
+def is_dataset(path: PathLike) -> bool:
+    """路径是否为 ``build_dataset`` 写出的数据集 / Whether ``path`` is a dataset written by ``build_dataset``."""
+    manifest = Path(path) / MANIFEST_NAME
+    if not manifest.is_file():
+        return False
+    try:
+        return _read_manifest(Path(path)).get("format") == DATASET_FORMAT
+    except ValueError:
+        return False
+
+
+def _read_manifest(out_dir: Path) -> dict:
+    with open(out_dir / MANIFEST_NAME, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _read_file_index(out_dir: Path, manifest: dict) -> list:
+    with open(out_dir / manifest["file_index"], encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(path: Path, obj) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, indent=1)
+    os.replace(tmp, path)
+
+
+def _ingest(path: str):
+    """
+    读取、哈希并解析一个文件（可在工作进程中运行）
+    Read, hash and parse one file (may run in a worker process).
+
+    Returns ``(sha256, (xy, dt))``，解析失败时第二项为原因字符串 / or a reason string on failure.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        return None, str(e)
+    sha = hashlib.sha256(data).hexdigest()
+    try:
+        return sha, parse_trace(data)
+    except ValueError as e:
+        return sha, str(e)
+
+
+def load_dataset(path: PathLike, mmap: bool = True,
+                 names: bool = True) -> Tuple[TraceSet, LoadReport]:
+    """
+    打开数据集
+    Open a dataset.
+
+    Parameters
+    ----------
+    path : 数据集目录 / Dataset directory.
+    mmap  : 以只读内存映射方式打开数组 / Open the arrays as read-only memory maps.
+    names : 读取逐文件记录以填充 ``TraceSet.names``；为假时内存占用与文件数无关
+            Read the per-file records to fill ``TraceSet.names``; when false,
+            memory use does not depend on the number of files.
+
+    Returns
+    -------
+    traces : 数据集中的有效轨迹 / The valid trajectories in the dataset.
+    report : 构建时记录的校验结果 / Validation results recorded at build time.
+    """
+    t0 = time.perf_counter()
+    path = Path(path)
+    if not is_dataset(path):
+        raise ValueError(f"{path} is not a trajectory dataset")
+    manifest = _read_manifest(path)
+    if manifest.get("version") != DATASET_VERSION:
+        raise ValueError(f"Unsupported dataset version {manifest.get('version')}")
+
+    xy, dt, offsets = (np.load(path / manifest["arrays"][k], mmap_mode="r" if mmap else None,
+                               allow_pickle=False) for k in _ARRAYS)
+    if len(offsets) != manifest["count"] + 1 or offsets[-1] != len(xy) or len(xy) != len(dt):
+        raise ValueError(f"Dataset {path} is inconsistent with its manifest")
+    trace_names = None
+    if names:
+        trace_names = [e["name"] for e in _read_file_index(path, manifest) if e["trajectory"] is not None]
+
+    report = LoadReport(files=manifest["files"], loaded=manifest["count"],
+                        skipped=[tuple(s) for s in manifest["skipped"]],
+                        seconds=time.perf_counter() - t0)
+    return TraceSet(xy, dt, offsets, trace_names), report
+
+
+def build_dataset(csv_dir: PathLike,
+                  out_dir: PathLike,
+                  jobs: int = 1,
+                  progress: Optional[Callable[[int, int], None]] = None) -> dict:
+    """
+    把 CSV 目录构建（或增量更新）为数据集
+    Build (or incrementally update) a dataset from a CSV directory.
+
+    Parameters
+    ----------
+    csv_dir  : 轨迹 CSV 目录 / Directory of trajectory CSVs.
+    out_dir  : 数据集目录，已存在时增量更新 / Dataset directory, updated incrementally if it exists.
+    jobs     : 读取变化文件的工作进程数 / Worker processes used to read changed files.
+    progress : 每读完一个文件调用 ``progress(done, total)`` / Called as ``progress(done, total)`` per file read.
+
+    Returns
+    -------
+    summary : ``files``、复用的 ``reused``、新增或变化的 ``ingested``、``removed``、
+              ``count``、``points``、``skipped`` 与 ``seconds``
+              File counts (``reused`` unchanged, ``ingested`` new or changed, ``removed``),
+              trajectory and point counts, skipped files and wall time.
+    """
+    if jobs < 1:
+        raise ValueError("jobs must be at least 1")
+    csv_dir, out_dir = Path(csv_dir), Path(out_dir)
+    files = sorted(csv_dir.glob("*.csv"))
+    if not files:
+        raise ValueError(f"No CSV files found in directory {csv_dir}")
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter()
+    old, old_traces, old_entries = None, None, {}
+    # 其他版本的数据集整体重建 / Datasets of another version are rebuilt from scratch
+    if is_dataset(out_dir) and _read_manifest(out_dir).get("version") == DATASET_VERSION:
+        old_traces, _ = load_dataset(out_dir, names=False)
+        old = _read_manifest(out_dir)
+        old_entries = {e["name"]: e for e in _read_file_index(out_dir, old)}
+
+    # 大小与 mtime 不变的文件不读取 / Files with unchanged size and mtime are not read
+    stats = [fp.stat() for fp in files]
+    entries, pending = [], []
+    for fp, st in zip(files, stats):
+        prev = old_entries.get(fp.name)
+        if prev is not None and prev["size"] == st.st_size and prev["mtime_ns"] == st.st_mtime_ns:
+            entries.append(dict(prev))
+        else:
+            entries.append(None)
+            pending.append(len(entries) - 1)
+
+    # 重新读取其余文件；内容未变时仍复用 / Re-read the rest; reuse them when the content is unchanged
+    parsed, ingested = {}, 0
+    results = map_files(_ingest, [str(files[i]) for i in pending], jobs)
+    for done, (i, (sha, result)) in enumerate(zip(pending, results), 1):
+        fp, st = files[i], stats[i]
+        prev = old_entries.get(fp.name)
+        entry = {"name": fp.name, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": sha}
+        if prev is not None and sha is not None and prev["sha256"] == sha:
+            entry.update(trajectory=prev["trajectory"], skipped=prev["skipped"])
+        elif isinstance(result, str):
+            entry.update(trajectory=None, skipped=result)
+            ingested += 1
+        else:
+            entry.update(trajectory=None, skipped=None)
+            parsed[i] = result
+            ingested += 1
+        entries[i] = entry
+        if progress is not None:
+            progress(done, len(pending))
+
+    removed = len(set(old_entries) - {fp.name for fp in files})
+
+    # 依次取旧数据集片段或新解析的数组 / Take each trajectory from the old dataset or the newly parsed arrays
+    segments = []
+    for i, entry in enumerate(entries):
+        if i in parsed:
+            segments.append(parsed[i])
+        elif entry["trajectory"] is not None:
+            segments.append(old_traces[entry["trajectory"]])
+        else:
+            continue
+        entry["trajectory"] = len(segments) - 1
+
+    unchanged = old is not None and not ingested and not removed
+    if unchanged:
+        arrays, generation = old["arrays"], old["generation"]
+    else:
+        generation = old["generation"] + 1 if old else 0
+        arrays = _write_arrays(out_dir, generation, segments)
+
+    file_index = f"files-{generation}.json"
+    _write_json(out_dir / file_index, entries)
+    manifest = {"format": DATASET_FORMAT,
+                "version": DATASET_VERSION,
+                "source": str(csv_dir.resolve()),
+                "generation": generation,
+                "arrays": arrays,
+                "file_index": file_index,
+                "files": len(entries),
+                "count": len(segments),
+                "points": int(sum(len(xy) for xy, _ in segments)),
+                "skipped": [[e["name"], e["skipped"]] for e in entries if e["skipped"]]}
+    _write_json(out_dir / MANIFEST_NAME, manifest)
+
+    # 清单替换后才删除旧代 / Drop the old generation only after the manifest is replaced
+    if old is not None and not unchanged:
+        del old_traces, segments
+        for name in [*old["arrays"].values(), old["file_index"]]:
+            (out_dir / name).unlink(missing_ok=True)
+
+    return {"files": len(files),
+            "reused": len(files) - ingested,
+            "ingested": ingested,
+            "removed": removed,
+            "count": manifest["count"],
+            "points": manifest["points"],
+            "skipped": len(manifest["skipped"]),
+            "seconds": time.perf_counter() - t0}
+
+
+def _write_arrays(out_dir: Path, generation: int, segments) -> dict:
+    """逐段写出一代数组，不在内存中拼接 / Write one generation of arrays segment by segment, without concatenating in memory."""
+    lengths = [len(xy) for xy, _ in segments]
+    offsets = np.zeros(len(segments) + 1, dtype="int64")
+    np.cumsum(lengths, out=offsets[1:])
+    names = {k: f"{k}-{generation}.npy" for k in _ARRAYS}
+
+    P = int(offsets[-1])
+    if P == 0:
+        np.save(out_dir / names["xy"], np.empty((0, 2), "float32"))
+        np.save(out_dir / names["dt"], np.empty(0, "float32"))
+        np.save(out_dir / names["offsets"], offsets)
+        return names
+    xy_out = np.lib.format.open_memmap(out_dir / names["xy"], mode="w+", dtype="float32", shape=(P, 2))
+    dt_out = np.lib.format.open_memmap(out_dir / names["dt"], mode="w+", dtype="float32", shape=(P,))
+    for (xy, dt), lo, hi in zip(segments, offsets[:-1], offsets[1:]):
+        xy_out[lo:hi] = xy
+        dt_out[lo:hi] = dt
+    xy_out.flush()
+    dt_out.flush()
+    del xy_out, dt_out
+    np.save(out_dir / names["offsets"], offsets)
+    return names
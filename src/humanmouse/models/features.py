@@ -0,0 +1,252 @@
+"""
+训练特征的批量提取
+Batched training-feature extraction
+
+在拼接的不规则轨迹（``TraceSet``）上一次性计算形状特征与全局特征，结果与
+``HumanMouseModel`` 中逐条调用 ``_affine_normalise`` / ``_resample_by_arclength``
+/ ``_global_features`` 的循环逐位一致：
+
+- 旋转：按 offsets 把每段的起点与旋转矩阵广播到各点；
+- 弧长：逐段累加（同长度的轨迹组成一块，保持 float32 逐项累加的舍入顺序）；
+- 重采样：K 个目标弧长是所有轨迹共用的网格，先对网格做一次 ``searchsorted``，
+  再按段计数得到每个目标点所在的区间，插值公式与 ``interp1d`` 相同。
+
+Shape and global features are computed in one pass over concatenated ragged
+trajectories (``TraceSet``), bit-identical to the ``HumanMouseModel`` loop that
+calls ``_affine_normalise`` / ``_resample_by_arclength`` / ``_global_features``
+per trace:
+
+- rotation: each segment's start point and rotation matrix are broadcast to its
+  points through the offsets;
+- arc length: accumulated per segment (trajectories of equal length form one
+  block, keeping the float32 rounding order of a sequential cumsum);
+- resampling: the K target arc lengths are one grid shared by every
+  trajectory, so a single ``searchsorted`` against the grid followed by a
+  per-segment count gives every target's interval; the interpolation formula
+  is the one ``interp1d`` uses.
+"""
+import hashlib
+import os
+from pathlib import Path
+from typing import Tuple, Union
+
+import numpy as np
+
+from .traces import TraceSet
+
+PathLike = Union[str, os.PathLike]
+
+# 特征算法版本：修改本模块或 _affine_normalise / _resample_by_arclength /
+# _global_features 的输出时递增，旧的特征缓存随之失效
+# Feature algorithm version: bump it whenever the output of this module or of
+# _affine_normalise / _resample_by_arclength / _global_features changes; older
+# feature caches are then invalidated
+FEATURE_VERSION = 1
+
+
+def extract_features(traces: TraceSet, K: int,
+                     chunk_size: int = 65536) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    批量提取形状与全局特征
+    Extract shape and global features in batches.
+
+    Parameters
+    ----------
+    traces     : 拼接的不规则轨迹 / Concatenated ragged trajectories.
+    K          : 按弧长重采样的点数 / Number of arc-length resampling points.
+    chunk_size : 每批处理的轨迹条数（限制临时内存）/ Trajectories per batch (bounds scratch memory).
+
+    Returns
+    -------
+    shapes   : (M, K) float64，归一化后按弧长重采样的 y / Normalised y resampled by arc length.
+    globals_ : (M, 4) float32，路径长、总时长、平均与最大速度 / Path length, duration, mean and max speed.
+    """
+    lengths = traces.lengths()
+    if np.any(lengths < 2):
+        raise ValueError("Every trajectory needs at least 2 points")
+    M = len(traces)
+    shapes = np.empty((M, K), dtype="float64")
+    globals_ = np.empty((M, 4), dtype="float32")
+    for lo in range(0, M, chunk_size):
+        hi = min(lo + chunk_size, M)
+        a, b = traces.offsets[lo], traces.offsets[hi]
+        xy = np.asarray(traces.xy[a:b], dtype="float32")
+        dt = np.asarray(traces.dt[a:b], dtype="float32")
+        shapes[lo:hi], globals_[lo:hi] = _extract_chunk(xy, dt, traces.offsets[lo:hi + 1] - a, K)
+    return shapes, globals_
+
+
+def _extract_chunk(xy, dt, offsets, K):
+    M = len(offsets) - 1
+    lengths = np.diff(offsets)
+    starts, ends = offsets[:-1], offsets[1:]
+    seg = np.repeat(np.arange(M), lengths)
+
+    # 仿射归一化参数（与 _affine_normalise 相同的运算）
+    # Affine normalisation parameters (the same operations as _affine_normalise)
+    p0 = xy[starts]
+    v = xy[ends - 1] - p0
+    dist = np.sqrt(np.matmul(v[:, None, :], v[:, :, None])[:, 0, 0])
+    dist[dist == 0] = 1.
+    theta = -np.arctan2(v[:, 1], v[:, 0])
+    c, s = np.cos(theta), np.sin(theta)
+    R = np.stack([np.stack([c, -s], axis=1), np.stack([s, c], axis=1)], axis=1)
+    rel = xy - p0[seg]
+
+    xy_n = np.empty_like(xy)
+    arc = np.zeros(len(xy), dtype="float32")
+    globals_ = np.empty((M, 4), dtype="float32")
+    for L in np.unique(lengths):
+        idx = np.flatnonzero(lengths == L)
+        rows = starts[idx, None] + np.arange(L)
+        # 旋转用与逐条 R @ xy.T 相同形状的 BLAS 调用，舍入一致
+        # Rotate with BLAS calls of the same shape as the per-trace R @ xy.T so rounding matches
+        block = np.matmul(R[idx], rel[rows].transpose(0, 2, 1)).transpose(0, 2, 1) / dist[idx, None, None]
+        xy_n[rows] = block
+        arc[rows[:, 1:]] = np.cumsum(np.linalg.norm(np.diff(block, axis=1), axis=2), axis=1)
+        globals_[idx] = _global_block(xy[rows], dt[rows])
+
+    # 归一化弧长（float64，与 _resample_by_arclength 相同）
+    # Normalised arc length (float64, as in _resample_by_arclength)
+    total = arc[ends - 1].astype("float64")
+    if np.any(total <= 0):
+        raise ValueError("Trajectories must have a non-zero path length")
+    s_all = arc.astype("float64") / total[seg]
+
+    # 目标点 k 的区间上端 = 段内 s < q_k 的点数（即 searchsorted side='left'）
+    # Upper end of target k's interval = points in the segment with s < q_k (searchsorted side='left')
+    q = np.linspace(0, 1, K, dtype="float32")
+    below = np.searchsorted(q, s_all, side="right")
+    counts = np.bincount(seg * (K + 1) + below, minlength=M * (K + 1)).reshape(M, K + 1)
+    upper = np.clip(np.cumsum(counts, axis=1)[:, :K], 1, lengths[:, None] - 1)
+    hi = starts[:, None] + upper
+    lo = hi - 1
+
+    x_lo = s_all[lo]
+    y_lo = xy_n[lo, 1]
+    slope = (xy_n[hi, 1] - y_lo) / (s_all[hi] - x_lo)
+    return slope * (q - x_lo) + y_lo, globals_
+
+
+def _global_block(xy, dt):
+    """
+    同长度轨迹块的全局特征（与 _global_features 相同的运算）
+    Global features of a block of equal-length trajectories (the same operations as _global_features).
+    """
+    step = np.linalg.norm(np.diff(xy, axis=1), axis=2)
+    D = step.sum(axis=1)
+    T = dt.sum(axis=1)
+    valid_dt = dt[:, 1:]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        speed = step / valid_dt
+        fallback = np.where(T > 0, D / T, np.float32(0))
+    # ndarray.mean 先以 float32 求和再除以 intp 计数 / ndarray.mean sums in float32, then divides by an intp count
+    mean_s = (speed.sum(axis=1) / np.intp(step.shape[1])).astype("float32")
+    valid = np.all(valid_dt > 0, axis=1)
+    return np.stack([D, T,
+                     np.where(valid, mean_s, fallback),
+                     np.where(valid, speed.max(axis=1), fallback)], axis=1)
+
+
+def trace_digests(traces: TraceSet) -> np.ndarray:
+    """
+    每条轨迹内容（xy 与 dt 字节）的 16 字节 BLAKE2b 摘要
+    16-byte BLAKE2b digest of each trajectory's content (its xy and dt bytes).
+
+    Returns
+    -------
+    digests : (M,) ``S16``
+    """
+    xy = np.ascontiguousarray(traces.xy, dtype="float32")
+    dt = np.ascontiguousarray(traces.dt, dtype="float32")
+    digests = np.empty(len(traces), dtype="S16")
+    for i, (lo, hi) in enumerate(zip(traces.offsets[:-1].tolist(), traces.offsets[1:].tolist())):
+        h = hashlib.blake2b(xy[lo:hi], digest_size=16)
+        h.update(dt[lo:hi])
+        digests[i] = h.digest()
+    return digests
+
+
+class FeatureCache:
+    """
+    按 (轨迹内容哈希, K, FEATURE_VERSION) 持久化的特征缓存
+    Persistent feature cache keyed by (trajectory content hash, K, FEATURE_VERSION).
+
+    特征只取决于轨迹内容与 K，因此调整 ``n_shape_pc`` / ``n_mix_*`` 后重新训练时，
+    已见过的轨迹直接从缓存读取，只有新轨迹需要提取。每个 K 一个 npz 分片，文件名
+    含 ``FEATURE_VERSION``；其他版本的分片在写入时删除。
+    Features depend only on the trajectory content and K, so retraining with
+    different ``n_shape_pc`` / ``n_mix_*`` reads known trajectories from the
+    cache and extracts only new ones. There is one npz shard per K whose file
+    name carries ``FEATURE_VERSION``; shards of other versions are deleted on write.
+
+    Args:
+        directory: 缓存目录 / Cache directory.
+    """
+
+    def __init__(self, directory: PathLike):
+        self.directory = Path(directory)
+        self.hits = 0
+        self.misses = 0
+
+    def _shard_path(self, K: int) -> Path:
+        return self.directory / f"features-K{K}-v{FEATURE_VERSION}.npz"
+
+    def _read_shard(self, K):
+        path = self._shard_path(K)
+        if not path.exists():
+            return None
+        with np.load(path, allow_pickle=False) as z:
+            return z["keys"], z["shapes"], z["globals"]
+
+    def extract(self, traces: TraceSet, K: int,
+                chunk_size: int = 65536) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        与 ``extract_features`` 相同，但先查缓存，只为未命中的轨迹提取并写回
+        Same as ``extract_features``, but looks up the cache first, extracts only
+        the misses and writes them back.
+        """
+        keys = trace_digests(traces)
+        M = len(keys)
+        shapes = np.empty((M, K), dtype="float64")
+        globals_ = np.empty((M, 4), dtype="float32")
+
+        shard = self._read_shard(K)
+        hit = np.zeros(M, dtype=bool)
+        if shard is not None and len(shard[0]):
+            known, known_shapes, known_globals = shard
+            pos = np.minimum(np.searchsorted(known, keys), len(known) - 1)
+            hit = known[pos] == keys
+            shapes[hit] = known_shapes[pos[hit]]
+            globals_[hit] = known_globals[pos[hit]]
+
+        miss = np.flatnonzero(~hit)
+        self.hits += M - len(miss)
+        self.misses += len(miss)
+        if len(miss):
+            shapes[miss], globals_[miss] = extract_features(traces.take(miss), K, chunk_size)
+            self._write_shard(K, shard, keys[miss], shapes[miss], globals_[miss])
+        return shapes, globals_
+
+    def _write_shard(self, K, shard, keys, shapes, globals_):
+        """把新条目并入分片（原子替换）并删除其他版本 / Merge new entries into the shard (atomic replace) and drop other versions."""
+        if shard is not None:
+            keys = np.concatenate([shard[0], keys])
+            shapes = np.concatenate([shard[1], shapes])
+            globals_ = np.concatenate([shard[2], globals_])
+        keys, first = np.unique(keys, return_index=True)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._shard_path(K)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, keys=keys, shapes=shapes[first], globals=globals_[first])
+        os.replace(tmp, path)
+        for stale in self.directory.glob("features-K*-v*.npz"):
+            if not stale.name.endswith(f"-v{FEATURE_VERSION}.npz"):
+                stale.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """删除全部特征分片（任何 K 与版本）/ Delete every feature shard (any K and version)."""
+        for path in self.directory.glob("features-K*-v*.npz"):
+            path.unlink(missing_ok=True)
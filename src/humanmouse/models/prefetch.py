@@ -0,0 +1,201 @@
+"""
+归一化轨迹预取池
+Prefetch pool of normalized trajectories
+
+``generate()`` 中与起终点无关的部分（GMM 采样、形状重建、样条与速度曲线）
+由后台线程按批预先计算，存放在每个 N 一个的有界环形队列里；取用时只需做
+仿射映射与抖动。
+The target-independent part of ``generate()`` (GMM sampling, shape
+reconstruction, spline and velocity profile) is precomputed in batches by a
+background thread and kept in one bounded ring per N; taking an entry only
+costs the affine mapping and the jitter.
+"""
+import threading
+from collections import deque
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .resample import resample_to_rate
+
+if TYPE_CHECKING:
+    from .trajectory_model import HumanMouseModel
+
+
+class ShapePrefetchPool:
+    """
+    每个 N 一个有界环形队列，低于水位时由后台线程补满
+    One bounded ring per N, topped up by a background thread when it runs low.
+
+    给定 ``seed`` 的调用绕过预取池，结果与 ``model.generate(seed=seed)`` 完全一致。
+    Calls with a ``seed`` bypass the pool and are identical to ``model.generate(seed=seed)``.
+
+    后台线程出错时停止补充，异常在下一次 ``generate()`` 或 ``stats()`` 时以
+    ``RuntimeError`` 重新抛出。
+    If the background thread fails it stops refilling, and the error is
+    re-raised as a ``RuntimeError`` from the next ``generate()`` or ``stats()``.
+    """
+
+    def __init__(self,
+                 model: "HumanMouseModel",
+                 depth: int = 64,
+                 low_water: float = 0.5,
+                 sizes: tuple[int, ...] = ()):
+        """
+        Args:
+            model     : 已训练的模型 / A trained model.
+            depth     : 每个 N 预取的条数 / Entries kept per N.
+            low_water : 剩余比例低于该值时补满 / Refill once the ring drops below this fraction.
+            sizes     : 立即开始预取的 N / Point counts to start prefetching right away.
+        """
+        if depth < 1:
+            raise ValueError("depth must be at least 1")
+        if not 0 <= low_water <= 1:
+            raise ValueError("low_water must be between 0 and 1")
+        self.model = model
+        self.depth = depth
+        self.low_water = low_water
+        self.hits = 0
+        self.misses = 0
+
+        self._rings: dict[int, deque] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._fill_loop, name="humanmouse-prefetch", daemon=True)
+        self._thread.start()
+        for N in sizes:
+            self.register(N)
+
+    # ----------------- 取用 / Taking entries -----------------
+
+    def generate(self,
+                 start: tuple[float, float],
+                 end: tuple[float, float],
+                 N: int = 120,
+                 amp_jitter_px: float = 1.0,
+                 seed: int | None = None,
+                 rate_hz: float | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        与 ``HumanMouseModel.generate`` 相同的签名与返回值
+        Same signature and return values as ``HumanMouseModel.generate``.
+        """
+        if seed is not None:
+            # 确定性模式：绕过预取池 / Deterministic mode: bypass the pool
+            return self.model.generate(start, end, N=N, amp_jitter_px=amp_jitter_px,
+                                       seed=seed, rate_hz=rate_hz)
+        entry = self._take(N)
+        if entry is None:
+            return self.model.generate(start, end, N=N, amp_jitter_px=amp_jitter_px, rate_hz=rate_hz)
+
+        traj_norm, dt, D_hat, unit_noise = entry
+        S = np.asarray(start, dtype="float32").reshape(1, 2)
+        E = np.asarray(end, dtype="float32").reshape(1, 2)
+        dt = dt[None].copy()
+        # 5)‑7) 仿射映射、时间缩放与抖动 / Affine mapping, time scaling and jitter
+        xy = self.model._map_to_endpoints(traj_norm[None], dt, np.atleast_1d(D_hat), S, E,
+                                          (unit_noise * np.float32(amp_jitter_px))[None])
+        if rate_hz is not None:
+            return resample_to_rate(xy[0], dt[0], rate_hz)
+        return xy[0], dt[0]
+
+    def _take(self, N):
+        with self._cond:
+            self._check_thread()
+            ring = self._rings.get(N)
+            if ring is None:
+                # 首次请求该 N：登记后由后台线程开始预取 / First request for N: register it for prefetching
+                ring = self._rings[N] = deque(maxlen=self.depth)
+            entry = ring.popleft() if ring else None
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            if len(ring) < self.depth * self.low_water:
+                self._cond.notify()
+            return entry
+
+    # ----------------- 补充 / Refilling -----------------
+
+    def register(self, N: int) -> None:
+        """开始为 N 预取 / Start prefetching for N."""
+        with self._cond:
+            self._rings.setdefault(N, deque(maxlen=self.depth))
+            self._cond.notify()
+
+    def fill(self, N: int) -> None:
+        """在当前线程把 N 的队列补满 / Fill the ring for N on the calling thread."""
+        with self._cond:
+            ring = self._rings.setdefault(N, deque(maxlen=self.depth))
+            missing = self.depth - len(ring)
+        if missing > 0:
+            entries = self._sample(N, missing)
+            with self._cond:
+                ring.extend(entries)
+
+    def _sample(self, N, count):
+        """
+        1)‑4) 批量采样 count 条归一化轨迹 / 1)-4) Sample count normalized trajectories in one batch
+        """
+        model = self.model
+        coeffs, D_hat, T_hat, unit_noise = model._sample_latents(count, N, 1.0, None)
+        traj_norm = model._normalized_shapes(coeffs, N)
+        dt = model._dt_profile(T_hat, N)
+        return list(zip(traj_norm, dt, D_hat, unit_noise))
+
+    def _needs_fill(self):
+        for N, ring in self._rings.items():
+            if len(ring) < self.depth * self.low_water:
+                return N
+        return None
+
+    def _fill_loop(self):
+        while True:
+            with self._cond:
+                N = self._needs_fill()
+                while N is None and not self._closed:
+                    self._cond.wait()
+                    N = self._needs_fill()
+                if self._closed:
+                    return
+            try:
+                self.fill(N)
+            except Exception as exc:
+                # 记录后退出，由取用方重新抛出 / Record and exit; callers re-raise it
+                with self._cond:
+                    self._error = exc
+                return
+
+    def _check_thread(self):
+        if self._error is not None:
+            raise RuntimeError("prefetch thread failed") from self._error
+
+    # ----------------- 状态 / State -----------------
+
+    def stats(self) -> dict:
+        """
+        命中/未命中次数与各队列剩余条数
+        Hit/miss counts and the entries left in each ring.
+        """
+        with self._cond:
+            self._check_thread()
+            available = {N: len(ring) for N, ring in self._rings.items()}
+        total = self.hits + self.misses
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "depth": self.depth,
+                "available": available}
+
+    def close(self) -> None:
+        """停止后台线程 / Stop the background thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,119 @@
+"""
+模型注册表 - 进程级共享的已加载模型缓存
+Model registry - process-wide cache of loaded models
+"""
+import hashlib
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from .trajectory_model import HumanMouseModel
+
+PathLike = Union[str, os.PathLike]
+
+
+@dataclass(frozen=True)
+class ModelEntry:
+    """
+    注册表中的一条已加载模型记录
+    A loaded model together with the file fingerprint it was read from.
+    """
+    path: Path
+    fingerprint: Tuple
+    model: HumanMouseModel
+
+
+class ModelRegistry:
+    """
+    按「解析后的路径 + 文件指纹」缓存已加载的模型，所有控制器共享
+    Caches loaded models keyed by resolved path plus file fingerprint,
+    shared by every controller in the process.
+
+    指纹默认使用 (mtime_ns, size)；``use_hash=True`` 时改用内容 SHA-256，
+    适用于 mtime 精度较粗的文件系统。
+    The fingerprint defaults to (mtime_ns, size); with ``use_hash=True`` the
+    SHA-256 of the content is used instead, for filesystems with coarse mtimes.
+    """
+
+    def __init__(self, use_hash: bool = False):
+        self.use_hash = use_hash
+        self._entries: Dict[Path, ModelEntry] = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _resolve(path: PathLike) -> Path:
+        return Path(os.fspath(path)).resolve()
+
+    def _fingerprint(self, path: Path) -> Tuple:
+        st = os.stat(path)
+        if not self.use_hash:
+            return (st.st_mtime_ns, st.st_size)
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        return (h.hexdigest(),)
+
+    def get(self, path: PathLike) -> HumanMouseModel:
+        """
+        返回路径对应的模型；首次访问或文件变化时从磁盘加载
+        Return the model for ``path``, loading it from disk on first use or
+        when the file has changed since it was cached.
+        """
+        resolved = self._resolve(path)
+        fingerprint = self._fingerprint(resolved)
+        entry = self._entries.get(resolved)
+        if entry is not None and entry.fingerprint == fingerprint:
+            return entry.model
+
+        with self._lock:
+            # 等锁期间可能已被其他线程加载 / Another thread may have loaded it meanwhile
+            entry = self._entries.get(resolved)
+            if entry is not None and entry.fingerprint == fingerprint:
+                return entry.model
+            return self._load(resolved, fingerprint).model
+
+    def reload(self, path: PathLike) -> HumanMouseModel:
+        """
+        无条件从磁盘重新加载
+        Unconditionally re-read the model from disk.
+        """
+        resolved = self._resolve(path)
+        with self._lock:
+            return self._load(resolved, self._fingerprint(resolved)).model
+
+    def invalidate(self, path: Optional[PathLike] = None) -> None:
+        """
+        丢弃指定路径（或全部）的缓存
+        Drop the cached model for ``path``, or every cached model if None.
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self._resolve(path), None)
+
+    def __contains__(self, path: PathLike) -> bool:
+        return self._resolve(path) in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self, resolved: Path, fingerprint: Tuple) -> ModelEntry:
+        entry = ModelEntry(resolved, fingerprint, HumanMouseModel.load(resolved))
+        self._entries[resolved] = entry
+        return entry
+
+
+# 进程级默认注册表 / Process-wide default registry
+default_registry = ModelRegistry()
+
+
+def get_model(path: PathLike) -> HumanMouseModel:
+    """
+    从默认注册表获取模型的便捷函数
+    Convenience function to fetch a model from the default registry.
+    """
+    return default_registry.get(path)
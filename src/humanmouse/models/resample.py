@@ -0,0 +1,97 @@
+"""
+按鼠标轮询率重新定时轨迹
+Re-time trajectories onto a mouse polling-rate clock
+
+``generate`` 总是输出 N 个按最小加加速度间隔的点，与距离无关。这里把轨迹按
+累积时间插值到 ``rate_hz`` 的均匀时钟上：点数随时长变化，短移动事件更少，
+长移动的密度与真实鼠标一致。
+``generate`` always returns N min-jerk-spaced points regardless of distance.
+These helpers interpolate the path at cumulative time onto a uniform
+``rate_hz`` clock, so the point count scales with duration: short moves emit
+fewer events and long moves get a realistic density.
+"""
+import numpy as np
+
+POLLING_RATES = (125, 500, 1000)
+
+
+def resample_batch(xy: np.ndarray,
+                   dt: np.ndarray,
+                   rate_hz: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    把 M 条轨迹重新定时到 ``rate_hz`` 的均匀时钟（对整批向量化）
+    Re-time M trajectories onto a uniform ``rate_hz`` clock, vectorized over the batch.
+
+    第 m 条轨迹的采样时间为 ``0, 1/rate_hz, 2/rate_hz, ...``，最后一个采样点
+    固定在轨迹的结束时间，起点和终点坐标保持不变。
+    Trajectory m is sampled at ``0, 1/rate_hz, 2/rate_hz, ...`` with the last
+    sample pinned to its end time; start and end coordinates are unchanged.
+
+    Parameters
+    ----------
+    xy      : (M, N, 2)  轨迹坐标 / Trajectory coordinates.
+    dt      : (M, N)     时间间隔，dt[:, 0]=0 / Time intervals, dt[:, 0]=0.
+    rate_hz : 目标采样率 / Target rate.
+
+    Returns
+    -------
+    xy      : (K, 2)  float32  所有轨迹首尾相接 / All trajectories back to back.
+    dt      : (K,)    float64  每条轨迹内的间隔，首点为 0 / Intervals within each trajectory, 0 at each start.
+    offsets : (M+1,)  int64    第 m 条轨迹为 ``[offsets[m]:offsets[m+1]]`` / Trajectory m is ``[offsets[m]:offsets[m+1]]``.
+    """
+    if rate_hz <= 0:
+        raise ValueError("rate_hz must be greater than 0")
+    xy = np.asarray(xy, dtype="float64")
+    dt = np.asarray(dt, dtype="float64")
+    if xy.ndim != 3 or xy.shape[2] != 2 or dt.shape != xy.shape[:2]:
+        raise ValueError(f"expected xy (M, N, 2) and dt (M, N), got {xy.shape} and {dt.shape}")
+    M, N = dt.shape
+    if M == 0:
+        return np.empty((0, 2), "float32"), np.empty(0, "float64"), np.zeros(1, "int64")
+
+    t_src = np.cumsum(dt, axis=1)                                  # (M, N)
+    total = t_src[:, -1]
+    period = 1.0 / rate_hz
+    # 网格点 0..floor(total*rate)，若最后一个网格点早于终点再补一个终点
+    # Grid points 0..floor(total*rate), plus the end point if the grid stops short of it
+    n_grid = np.floor(total * rate_hz + 1e-9).astype("int64") + 1
+    counts = n_grid + ((n_grid - 1) * period < total - 1e-9)
+    offsets = np.zeros(M + 1, dtype="int64")
+    np.cumsum(counts, out=offsets[1:])
+
+    row = np.repeat(np.arange(M), counts)
+    k = np.arange(offsets[-1]) - offsets[row]
+    t = k * period
+    first, last = offsets[:-1], offsets[1:] - 1
+    t[last] = total
+
+    # 每行平移到互不重叠的时间段，一次 np.interp 处理整批
+    # Shift each row into its own time span so one np.interp covers the whole batch
+    shift = np.arange(M) * (total.max() + 1.0)
+    t_flat = (t_src + shift[:, None]).ravel()
+    tq = t + shift[row]
+    out = np.empty((len(tq), 2), dtype="float32")
+    out[:, 0] = np.interp(tq, t_flat, xy[..., 0].ravel())
+    out[:, 1] = np.interp(tq, t_flat, xy[..., 1].ravel())
+    out[first] = xy[:, 0]
+    out[last] = xy[:, -1]
+
+    dt_out = np.diff(t, prepend=0.0)
+    dt_out[first] = 0.0
+    return out, dt_out, offsets
+
+
+def resample_to_rate(xy: np.ndarray,
+                     dt: np.ndarray,
+                     rate_hz: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    单条轨迹版本的 ``resample_batch``
+    Single-trajectory version of ``resample_batch``.
+
+    Returns
+    -------
+    xy : (K, 2)  float32
+    dt : (K,)    float64，dt[0]=0
+    """
+    out, dt_out, _ = resample_batch(np.asarray(xy)[None], np.asarray(dt)[None], rate_hz)
+    return out, dt_out
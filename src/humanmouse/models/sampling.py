@@ -0,0 +1,159 @@
+"""
+冻结的高斯混合采样器 - 不依赖 scikit-learn 的 GMM 采样
+Frozen Gaussian-mixture sampler - GMM sampling without scikit-learn
+"""
+import numpy as np
+
+
+class FrozenGMM:
+    """
+    从已训练 GMM 的参数构建的只读采样器
+    Read-only sampler built from the parameters of a fitted GMM.
+
+    两种随机流 / Two random streams:
+
+    - 兼容模式 ``sample_compat``：与 ``GaussianMixture.sample(random_state=rs)``
+      逐位一致（multinomial 选成分 + SVD 因子变换）。
+      Compatibility mode ``sample_compat``: bit-identical to
+      ``GaussianMixture.sample(random_state=rs)`` (multinomial component draw
+      followed by the SVD-factor transform).
+    - 原生模式 ``sample``：别名表选成分 + 批量 ``standard_normal`` + Cholesky 因子，
+      使用 ``np.random.Generator``。
+      Native mode ``sample``: alias-table component draw, one batched
+      ``standard_normal`` and the Cholesky factors, on an ``np.random.Generator``.
+    """
+
+    def __init__(self,
+                 weights: np.ndarray,
+                 means: np.ndarray,
+                 covariances: np.ndarray | None = None,
+                 cholesky: np.ndarray | None = None,
+                 mvn_factors: np.ndarray | None = None):
+        """
+        Args:
+            weights     (n_components,)       混合权重 / Mixture weights.
+            means       (n_components, d)     成分均值 / Component means.
+            covariances (n_components, d, d)  完整协方差；未给出时须提供另外两个因子
+                                              Full covariances; required unless both factors are given.
+            cholesky    (n_components, d, d)  协方差的下三角 Cholesky 因子
+                                              Lower Cholesky factors of the covariances.
+            mvn_factors (n_components, d, d)  ``sqrt(s)[:, None] * vh``（与 numpy
+                                              multivariate_normal 相同的 SVD 因子）
+                                              The SVD factor numpy's multivariate_normal uses.
+        """
+        self.weights = np.asarray(weights, dtype="float64")
+        self.means = np.asarray(means, dtype="float64")
+        if cholesky is None or mvn_factors is None:
+            if covariances is None:
+                raise ValueError("covariances are required when the factors are not given")
+            covariances = np.asarray(covariances, dtype="float64")
+        if cholesky is None:
+            cholesky = np.linalg.cholesky(covariances)
+        if mvn_factors is None:
+            mvn_factors = np.empty_like(covariances)
+            for k, cov in enumerate(covariances):
+                _, s, vh = np.linalg.svd(cov)
+                mvn_factors[k] = np.sqrt(s)[:, None] * vh
+        self.cholesky = np.asarray(cholesky, dtype="float64")
+        self.mvn_factors = np.asarray(mvn_factors, dtype="float64")
+
+        self.n_components, self.n_features = self.means.shape
+        self._alias_prob, self._alias_index = self._build_alias_table(self.weights)
+
+    @classmethod
+    def from_sklearn(cls, gmm) -> "FrozenGMM":
+        """
+        从 ``covariance_type="full"`` 的 sklearn GaussianMixture 构建
+        Build from a fitted sklearn GaussianMixture with ``covariance_type="full"``.
+        """
+        if getattr(gmm, "covariance_type", "full") != "full":
+            raise ValueError("Only covariance_type='full' mixtures are supported")
+        return cls(gmm.weights_, gmm.means_, covariances=gmm.covariances_)
+
+    # ----------------- 采样 / Sampling -----------------
+
+    def sample(self, n_samples: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        原生模式：返回 (n_samples, d) 样本，顺序随机
+        Native mode: return (n_samples, d) samples in random order.
+        """
+        comp = self._draw_components(n_samples, rng)
+        z = rng.standard_normal((n_samples, self.n_features))
+        # einsum 逐行计算，批量与逐条抽样结果一致
+        # einsum works row by row, so batched and one-by-one draws agree
+        return self.means[comp] + np.einsum("mij,mj->mi", self.cholesky[comp], z)
+
+    def sample_into(self, rng: np.random.Generator, z: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """
+        原生模式的单个样本，写入 ``out``，``z`` 为 (d,) float64 临时缓冲；不分配数组
+        One native-mode sample written into ``out``, with ``z`` a (d,) float64
+        scratch buffer; no array is allocated.
+
+        消耗的随机数与 ``sample(1, rng)`` 相同。
+        Consumes the same random numbers as ``sample(1, rng)``.
+        """
+        i = int(rng.integers(self.n_components))
+        k = i if rng.random() < self._alias_prob[i] else int(self._alias_index[i])
+        rng.standard_normal(out=z)
+        np.matmul(self.cholesky[k], z, out=out)
+        out += self.means[k]
+        return out
+
+    def sample_compat(self, n_samples: int, rs: np.random.RandomState) -> np.ndarray:
+        """
+        兼容模式：与 ``gmm.sample(n_samples, random_state=rs)[0]`` 逐位一致
+        Compatibility mode: bit-identical to ``gmm.sample(n_samples, random_state=rs)[0]``.
+        """
+        counts = rs.multinomial(n_samples, self.weights)
+        out = np.empty((n_samples, self.n_features), dtype="float64")
+        row = 0
+        for k, count in enumerate(counts):
+            if count == 0:
+                continue
+            # 与 RandomState.multivariate_normal 相同的运算顺序
+            # Same operations, in the same order, as RandomState.multivariate_normal
+            x = np.dot(rs.standard_normal((count, self.n_features)), self.mvn_factors[k])
+            x += self.means[k]
+            out[row:row + count] = x
+            row += count
+        return out
+
+    def _draw_components(self, n_samples, rng):
+        i = rng.integers(self.n_components, size=n_samples)
+        u = rng.random(n_samples)
+        return np.where(u < self._alias_prob[i], i, self._alias_index[i])
+
+    @staticmethod
+    def _build_alias_table(weights):
+        """
+        Vose 别名表 / Vose's alias table
+        """
+        n = len(weights)
+        prob = np.asarray(weights, dtype="float64") * n / np.sum(weights)
+        alias = np.arange(n)
+        small = [i for i in range(n) if prob[i] < 1.0]
+        large = [i for i in range(n) if prob[i] >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            alias[s] = l
+            prob[l] -= 1.0 - prob[s]
+            (small if prob[l] < 1.0 else large).append(l)
+        for i in small + large:   # 数值误差残留 / Numerical leftovers
+            prob[i] = 1.0
+        return prob, alias
+
+
+def trajectory_rng(base_seed: int, index: int) -> np.random.Generator:
+    """
+    第 ``index`` 条轨迹的计数器随机流（Philox，按 (base_seed, index) 派生）
+    Counter-based stream for trajectory ``index``: Philox keyed by (base_seed, index).
+
+    与 ``SeedSequence(base_seed).spawn(index + 1)[index]`` 相同，各条流互相独立，
+    结果只取决于 (base_seed, index)，与调用顺序、批量、线程或进程无关。
+    Equivalent to ``SeedSequence(base_seed).spawn(index + 1)[index]``; the
+    streams are independent and depend only on (base_seed, index), not on
+    call order, batching, threads or processes.
+    """
+    if index < 0:
+        raise ValueError("index must not be negative")
+    return np.random.Generator(np.random.Philox(np.random.SeedSequence(base_seed, spawn_key=(index,))))
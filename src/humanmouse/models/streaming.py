@@ -0,0 +1,215 @@
+"""
+外存训练：增量 PCA 与小批量在线 EM
+Out-of-core training: incremental PCA and mini-batch online EM
+
+``fit_streaming`` 按块读取内存映射的数据集（``build_dataset`` 的输出），内存占用
+只与块大小有关：
+
+1. 逐块提取特征，写入磁盘上的临时内存映射，同时用 ``IncrementalPCA.partial_fit``
+   拟合形状 PCA；
+2. 从随机子样本上用 sklearn 拟合两个 GMM 作为初值；
+3. 多轮打乱块与块内顺序，用逐步（在线）EM 更新两个 GMM：每个小批量的充分
+   统计量以步长 ``(t + 2) ** -kappa`` 并入滑动平均，然后做 M 步。
+
+``fit_streaming`` reads a memory-mapped dataset (the output of
+``build_dataset``) chunk by chunk, so memory use depends only on the chunk size:
+
+1. features are extracted per chunk into a temporary on-disk memory map while
+   ``IncrementalPCA.partial_fit`` fits the shape PCA;
+2. both GMMs are initialised by an sklearn fit on a random subsample;
+3. over several epochs with shuffled chunk and row order, both GMMs are
+   updated by stepwise (online) EM: each mini-batch's sufficient statistics are
+   blended into running averages with step ``(t + 2) ** -kappa``, followed by an M-step.
+"""
+import math
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional
+
+import numpy as np
+
+from .._lazy import LazyModule
+from ..core.timing import lap, lap_start
+from .dataset import is_dataset, load_dataset
+from .features import extract_features
+from .traces import PathLike
+
+if TYPE_CHECKING:
+    from sklearn.mixture import GaussianMixture
+
+    from .trajectory_model import HumanMouseModel
+
+decomposition = LazyModule("sklearn.decomposition")
+mixture = LazyModule("sklearn.mixture")
+
+
+class OnlineGMM:
+    """
+    完整协方差 GMM 的逐步（在线）EM
+    Stepwise (online) EM for a full-covariance GMM.
+
+    Args:
+        weights, means, covariances: 初始参数 / Initial parameters.
+        kappa     (float): 步长衰减指数，取 (0.5, 1] / Step-size decay exponent in (0.5, 1].
+        reg_covar (float): 加到协方差对角线上的正则项 / Added to the covariance diagonals.
+    """
+
+    def __init__(self, weights, means, covariances, kappa: float = 0.6, reg_covar: float = 1e-6):
+        self.weights = np.asarray(weights, dtype="float64")
+        self.means = np.asarray(means, dtype="float64")
+        self.covariances = np.asarray(covariances, dtype="float64")
+        self.kappa = kappa
+        self.reg_covar = reg_covar
+        self.n_steps = 0
+        # 充分统计量的滑动平均 / Running averages of the sufficient statistics
+        self._s0 = self.weights.copy()
+        self._s1 = self.weights[:, None] * self.means
+        self._s2 = self.weights[:, None, None] * (
+            self.covariances + self.means[:, :, None] * self.means[:, None, :])
+        self._update_precisions()
+
+    @classmethod
+    def from_sklearn(cls, gmm: "GaussianMixture", **kwargs) -> "OnlineGMM":
+        """由已拟合的 sklearn GaussianMixture 初始化 / Initialise from a fitted sklearn GaussianMixture."""
+        return cls(gmm.weights_, gmm.means_, gmm.covariances_, reg_covar=gmm.reg_covar, **kwargs)
+
+    def _update_precisions(self):
+        cholesky = np.linalg.cholesky(self.covariances)
+        d = self.means.shape[1]
+        self.precisions_cholesky = np.linalg.inv(cholesky).transpose(0, 2, 1)
+        self._log_norm = (-0.5 * d * math.log(2 * math.pi)
+                          + np.log(np.diagonal(self.precisions_cholesky, axis1=1, axis2=2)).sum(axis=1))
+
+    def _log_joint(self, X):
+        """log(w_k) + log N(x | mu_k, Sigma_k)，形状 (n, K) / shape (n, K)."""
+        y = np.einsum("nd,kde->nke", X, self.precisions_cholesky) \
+            - np.einsum("kd,kde->ke", self.means, self.precisions_cholesky)[None]
+        return np.log(self.weights) + self._log_norm - 0.5 * np.einsum("nke,nke->nk", y, y)
+
+    def score_samples(self, X) -> np.ndarray:
+        """每个样本的对数似然 / Per-sample log-likelihood."""
+        log_joint = self._log_joint(np.asarray(X, dtype="float64"))
+        top = log_joint.max(axis=1, keepdims=True)
+        return (top + np.log(np.exp(log_joint - top).sum(axis=1, keepdims=True)))[:, 0]
+
+    def partial_fit(self, X) -> "OnlineGMM":
+        """
+        用一个小批量做一步 E 步与 M 步
+        One E-step and M-step on a mini-batch.
+        """
+        X = np.asarray(X, dtype="float64")
+        log_joint = self._log_joint(X)
+        log_joint -= log_joint.max(axis=1, keepdims=True)
+        resp = np.exp(log_joint)
+        resp /= resp.sum(axis=1, keepdims=True)
+
+        n = len(X)
+        rho = (self.n_steps + 2) ** -self.kappa
+        self._s0 = (1 - rho) * self._s0 + rho * resp.sum(axis=0) / n
+        self._s1 = (1 - rho) * self._s1 + rho * (resp.T @ X) / n
+        self._s2 = (1 - rho) * self._s2 + rho * np.einsum("nk,nd,ne->kde", resp, X, X) / n
+        self.n_steps += 1
+
+        s0 = np.maximum(self._s0, 10 * np.finfo("float64").eps)
+        self.weights = s0 / s0.sum()
+        self.means = self._s1 / s0[:, None]
+        self.covariances = (self._s2 / s0[:, None, None]
+                            - self.means[:, :, None] * self.means[:, None, :])
+        self.covariances += self.reg_covar * np.eye(X.shape[1])
+        self._update_precisions()
+        return self
+
+    def to_sklearn(self, template: "GaussianMixture") -> "GaussianMixture":
+        """
+        写回一个 sklearn GaussianMixture（可用于 score / sample / 保存）
+        Write the parameters back into an sklearn GaussianMixture (usable for score / sample / saving).
+        """
+        template.weights_ = self.weights
+        template.means_ = self.means
+        template.covariances_ = self.covariances
+        template.precisions_cholesky_ = self.precisions_cholesky
+        template.precisions_ = self.precisions_cholesky @ self.precisions_cholesky.transpose(0, 2, 1)
+        template.lower_bound_ = -np.inf
+        template.n_iter_ = self.n_steps
+        template.converged_ = True
+        return template
+
+
+def _chunks(M: int, chunk_size: int, min_size: int):
+    """块边界；过短的末块并入前一块 / Chunk bounds; a too-short last chunk joins the previous one."""
+    bounds = list(range(0, M, chunk_size)) + [M]
+    if len(bounds) > 2 and bounds[-1] - bounds[-2] < min_size:
+        del bounds[-2]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def fit_streaming(model: "HumanMouseModel",
+                  dataset: PathLike,
+                  chunk_size: int = 65536,
+                  batch_size: int = 4096,
+                  n_epochs: int = 5,
+                  init_size: int = 20000,
+                  scratch_dir: Optional[PathLike] = None):
+    """
+    以有界内存从数据集训练模型，返回 ``(pca, gmm_shape, gmm_global, report)``
+    Train from a dataset with bounded memory; returns ``(pca, gmm_shape, gmm_global, report)``.
+
+    Parameters
+    ----------
+    dataset     : ``build_dataset`` 写出的数据集目录 / Dataset directory written by ``build_dataset``.
+    chunk_size  : 每次读入并提取特征的轨迹条数 / Trajectories read and featurised at a time.
+    batch_size  : 在线 EM 小批量大小 / Online-EM mini-batch size.
+    n_epochs    : 在线 EM 轮数 / Online-EM epochs.
+    init_size   : 初始化 GMM 的子样本大小 / Subsample size used to initialise the GMMs.
+    scratch_dir : 特征临时内存映射所在目录，默认系统临时目录
+                  Directory of the temporary feature memory map, the system temp dir by default.
+    """
+    if not is_dataset(dataset):
+        raise ValueError(f"Streaming training needs a dataset directory (see build_dataset), got {dataset}")
+    if min(chunk_size, batch_size, n_epochs, init_size) < 1:
+        raise ValueError("chunk_size, batch_size, n_epochs and init_size must be at least 1")
+    traces, report = load_dataset(dataset, names=False)
+    M = len(traces)
+    if M < max(model.n_shape_pc, model.n_mix_shape, model.n_mix_global):
+        raise ValueError("Not enough trajectories for the requested number of components")
+    rng = np.random.default_rng(model.seed)
+    chunks = _chunks(M, chunk_size, model.n_shape_pc)
+
+    with tempfile.TemporaryDirectory(dir=scratch_dir) as tmp:
+        # 1. 逐块提取特征并增量拟合 PCA / Extract features per chunk and fit the PCA incrementally
+        t = lap_start()
+        shapes = np.lib.format.open_memmap(Path(tmp) / "shapes.npy", mode="w+",
+                                           dtype="float64", shape=(M, model.K))
+        globals_ = np.lib.format.open_memmap(Path(tmp) / "globals.npy", mode="w+",
+                                             dtype="float32", shape=(M, 4))
+        pca = decomposition.IncrementalPCA(model.n_shape_pc)
+        for lo, hi in chunks:
+            shapes[lo:hi], globals_[lo:hi] = extract_features(traces.take(np.arange(lo, hi)), model.K)
+            pca.partial_fit(shapes[lo:hi])
+        t = lap("fit.streaming.pca", t)
+
+        # 2. 在随机子样本上初始化 GMM / Initialise the GMMs on a random subsample
+        init = np.sort(rng.choice(M, size=min(init_size, M), replace=False))
+        gmm_shape = mixture.GaussianMixture(model.n_mix_shape, covariance_type="full",
+                                            random_state=model.seed).fit(pca.transform(shapes[init]))
+        gmm_global = mixture.GaussianMixture(model.n_mix_global, covariance_type="full",
+                                             random_state=model.seed).fit(globals_[init])
+        online_shape = OnlineGMM.from_sklearn(gmm_shape)
+        online_global = OnlineGMM.from_sklearn(gmm_global)
+        t = lap("fit.streaming.init", t)
+
+        # 3. 在线 EM / Online EM
+        for _ in range(n_epochs):
+            for c in rng.permutation(len(chunks)):
+                lo, hi = chunks[c]
+                order = rng.permutation(hi - lo)
+                coeffs = pca.transform(shapes[lo:hi])[order]
+                feats = np.asarray(globals_[lo:hi], dtype="float64")[order]
+                # 不足半批的末批并入前一批，避免小批量占满一步 / A tail under half a batch joins the previous one so it does not take a full step
+                for b, e in _chunks(hi - lo, batch_size, max(1, batch_size // 2)):
+                    online_shape.partial_fit(coeffs[b:e])
+                    online_global.partial_fit(feats[b:e])
+        lap("fit.streaming.em", t)
+        del shapes, globals_
+
+    return (pca, online_shape.to_sklearn(gmm_shape), online_global.to_sklearn(gmm_global), report)
@@ -0,0 +1,234 @@
+"""
+轨迹 CSV 的并行加载（不依赖 pandas）
+Parallel trajectory CSV loading (without pandas)
+
+每个 CSV 含表头与 ``x_coordinate, y_coordinate, time_interval_seconds`` 三列
+（列序任意，允许多余列）。解析走纯 numpy 快速路径，文件按 ``jobs`` 分发到进程池；
+结果拼接为一组不规则数组（``xy`` / ``dt`` 加 ``offsets``），校验结果收集在
+``LoadReport`` 中而不是打印出来。
+Each CSV has a header and the ``x_coordinate, y_coordinate,
+time_interval_seconds`` columns (in any order, extra columns allowed). Parsing
+takes a numpy-only fast path and files are fanned out to a process pool of
+``jobs`` workers; the results are concatenated into one ragged set of arrays
+(``xy`` / ``dt`` plus ``offsets``) and validation results are collected in a
+``LoadReport`` instead of being printed.
+"""
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+PathLike = Union[str, os.PathLike]
+
+# 必需列 / Required columns
+REQUIRED_COLUMNS = ("x_coordinate", "y_coordinate", "time_interval_seconds")
+# 每条轨迹的最少点数 / Minimum number of points per trajectory
+MIN_POINTS = 10
+
+
+@dataclass
+class LoadReport:
+    """
+    一次加载的校验报告
+    Validation report of one load.
+
+    Attributes:
+        files:   找到的文件数 / Number of files found.
+        loaded:  通过校验的轨迹数 / Number of trajectories that passed validation.
+        skipped: 被跳过的 ``(文件名, 原因)`` / Skipped ``(file name, reason)`` pairs.
+        seconds: 加载耗时 / Wall time of the load.
+    """
+    files: int = 0
+    loaded: int = 0
+    skipped: List[Tuple[str, str]] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        """单行摘要 / One-line summary."""
+        return (f"{self.loaded}/{self.files} trajectories loaded, "
+                f"{len(self.skipped)} skipped in {self.seconds:.2f}s")
+
+
+@dataclass
+class TraceSet:
+    """
+    拼接存放的不规则轨迹集合；第 i 条轨迹是 ``xy[offsets[i]:offsets[i+1]]``
+    Ragged, concatenated trajectories; trajectory i is ``xy[offsets[i]:offsets[i+1]]``.
+
+    Attributes:
+        xy:      (P, 2) float32 全部点 / All points.
+        dt:      (P,) float32 时间间隔，每条轨迹首项为 0 / Time intervals, 0 at the start of each trajectory.
+        offsets: (M+1,) int64 各轨迹起点 / Start of each trajectory.
+        names:   各轨迹的来源文件名，未读取时为 None / Source file name of each trajectory, None when not loaded.
+    """
+    xy: np.ndarray
+    dt: np.ndarray
+    offsets: np.ndarray
+    names: Optional[List[str]]
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        lo, hi = self.offsets[i], self.offsets[i + 1]
+        return self.xy[lo:hi], self.dt[lo:hi]
+
+    def lengths(self) -> np.ndarray:
+        """各轨迹点数 / Number of points per trajectory."""
+        return np.diff(self.offsets)
+
+    def take(self, indices) -> "TraceSet":
+        """按下标取出部分轨迹（复制）/ Copy out a subset of trajectories by index."""
+        indices = np.asarray(indices, dtype="int64")
+        lengths = self.lengths()[indices]
+        offsets = np.zeros(len(indices) + 1, dtype="int64")
+        np.cumsum(lengths, out=offsets[1:])
+        points = np.repeat(self.offsets[indices] - offsets[:-1], lengths) + np.arange(offsets[-1])
+        names = [self.names[i] for i in indices] if self.names is not None else None
+        return TraceSet(self.xy[points], self.dt[points], offsets, names)
+
+    def split(self) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+        """拆成逐条轨迹的视图列表 / Per-trajectory view lists."""
+        bounds = self.offsets[1:-1]
+        return np.split(self.xy, bounds), np.split(self.dt, bounds)
+
+    @classmethod
+    def from_lists(cls, xy_list: Iterable[np.ndarray], dt_list: Iterable[np.ndarray],
+                   names: Optional[List[str]] = None) -> "TraceSet":
+        """由逐条轨迹的数组构建 / Build from per-trajectory arrays."""
+        xy_list, dt_list = list(xy_list), list(dt_list)
+        offsets = np.zeros(len(xy_list) + 1, dtype="int64")
+        np.cumsum([len(xy) for xy in xy_list], out=offsets[1:])
+        if xy_list:
+            xy = np.concatenate(xy_list).astype("float32", copy=False)
+            dt = np.concatenate(dt_list).astype("float32", copy=False)
+        else:
+            xy, dt = np.empty((0, 2), "float32"), np.empty(0, "float32")
+        return cls(xy, dt, offsets,
+                   names if names is not None else [str(i) for i in range(len(xy_list))])
+
+
+def parse_trace(data: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    解析一个 CSV 的内容并校验
+    Parse and validate the contents of one CSV.
+
+    Returns
+    -------
+    xy : (n, 2) float32
+    dt : (n,) float32，首项为 0 / with ``dt[0] == 0``
+
+    Raises
+    ------
+    ValueError : 缺列、数据不足、列长度不一致、无法解析或时间间隔非正
+                 Missing columns, too few points, ragged rows, unparsable values or non-positive intervals.
+    """
+    data = data.replace(b"\r\n", b"\n").strip()
+    header, _, body = data.partition(b"\n")
+    if header.startswith(b"\xef\xbb\xbf"):
+        header = header[3:]
+    columns = [c.strip().strip('"') for c in header.decode("utf-8", "replace").split(",")]
+    if len(columns) > 1 and columns[-1] == "":
+        columns.pop()
+    if not set(REQUIRED_COLUMNS).issubset(columns):
+        raise ValueError("missing required columns")
+    while b"\n\n" in body:
+        body = body.replace(b"\n\n", b"\n")
+    # 与表头一样去掉引号，并忽略行尾的空字段（电子表格导出常见）
+    # Strip quotes as for the header and ignore a trailing empty field, as spreadsheet exports write them
+    if b'"' in body:
+        body = body.replace(b'"', b"")
+    if body.endswith(b","):
+        body = body[:-1]
+    body = body.replace(b",\n", b"\n")
+
+    n_cols = len(columns)
+    n_rows = body.count(b"\n") + 1 if body else 0
+    fields = body.replace(b"\n", b",").split(b",") if body else []
+    if len(fields) != n_rows * n_cols:
+        raise ValueError("mismatched column lengths")
+    try:
+        values = np.array(fields, dtype="float64").reshape(n_rows, n_cols)
+    except ValueError:
+        raise ValueError("unparsable value") from None
+
+    ix, iy, it = (columns.index(c) for c in REQUIRED_COLUMNS)
+    xy = values[:, [ix, iy]].astype("float32")
+    dts = values[:, it].astype("float32")
+    if n_rows < MIN_POINTS:
+        raise ValueError("insufficient data points")
+
+    # 首个 dt 应为 0：单调递增时视为累积时间，否则直接置 0
+    # The first dt should be 0: a non-decreasing column is cumulative time, otherwise zero it
+    if abs(dts[0]) > 1e-6:
+        if np.all(np.diff(dts) >= 0):
+            dts = np.concatenate(([0.], np.diff(dts))).astype("float32")
+        else:
+            dts[0] = 0.
+    if np.any(dts[1:] <= 0):
+        raise ValueError("non-positive time intervals")
+    return xy, dts
+
+
+def map_files(func: Callable, paths: List[str], jobs: int = 1) -> Iterator:
+    """
+    按顺序返回 ``func(path)``；``jobs > 1`` 时在进程池中计算
+    Yield ``func(path)`` in order, computed in a process pool when ``jobs > 1``.
+    """
+    if jobs == 1:
+        yield from map(func, paths)
+        return
+    # 进程池只在并行读取时导入 / The process pool is imported only for parallel reads
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        # 小文件成批分发以摊薄进程间通信 / Small files go out in batches to amortise IPC
+        yield from pool.map(func, paths, chunksize=max(1, len(paths) // (jobs * 8)))
+
+
+def _read_file(path: str):
+    """读取并解析一个文件；失败时返回原因字符串 / Read and parse one file; returns the reason string on failure."""
+    try:
+        with open(path, "rb") as f:
+            return parse_trace(f.read())
+    except (OSError, ValueError) as e:
+        return str(e)
+
+
+def load_traces(csv_dir: PathLike, jobs: int = 1) -> Tuple[TraceSet, LoadReport]:
+    """
+    并行读取目录下全部 CSV
+    Read every CSV in a directory in parallel.
+
+    Parameters
+    ----------
+    csv_dir : 轨迹 CSV 目录 / Directory of trajectory CSVs.
+    jobs    : 工作进程数，1 表示在当前进程中读取 / Worker processes, 1 reads in the current process.
+
+    Returns
+    -------
+    traces : 按文件名排序的有效轨迹 / Valid trajectories, in file-name order.
+    report : 校验报告 / Validation report.
+    """
+    if jobs < 1:
+        raise ValueError("jobs must be at least 1")
+    files = sorted(Path(csv_dir).glob("*.csv"))
+    if not files:
+        raise ValueError(f"No CSV files found in directory {csv_dir}")
+
+    t0 = time.perf_counter()
+    report = LoadReport(files=len(files))
+    xy_list, dt_list, names = [], [], []
+    for fp, result in zip(files, map_files(_read_file, [str(fp) for fp in files], jobs)):
+        if isinstance(result, str):
+            report.skipped.append((fp.name, result))
+            continue
+        xy_list.append(result[0])
+        dt_list.append(result[1])
+        names.append(fp.name)
+
+    report.loaded = len(names)
+    report.seconds = time.perf_counter() - t0
+    return TraceSet.from_lists(xy_list, dt_list, names), report
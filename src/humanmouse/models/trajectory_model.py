@@ -5,24 +5,109 @@
 # ----------------------------------------------------
 # 依赖：numpy pandas scipy scikit-learn
 # Dependencies: numpy pandas scipy scikit-learn
+# 仅从紧凑模型生成时只需要 numpy；其余依赖在训练 / 读取 pickle / CSV 时才导入
+# Generating from a compact model needs only numpy; the other dependencies are
+# imported on first use by training, pickle loading or CSV handling
 
 import argparse
+import math
+import os
 import pickle
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Tuple, Optional
-import inspect
+from typing import TYPE_CHECKING, Iterator, NamedTuple, Tuple, Optional, Sequence
 
 import numpy as np
-import pandas as pd
-from scipy import interpolate
-from sklearn.decomposition import PCA
-from sklearn.mixture import GaussianMixture
+
+from .._lazy import LazyModule
+from ..core.timing import lap, lap_start, stage, timed
+from .compact import COMPACT_SUFFIX, is_compact_file, read_compact, write_compact
+from .resample import resample_to_rate
+from .sampling import FrozenGMM, trajectory_rng
+
+if TYPE_CHECKING:
+    from sklearn.decomposition import PCA
+    from sklearn.mixture import GaussianMixture
+
+    from .features import FeatureCache
+    from .traces import LoadReport, TraceSet
+
+pd = LazyModule("pandas")
+interpolate = LazyModule("scipy.interpolate")
+decomposition = LazyModule("sklearn.decomposition")
+mixture = LazyModule("sklearn.mixture")
 
 # ====================================================
 #                      核心类定义
 #                 Core Class Definition
 # ====================================================
 
+class _ShapeOperator(NamedTuple):
+    """
+    固定 N 时「PCA 系数 → N 点 y 值」的融合线性算子
+    Fused linear map from PCA coefficients to the N y-values for a fixed N.
+    """
+    op: np.ndarray        # (n_shape_pc, N)
+    offset: np.ndarray    # (N,)
+    xs_N: np.ndarray      # (N,) float32 MJ 位移，同时用作抖动权重 / MJ displacement, also the jitter weights
+    v_w: np.ndarray       # (N-1,) MJ 速度权重 / MJ velocity weights
+
+
+class _IntoScratch(NamedTuple):
+    """
+    ``generate_into`` 的每线程、每 N 的 float32 临时缓冲
+    Per-thread, per-N float32 scratch buffers for ``generate_into``.
+    """
+    source: _ShapeOperator  # 派生来源，算子更新时重建 / Source operator, rebuilt when it changes
+    op: np.ndarray          # (n_shape_pc, N) float32
+    offset: np.ndarray      # (N,) float32
+    xs_col: np.ndarray      # (N,1) float32 MJ 位移 / MJ displacement
+    v_w: np.ndarray         # (N-1,) float32
+    coeffs: np.ndarray      # (n_shape_pc,) float32
+    y: np.ndarray           # (N,) float32
+    tmp: np.ndarray         # (N,) float32
+    noise: np.ndarray       # (N,2) float32
+
+
+def _cubic_spline_basis(x: np.ndarray, x_eval: np.ndarray) -> np.ndarray:
+    """
+    not‑a‑knot 三次样条的插值基矩阵（与 scipy CubicSpline 默认边界一致）
+    Basis matrix of the not-a-knot cubic spline (scipy CubicSpline's default).
+
+    返回 (K,N) 矩阵 B，使得 ``CubicSpline(x, y)(x_eval) == y @ B``。
+    Returns the (K,N) matrix B such that ``CubicSpline(x, y)(x_eval) == y @ B``.
+    """
+    n = len(x)
+    if n < 4:
+        raise ValueError("At least 4 knots are required for a not-a-knot spline.")
+    h = np.diff(x)
+
+    # 二阶导数 M 满足 A @ M = D @ y / Second derivatives M satisfy A @ M = D @ y
+    A = np.zeros((n, n))
+    D = np.zeros((n, n))
+    for i in range(1, n - 1):
+        A[i, i - 1:i + 2] = h[i - 1], 2 * (h[i - 1] + h[i]), h[i]
+        D[i, i - 1:i + 2] = 6 / h[i - 1], -6 / h[i - 1] - 6 / h[i], 6 / h[i]
+    # not‑a‑knot：首末两个内部节点处三阶导数连续
+    # not-a-knot: continuous third derivative at the first and last interior knots
+    A[0, :3] = h[1], -(h[0] + h[1]), h[0]
+    A[-1, -3:] = h[-1], -(h[-2] + h[-1]), h[-2]
+    G = np.linalg.solve(A, D)                         # M = G @ y
+
+    idx = np.clip(np.searchsorted(x, x_eval, side="right") - 1, 0, n - 2)
+    hi = h[idx]
+    a = (x[idx + 1] - x_eval) / hi
+    b = (x_eval - x[idx]) / hi
+    cols = np.arange(len(x_eval))
+    B = np.zeros((n, len(x_eval)))
+    B[idx, cols] += a
+    B[idx + 1, cols] += b
+    B += G[idx].T * ((a ** 3 - a) * hi ** 2 / 6)
+    B += G[idx + 1].T * ((b ** 3 - b) * hi ** 2 / 6)
+    return B
+
+
 class HumanMouseModel:
     """
     统计‑混合（PCA + GMM）鼠标轨迹生成器
@@ -35,6 +120,13 @@ class HumanMouseModel:
       第一个 time_interval_seconds 必须为 0
       The first time_interval_seconds must be 0
     """
+    # 融合形状算子 LRU 容量 / Capacity of the fused shape-operator LRU
+    OPERATOR_CACHE_SIZE = 16
+    # 随机流模式 / Random stream modes
+    RNG_MODES = ("compat", "native")
+    # 不写入模型文件的运行期缓存 / Runtime caches that are not written to model files
+    _TRANSIENT_ATTRS = ("_operator_cache", "_operator_lock", "_frozen_gmms", "_pca_basis", "_into_local")
+
     # ----------------- 构造 & 训练 ------------------
     # ----------- Constructor & Training -----------
     def __init__(self,
@@ -61,6 +153,21 @@ class HumanMouseModel:
         self.n_mix_shape = n_mix_shape
         self.n_mix_global = n_mix_global
         self.seed = seed
+        # 有种子时的随机流："compat" 与旧版 sklearn 采样逐位一致，"native" 更快
+        # Stream used for seeded generation: "compat" is bit-identical to the
+        # former sklearn sampling, "native" is faster
+        self.rng_mode = "compat"
+
+        # 按 N 缓存的融合形状算子与冻结采样器（不持久化）
+        # Fused shape operators cached per N and frozen samplers (not persisted)
+        self._operator_cache: OrderedDict[int, _ShapeOperator] = OrderedDict()
+        self._operator_lock = threading.Lock()
+        self._frozen_gmms: tuple[FrozenGMM, FrozenGMM] | None = None
+        # 紧凑格式加载时代替 self.pca 的 (components_, mean_)
+        # (components_, mean_) standing in for self.pca when loaded from a compact file
+        self._pca_basis: tuple[np.ndarray, np.ndarray] | None = None
+        # generate_into 的每线程临时缓冲 / Per-thread scratch buffers for generate_into
+        self._into_local = threading.local()
 
         # 训练后置属性
         # Attributes set after training
@@ -71,35 +178,94 @@ class HumanMouseModel:
 
         np.random.seed(seed)
 
-    def fit(self, csv_dir: str | Path):
+    @timed("fit")
+    def fit(self, csv_dir: str | Path, jobs: int = 1,
+            feature_cache: "FeatureCache | str | Path | None" = None) -> "LoadReport":
         """
-        读取目录下全部 CSV 并训练模型
-        Read all CSV files in a directory and train the model.
+        读取目录下全部 CSV（或 ``build_dataset`` 写出的数据集）并训练模型
+        Read all CSV files in a directory (or a dataset written by ``build_dataset``) and train the model.
+
+        Args:
+            csv_dir (str | Path): 轨迹 CSV 目录或数据集目录 / Directory of trajectory CSVs, or a dataset directory.
+            jobs           (int): 读取 CSV 的工作进程数 / Worker processes used to read the CSVs.
+            feature_cache        : ``FeatureCache`` 或其目录；已缓存的轨迹不再提取特征
+                                   A ``FeatureCache`` or its directory; cached trajectories skip feature extraction.
+
+        Returns:
+            LoadReport: 加载校验报告（跳过的文件及原因）/ Load validation report (skipped files and reasons).
         """
         csv_dir = Path(csv_dir)
-        xy_list, dt_list = self._load_traces(csv_dir)
-        shapes, globals_ = self._extract_features(xy_list, dt_list)
+        traces, report = self._load_traces(csv_dir, jobs)
+        shapes, globals_ = self._extract_features(traces, feature_cache)
 
         # 形状：PCA → GMM
         # Shape: PCA -> GMM
-        self.pca = PCA(self.n_shape_pc, random_state=self.seed)
+        t = lap_start()
+        self.pca = decomposition.PCA(self.n_shape_pc, random_state=self.seed)
         coeffs = self.pca.fit_transform(shapes)
-        self.gmm_shape = GaussianMixture(
+        t = lap("fit.pca", t)
+        self.gmm_shape = mixture.GaussianMixture(
             self.n_mix_shape,
             covariance_type="full",
             random_state=self.seed
         ).fit(coeffs)
+        t = lap("fit.gmm_shape", t)
 
         # 全局：GMM
         # Global features: GMM
-        self.gmm_global = GaussianMixture(
+        self.gmm_global = mixture.GaussianMixture(
             self.n_mix_global,
             covariance_type="full",
             random_state=self.seed
         ).fit(globals_)
+        lap("fit.gmm_global", t)
+
+        self._finish_training()
+        print(f"[Training complete] Number of trajectories: {len(traces)}")
+        return report
+
+    @timed("fit.streaming")
+    def fit_streaming(self, dataset: str | Path,
+                      chunk_size: int = 65536,
+                      batch_size: int = 4096,
+                      n_epochs: int = 5,
+                      scratch_dir: str | Path | None = None) -> "LoadReport":
+        """
+        以有界内存从数据集训练：增量 PCA 与小批量在线 EM（见 ``streaming.fit_streaming``）
+        Train from a dataset with bounded memory: incremental PCA and mini-batch
+        online EM (see ``streaming.fit_streaming``).
 
+        Args:
+            dataset (str | Path): ``build_dataset`` 写出的数据集目录 / Dataset directory written by ``build_dataset``.
+            chunk_size     (int): 每次读入并提取特征的轨迹条数 / Trajectories read and featurised at a time.
+            batch_size     (int): 在线 EM 小批量大小 / Online-EM mini-batch size.
+            n_epochs       (int): 在线 EM 轮数 / Online-EM epochs.
+            scratch_dir         : 特征临时文件目录 / Directory for the temporary feature file.
+
+        Returns:
+            LoadReport: 数据集的校验报告 / The dataset's validation report.
+        """
+        # 训练模块只在训练时导入 / Training modules are imported only when training
+        from .streaming import fit_streaming
+
+        if chunk_size < self.n_shape_pc:
+            raise ValueError("chunk_size must be at least n_shape_pc")
+        self.pca, self.gmm_shape, self.gmm_global, report = fit_streaming(
+            self, dataset, chunk_size=chunk_size, batch_size=batch_size,
+            n_epochs=n_epochs, scratch_dir=scratch_dir)
+        self._finish_training()
+        print(f"[Training complete] Number of trajectories: {report.loaded}")
+        return report
+
+    def _finish_training(self):
+        """清空依赖旧参数的运行期缓存并标记已训练 / Drop runtime caches built from old parameters and mark trained."""
+        from .cache import _forget_fingerprint
+
+        self._operator_cache.clear()
+        self._frozen_gmms = None
+        self._pca_basis = None
+        _forget_fingerprint(self)
         self._is_trained = True
-        print(f"[Training complete] Number of trajectories: {len(xy_list)}")
 
     # ----------------- 生成 ------------------
     # ---------------- Generation ---------------
@@ -108,12 +274,33 @@ class HumanMouseModel:
                  end: tuple[float, float],
                  N: int = 120,
                  amp_jitter_px: float = 1.0,
-                 seed: int | None = None
+                 seed: int | None = None,
+                 rng_mode: str | None = None,
+                 rate_hz: float | None = None,
+                 base_seed: int | None = None,
+                 index: int = 0
                  ) -> tuple[np.ndarray, np.ndarray]:
         """
         生成单条轨迹
         Generate a single trajectory.
 
+        给定 ``base_seed`` 时使用 (base_seed, index) 的计数器随机流（见
+        ``sampling.trajectory_rng``），与 ``generate_many`` 中同一 index 的结果逐位一致。
+        With ``base_seed``, the counter-based stream for (base_seed, index) is
+        used (see ``sampling.trajectory_rng``); the result is bit-identical to
+        the same index in ``generate_many``.
+
+        ``rng_mode`` 覆盖模型的 ``rng_mode``（"compat" / "native"）；无种子时总是
+        使用新熵的原生随机流。
+        ``rng_mode`` overrides the model's ``rng_mode`` ("compat" / "native");
+        unseeded calls always use a freshly seeded native stream.
+
+        给定 ``rate_hz`` 时，N 点轨迹再按累积时间插值到该频率的均匀时钟上
+        （见 ``resample.resample_to_rate``），点数随时长变化。
+        With ``rate_hz``, the N-point trajectory is then interpolated at
+        cumulative time onto a uniform clock at that rate (see
+        ``resample.resample_to_rate``), so the point count scales with duration.
+
         Returns
         -------
         xy_abs : (N,2)  float32  绝对坐标
@@ -121,104 +308,523 @@ class HumanMouseModel:
         dt     : (N,)   float32  相邻采样时间间隔（秒），dt[0]=0
                                  Time interval between adjacent samples (seconds), dt[0]=0.
         """
+        xy, dt = self.generate_many([start], [end], N=N,
+                                    amp_jitter_px=amp_jitter_px,
+                                    seeds=None if base_seed is not None else [seed],
+                                    rng_mode=rng_mode, base_seed=base_seed, indices=[index])
+        if rate_hz is not None:
+            with stage("generate.resample"):
+                return resample_to_rate(xy[0], dt[0], rate_hz)
+        return xy[0], dt[0]
+
+    def generate_many(self,
+                      starts,
+                      ends,
+                      N: int = 120,
+                      amp_jitter_px: float = 1.0,
+                      seeds: Sequence[int | None] | None = None,
+                      rng_mode: str | None = None,
+                      base_seed: int | None = None,
+                      indices: Sequence[int] | None = None,
+                      rng: np.random.Generator | None = None
+                      ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        批量生成 M 条轨迹
+        Generate M trajectories in one batch.
+
+        给定 ``seeds`` 时，第 i 条轨迹与 ``generate(starts[i], ends[i], seed=seeds[i])``
+        逐位一致；否则所有 GMM 样本与抖动噪声一次性抽取。
+        With ``seeds``, item i is bit-identical to
+        ``generate(starts[i], ends[i], seed=seeds[i])``; without, all GMM samples
+        and jitter noise are drawn in one go.
+
+        Parameters
+        ----------
+        starts, ends : (M,2) array-like  起点 / 终点 / Start and end points.
+        seeds        : 长度 M 的种子序列，或 None / Length-M sequence of seeds, or None.
+        rng_mode     : "compat" / "native"，默认取模型的 ``rng_mode``
+                       "compat" / "native", defaults to the model's ``rng_mode``.
+        base_seed    : 给定时第 i 条轨迹使用 (base_seed, indices[i]) 的计数器随机流，
+                       与 ``seeds`` 互斥
+                       When given, item i uses the counter-based stream for
+                       (base_seed, indices[i]); exclusive with ``seeds``.
+        indices      : 长度 M 的轨迹序号，默认 ``0..M-1``
+                       Length-M trajectory indices, default ``0..M-1``.
+        rng          : 无 ``seeds`` / ``base_seed`` 时整批共用的随机流，默认取新熵
+                       Stream shared by the whole batch when neither ``seeds`` nor
+                       ``base_seed`` is given; defaults to fresh entropy.
+
+        Returns
+        -------
+        xy_abs : (M,N,2)  float32  绝对坐标
+                                   Absolute coordinates.
+        dt     : (M,N)    float64  相邻采样时间间隔（秒），dt[:,0]=0
+                                   Time interval between adjacent samples (seconds), dt[:,0]=0.
+        """
         if not self._is_trained:
             raise RuntimeError("Model is not trained yet. Please call fit() first.")
 
-        # ---- RNG 统一入口 ----
-        # ---- Unified entry point for RNG ----
-        rs = np.random.RandomState(seed) if seed is not None else None
-        rng = np.random.default_rng(seed)
-
-        # 1) 采样形状 & 全局标量（用同一 random_state 保证可复现）
-        # 1) Sample shape & global scalars (use the same random_state for reproducibility)
-        coeff = self._gmm_sample(self.gmm_shape, 1, rs)[0][0].astype("float32")
-        global_sample = self._gmm_sample(self.gmm_global, 1, rs)[0][0]
-        D_hat, T_hat, *_ = global_sample  # 训练样本的总距离、总时间估计
-                                           # Estimated total distance and time from training samples
-
-        # 2) 形状基曲线：x 轴用 Minimum‑Jerk 位移，解决「尾段速度异常」
-        # 2) Base shape curve: Use Minimum-Jerk displacement for the x-axis to fix "abnormal end-segment velocity"
-        t_k = np.linspace(0, 1, self.K, dtype="float32")
-        xs_k = self._min_jerk_position(t_k)              # 单调 0→1 / Monotonically increasing from 0 to 1
-        shape = np.stack([xs_k, coeff @ self.pca.components_ + self.pca.mean_], axis=1)
-
-        # 3) 插值到 N 点（x 仍为 MJ 位移）
-        # 3) Interpolate to N points (x is still MJ displacement)
-        spl = interpolate.CubicSpline(shape[:, 0], shape[:, 1])
-        xs_N = self._min_jerk_position(np.linspace(0, 1, N, dtype="float32"))
-        ys_N = spl(xs_N).astype("float32")
-        traj_norm = np.stack([xs_N, ys_N], axis=1)       # 归一化轨迹 / Normalized trajectory
+        S = np.asarray(starts, dtype="float32").reshape(-1, 2)
+        E = np.asarray(ends, dtype="float32").reshape(-1, 2)
+        if S.shape != E.shape:
+            raise ValueError(f"starts and ends must have the same shape, got {S.shape} and {E.shape}")
+        M = len(S)
+        if seeds is not None and len(seeds) != M:
+            raise ValueError(f"Expected {M} seeds, got {len(seeds)}")
+        if base_seed is not None:
+            if seeds is not None:
+                raise ValueError("seeds and base_seed are mutually exclusive")
+            indices = range(M) if indices is None else indices
+            if len(indices) != M:
+                raise ValueError(f"Expected {M} indices, got {len(indices)}")
+            # 每条轨迹一个计数器随机流 / One counter-based stream per trajectory
+            seeds = [trajectory_rng(base_seed, int(i)) for i in indices]
+        rng_mode = rng_mode or self.rng_mode
+        if rng_mode not in self.RNG_MODES:
+            raise ValueError(f"rng_mode must be one of {self.RNG_MODES}, got {rng_mode!r}")
+
+        # 1) 采样形状系数、全局标量与抖动噪声
+        # 1) Sample shape coefficients, global scalars and jitter noise
+        t = lap_start()
+        coeffs, D_hat, T_hat, noise = self._sample_latents(M, N, amp_jitter_px, seeds, rng_mode, rng)
+        t = lap("generate.sample", t)
+
+        # 2)‑3) 归一化形状 / Normalized shapes
+        traj_norm = self._normalized_shapes(coeffs, N)
+        t = lap("generate.shape", t)
 
         # 4) Minimum‑Jerk 速度曲线 → dt
         # 4) Minimum-Jerk velocity profile -> dt
-        v_w = self._min_jerk_velocity_profile(N)
-        dt = (T_hat * v_w).astype("float32")
-        dt = np.concatenate(([0.], dt))                  # dt[0]=0, 长度 N / length N
+        dt = self._dt_profile(T_hat, N)
+        lap("generate.timing", t)
+
+        # 5)‑7) 仿射映射、时间缩放与抖动 / Affine mapping, time scaling and jitter
+        xy_abs = self._map_to_endpoints(traj_norm, dt, D_hat, S, E, noise)
+        return xy_abs, dt
+
+    def generate_into(self,
+                      start: tuple[float, float],
+                      end: tuple[float, float],
+                      out_xy: np.ndarray,
+                      out_dt: np.ndarray,
+                      amp_jitter_px: float = 1.0,
+                      base_seed: int | None = None,
+                      index: int = 0,
+                      rng: np.random.Generator | None = None
+                      ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        生成单条轨迹并写入调用方提供的 float32 缓冲，预热后不分配数组
+        Generate one trajectory into caller-provided float32 buffers; after
+        warm-up no array is allocated.
+
+        N 取自 ``len(out_xy)``。全程使用 float32（GMM 潜变量除外），临时缓冲按线程
+        与 N 复用。形状与时间与 ``generate`` 的原生随机流一致（浮点舍入范围内），
+        抖动直接以 float32 抽取，因此与 ``generate`` 的抖动不同。
+        N is ``len(out_xy)``. Everything stays in float32 (except the GMM
+        latents) and scratch buffers are reused per thread and per N. Shape and
+        timing match ``generate`` on the native stream up to rounding; the
+        jitter is drawn directly in float32 and so differs from ``generate``.
+
+        Parameters
+        ----------
+        out_xy    : (N,2) float32  输出坐标 / Output coordinates.
+        out_dt    : (N,)  float32  输出时间间隔（秒），dt[0]=0 / Output intervals (seconds), dt[0]=0.
+        base_seed : 给定时使用 (base_seed, index) 的计数器随机流
+                    When given, the counter-based stream for (base_seed, index) is used.
+        rng       : 调用方的随机流；两者都未给出时使用本线程的随机流
+                    The caller's stream; without either, this thread's own stream is used.
+
+        Returns
+        -------
+        (out_xy, out_dt)
+        """
+        if not self._is_trained:
+            raise RuntimeError("Model is not trained yet. Please call fit() first.")
+        if out_xy.dtype != np.float32 or out_dt.dtype != np.float32:
+            raise ValueError(f"out_xy and out_dt must be float32, got {out_xy.dtype} and {out_dt.dtype}")
+        N = len(out_xy)
+        if out_xy.shape != (N, 2) or out_dt.shape != (N,) or N < 2:
+            raise ValueError(f"expected out_xy (N, 2) and out_dt (N,) with N >= 2, "
+                             f"got {out_xy.shape} and {out_dt.shape}")
+
+        # 1) 采样形状系数与全局标量 / Sample shape coefficients and global scalars
+        sc, rng, D_hat, T_hat = self._into_latents(N, base_seed, index, rng)
+
+        # 2)‑3) 归一化形状 y = coeffs @ op + offset / Normalized shape y = coeffs @ op + offset
+        y = sc.y
+        np.matmul(sc.coeffs, sc.op, out=y)
+        y += sc.offset
+
+        # 5) 仿射映射：旋转并缩放 (xs, y)，再平移到起点
+        # 5) Affine mapping: rotate and scale (xs, y), then translate to the start
+        sx, sy = float(start[0]), float(start[1])
+        vx, vy = float(end[0]) - sx, float(end[1]) - sy
+        dist = math.hypot(vx, vy)
+        xs, tmp = sc.xs_col[:, 0], sc.tmp
+        ox, oy = out_xy[:, 0], out_xy[:, 1]
+        np.multiply(xs, np.float32(vx), out=ox)
+        np.multiply(y, np.float32(vy), out=tmp)
+        ox -= tmp
+        ox += np.float32(sx)
+        np.multiply(xs, np.float32(vy), out=oy)
+        np.multiply(y, np.float32(vx), out=tmp)
+        oy += tmp
+        oy += np.float32(sy)
+
+        # 4)+6) MJ 速度曲线 → dt，并按距离自适应缩放
+        # 4)+6) MJ velocity profile -> dt, scaled to the distance
+        scale = T_hat * (dist / D_hat if D_hat > 1e-3 else 1.0)
+        out_dt[0] = 0.0
+        np.multiply(sc.v_w, np.float32(scale), out=out_dt[1:])
+
+        # 7) MJ 加权抖动 / MJ-weighted jitter
+        if amp_jitter_px:
+            noise = sc.noise
+            rng.standard_normal(dtype=np.float32, out=noise)
+            noise *= np.float32(amp_jitter_px)
+            noise *= sc.xs_col
+            out_xy += noise
+        return out_xy, out_dt
+
+    def generate_stream(self,
+                        start: tuple[float, float],
+                        end: tuple[float, float],
+                        N: int = 120,
+                        amp_jitter_px: float = 1.0,
+                        chunk_size: int = 8,
+                        base_seed: int | None = None,
+                        index: int = 0,
+                        rng: np.random.Generator | None = None
+                        ) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """
+        逐块惰性生成单条轨迹
+        Generate one trajectory lazily, chunk by chunk.
+
+        只在开始时采样潜变量，之后每块只计算该块的形状算子列、映射与抖动，因此第一块
+        在几微秒内可用；可直接交给 ``PlaybackScheduler.play_stream``。随机数与
+        ``generate_into`` 相同，拼接后的结果在浮点舍入范围内一致。
+        Only the latents are sampled up front; each chunk then evaluates just
+        its columns of the shape operator, the mapping and the jitter, so the
+        first chunk is ready within microseconds. Feed the iterator straight
+        into ``PlaybackScheduler.play_stream``. Random numbers are the same as
+        for ``generate_into``, so the concatenated chunks match it up to rounding.
+
+        Yields
+        ------
+        xy : (k,2)  float32  该块的绝对坐标 / Absolute coordinates of the chunk.
+        dt : (k,)   float64  该块各点之前的间隔（秒），首块 dt[0]=0 / Gaps before each point (s), dt[0]=0 in the first chunk.
+        """
+        if not self._is_trained:
+            raise RuntimeError("Model is not trained yet. Please call fit() first.")
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        if N < 2:
+            raise ValueError("N must be at least 2")
+
+        sc, rng, D_hat, T_hat = self._into_latents(N, base_seed, index, rng)
+        # 系数复制出来，本线程其它调用不会覆盖 / Copy the coefficients so other calls on this thread cannot overwrite them
+        coeffs = sc.coeffs.copy()
+        sx, sy = float(start[0]), float(start[1])
+        vx, vy = float(end[0]) - sx, float(end[1]) - sy
+        dist = math.hypot(vx, vy)
+        scale = np.float32(T_hat * (dist / D_hat if D_hat > 1e-3 else 1.0))
+        fx, fy = np.float32(vx), np.float32(vy)
+
+        for lo in range(0, N, chunk_size):
+            hi = min(lo + chunk_size, N)
+            # 2)‑3) 只计算本块的列 / Only this chunk's columns
+            y = coeffs @ sc.op[:, lo:hi]
+            y += sc.offset[lo:hi]
+            xs = sc.xs_col[lo:hi, 0]
+            # 5) 仿射映射 / Affine mapping
+            xy = np.empty((hi - lo, 2), dtype="float32")
+            xy[:, 0] = xs * fx - y * fy + np.float32(sx)
+            xy[:, 1] = xs * fy + y * fx + np.float32(sy)
+            # 4)+6) 时间间隔 / Time intervals
+            dt = np.zeros(hi - lo, dtype="float64")
+            first = 1 if lo == 0 else 0
+            dt[first:] = sc.v_w[lo + first - 1:hi - 1] * scale
+            # 7) MJ 加权抖动 / MJ-weighted jitter
+            if amp_jitter_px:
+                noise = rng.standard_normal((hi - lo, 2), dtype=np.float32)
+                noise *= np.float32(amp_jitter_px)
+                noise *= sc.xs_col[lo:hi]
+                xy += noise
+            yield xy, dt
+
+    def _into_latents(self, N, base_seed, index, rng):
+        """
+        选择随机流并采样一条轨迹的潜变量：形状系数写入 ``sc.coeffs``
+        Pick the random stream and sample one trajectory's latents, with the
+        shape coefficients written to ``sc.coeffs``.
+
+        Returns
+        -------
+        (sc, rng, D_hat, T_hat)
+        """
+        local = self._into_local
+        samplers = self._samplers()
+        gmm_shape, gmm_global = samplers
+        if getattr(local, "samplers", None) is not samplers:
+            local.samplers = samplers
+            local.latents = tuple(np.empty(g.n_features) for g in (gmm_shape, gmm_shape,
+                                                                   gmm_global, gmm_global))
+            local.scratch = {}
+        if base_seed is not None:
+            rng = trajectory_rng(base_seed, index)
+        elif rng is None:
+            rng = getattr(local, "rng", None)
+            if rng is None:
+                rng = local.rng = np.random.default_rng()
+        sc = self._into_scratch(N)
+
+        z_shape, s_shape, z_global, s_global = local.latents
+        gmm_shape.sample_into(rng, z_shape, s_shape)
+        gmm_global.sample_into(rng, z_global, s_global)
+        sc.coeffs[:] = s_shape
+        return sc, rng, float(s_global[0]), float(s_global[1])
+
+    def _into_scratch(self, N) -> _IntoScratch:
+        """
+        本线程 N 点的 float32 临时缓冲（形状算子变化时重建）
+        This thread's float32 scratch for N points, rebuilt when the shape operator changes.
+        """
+        shape_op = self._shape_operator(N)
+        scratch = self._into_local.scratch
+        sc = scratch.get(N)
+        if sc is None or sc.source is not shape_op:
+            sc = scratch[N] = _IntoScratch(source=shape_op,
+                                           op=shape_op.op.astype("float32"),
+                                           offset=shape_op.offset.astype("float32"),
+                                           xs_col=shape_op.xs_N.astype("float32")[:, None],
+                                           v_w=shape_op.v_w.astype("float32"),
+                                           coeffs=np.empty(self.n_shape_pc, dtype="float32"),
+                                           y=np.empty(N, dtype="float32"),
+                                           tmp=np.empty(N, dtype="float32"),
+                                           noise=np.empty((N, 2), dtype="float32"))
+        return sc
+
+    # ---------- 生成的各个阶段 ----------
+    # ---------- Generation stages ----------
+    def _sample_latents(self, M, N, amp_jitter_px, seeds, rng_mode="compat", rng=None):
+        """
+        采样 (M,p) 形状系数、(M,) D_hat/T_hat 以及 (M,N,2) 抖动噪声
+        Sample (M,p) shape coefficients, (M,) D_hat/T_hat and (M,N,2) jitter noise.
+        """
+        gmm_shape, gmm_global = self._samplers()
+        if seeds is None:
+            # 整批一次抽取 / Draw the whole batch at once
+            rng = np.random.default_rng(rng)
+            coeffs = gmm_shape.sample(M, rng).astype("float32")
+            globals_ = gmm_global.sample(M, rng)
+            noise = rng.normal(0, amp_jitter_px, (M, N, 2)).astype("float32")
+            return coeffs, globals_[:, 0], globals_[:, 1], noise
+
+        # 逐条使用各自的种子（或计数器随机流），保证与单条生成一致
+        # One stream per item (a seed or a counter-based Generator) so each
+        # matches the single-path result
+        coeffs = np.empty((M, self.n_shape_pc), dtype="float32")
+        globals_ = np.empty((M, 2), dtype="float64")
+        noise = np.empty((M, N, 2), dtype="float32")
+        for i, seed in enumerate(seeds):
+            # default_rng 原样返回传入的 Generator / default_rng returns a Generator unchanged
+            rng = np.random.default_rng(seed)
+            if rng_mode == "compat" and seed is not None and rng is not seed:
+                # 形状与全局标量共用同一 RandomState，抖动用独立 Generator
+                # Shape and global scalars share one RandomState; jitter uses its own Generator
+                rs = np.random.RandomState(seed)
+                coeffs[i] = gmm_shape.sample_compat(1, rs)[0]
+                globals_[i] = gmm_global.sample_compat(1, rs)[0, :2]
+            else:
+                coeffs[i] = gmm_shape.sample(1, rng)[0]
+                globals_[i] = gmm_global.sample(1, rng)[0, :2]
+            noise[i] = rng.normal(0, amp_jitter_px, (N, 2))
+        return coeffs, globals_[:, 0], globals_[:, 1], noise
+
+    def _shape_basis(self) -> tuple[np.ndarray, np.ndarray]:
+        """
+        形状 PCA 的 (components_, mean_)
+        The shape PCA's (components_, mean_).
+        """
+        if self.pca is not None:
+            return self.pca.components_, self.pca.mean_
+        return self._pca_basis
+
+    def _samplers(self) -> tuple[FrozenGMM, FrozenGMM]:
+        """
+        形状 / 全局 GMM 的冻结采样器（首次使用时构建）
+        Frozen samplers for the shape and global GMMs, built on first use.
+        """
+        if self._frozen_gmms is None:
+            self._frozen_gmms = (FrozenGMM.from_sklearn(self.gmm_shape),
+                                 FrozenGMM.from_sklearn(self.gmm_global))
+        return self._frozen_gmms
+
+    def _normalized_shapes(self, coeffs, N):
+        """
+        (M,p) 形状系数 → (M,N,2) 起点 (0,0)、终点 (1,0) 的归一化轨迹
+        (M,p) shape coefficients -> (M,N,2) normalized trajectories from (0,0) to (1,0).
+        """
+        # 2)‑3) PCA 重建 + 三次样条插值合并为一个线性算子
+        # 2)-3) PCA reconstruction and cubic-spline interpolation fused into one linear map
+        # einsum 逐行计算，批量结果与单条一致（BLAS matmul 不保证）
+        # einsum works row by row, so batch rows match single rows (BLAS matmul does not guarantee this)
+        shape_op = self._shape_operator(N)
+        traj_norm = np.empty((len(coeffs), N, 2), dtype="float32")
+        traj_norm[:, :, 0] = shape_op.xs_N
+        traj_norm[:, :, 1] = np.einsum("mp,pn->mn", coeffs, shape_op.op) + shape_op.offset
+        return traj_norm
+
+    def _shape_operator(self, N):
+        """
+        返回（并按 LRU 缓存）N 点的融合形状算子
+        Return the fused shape operator for N points, memoized in an LRU.
+
+        形状基曲线的 x 轴为 K 个 Minimum‑Jerk 位移节点，插值点为 N 个 MJ 位移，
+        二者只依赖 K、N，因此「系数 → components_ → 样条 → ys_N」是固定线性映射。
+        The knots (K MJ displacements) and evaluation points (N MJ displacements)
+        depend only on K and N, so coeff -> components_ -> spline -> ys_N is a
+        fixed linear map.
+        """
+        with self._operator_lock:
+            shape_op = self._operator_cache.get(N)
+            if shape_op is not None:
+                self._operator_cache.move_to_end(N)
+                return shape_op
+
+        # x 轴用 Minimum‑Jerk 位移，解决「尾段速度异常」
+        # Use Minimum-Jerk displacement for the x-axis to fix "abnormal end-segment velocity"
+        t = lap_start()
+        xs_k = self._min_jerk_position(np.linspace(0, 1, self.K, dtype="float32"))
+        xs_N = self._min_jerk_position(np.linspace(0, 1, N, dtype="float32"))
+        basis = _cubic_spline_basis(xs_k.astype("float64"), xs_N.astype("float64"))   # (K,N)
+        components, mean = self._shape_basis()
+        shape_op = _ShapeOperator(op=components @ basis,
+                                  offset=mean @ basis,
+                                  xs_N=xs_N,
+                                  v_w=self._min_jerk_velocity_profile(N))
+        with self._operator_lock:
+            self._operator_cache[N] = shape_op
+            while len(self._operator_cache) > self.OPERATOR_CACHE_SIZE:
+                self._operator_cache.popitem(last=False)
+        lap("generate.shape_operator", t)
+        return shape_op
+
+    def _dt_profile(self, T_hat, N):
+        """
+        (M,) 总时长 → (M,N) dt，dt[:,0]=0
+        (M,) total durations -> (M,N) dt with dt[:,0]=0.
+        """
+        v_w = self._shape_operator(N).v_w
+        dt = np.zeros((len(T_hat), N), dtype="float64")
+        dt[:, 1:] = (T_hat[:, None] * v_w).astype("float32")
+        return dt
+
+    def _map_to_endpoints(self, traj_norm, dt, D_hat, S, E, noise):
+        """
+        把归一化轨迹映射到真实起终点；原地缩放 dt 并返回 (M,N,2) 绝对坐标
+        Map normalized trajectories onto the real endpoints; scales ``dt`` in
+        place and returns the (M,N,2) absolute coordinates.
+        """
+        N = traj_norm.shape[1]
 
         # 5) 仿射映射到真实起‑终点
         # 5) Affine mapping to the real start and end points
-        S, E = np.float32(start), np.float32(end)
+        t = lap_start()
         v_SE = E - S
-        dist = np.linalg.norm(v_SE)
-        theta = np.arctan2(v_SE[1], v_SE[0])
-        R = np.array([[np.cos(theta), -np.sin(theta)],
-                      [np.sin(theta),  np.cos(theta)]],
-                     dtype="float32")
-        xy_abs = (R @ (traj_norm.T * dist)).T + S        # (N,2)
+        dist = np.hypot(v_SE[:, 0], v_SE[:, 1])
+        theta = np.arctan2(v_SE[:, 1], v_SE[:, 0])
+        cos, sin = np.cos(theta), np.sin(theta)
+        R = np.stack([np.stack([cos, -sin], axis=1),
+                      np.stack([sin, cos], axis=1)], axis=1)   # (M,2,2)
+        xy_abs = np.einsum("mij,mnj->mni", R, traj_norm * dist[:, None, None])
+        xy_abs += S[:, None, :]
 
         # 6) 距离‑时间自适应缩放：保持平均速度合理
         # 6) Distance-time adaptive scaling: keep the average speed reasonable
-        if D_hat > 1e-3:
-            xy_scale = dist / D_hat
-            dt[1:] *= xy_scale
-
-        # 7) 添加 MJ 抖动噪声（同一 RNG）
-        # 7) Add MJ jitter noise (same RNG)
-        noise = rng.normal(0, amp_jitter_px, xy_abs.shape).astype("float32")
-        w_t = self._min_jerk_position(np.linspace(0, 1, N, dtype="float32"))
-        xy_abs += w_t[:, None] * noise
+        scaled = D_hat > 1e-3
+        dt[scaled, 1:] *= (dist[scaled] / D_hat[scaled])[:, None]
+        t = lap("generate.rotate", t)
 
-        return xy_abs, dt
-
-    @staticmethod
-    def _gmm_sample(gmm, n_samples, rs=None):
-        """
-        对 scikit-learn < 1.2 不支持 random_state 的向后兼容封装
-        Backward compatibility wrapper for scikit-learn < 1.2 which doesn't support random_state.
-        返回值与 gmm.sample 相同
-        Returns the same as gmm.sample.
-        """
-        if 'random_state' in inspect.signature(gmm.sample).parameters:
-            # 新版接口，直接传
-            # New interface, pass directly
-            return gmm.sample(n_samples, random_state=rs)
-        else:
-            # 旧版接口：临时覆盖 gmm.random_state
-            # Old interface: temporarily override gmm.random_state
-            if rs is not None:
-                old = getattr(gmm, 'random_state', None)
-                gmm.random_state = rs
-                out = gmm.sample(n_samples)
-                gmm.random_state = old
-                return out
-            return gmm.sample(n_samples)
+        # 7) 添加 MJ 抖动噪声（权重即 MJ 位移）
+        # 7) Add MJ jitter noise (weights are the MJ displacement)
+        w_t = self._shape_operator(N).xs_N
+        xy_abs += w_t[None, :, None] * noise
+        lap("generate.jitter", t)
+        return xy_abs
 
     # ----------------- 模型持久化 ------------------
     # -------------- Model Persistence --------------
     def save(self, filepath: str | Path):
         if not self._is_trained:
             raise RuntimeError("Model is not trained yet. Please call fit() first.")
+        if self.pca is None:
+            raise RuntimeError("Model was loaded from a compact file and has no "
+                               "scikit-learn estimators; use export_compact() instead.")
+        state = {k: v for k, v in self.__dict__.items()
+                 if k not in self._TRANSIENT_ATTRS}
         with open(filepath, "wb") as f:
-            pickle.dump(self.__dict__, f)
+            pickle.dump(state, f)
 
     @classmethod
     def load(cls, filepath: str | Path) -> "HumanMouseModel":
+        """
+        加载模型文件；自动识别 pickle 与紧凑格式
+        Load a model file, detecting pickle or compact format automatically.
+        """
+        if is_compact_file(filepath):
+            return cls.load_compact(filepath)
         with open(filepath, "rb") as f:
             state = pickle.load(f)
         self = cls()
         self.__dict__.update(state)
         return self
 
+    def export_compact(self, filepath: str | Path):
+        """
+        导出为紧凑格式：仅包含生成所需的数组，无 pickle、无 sklearn 对象
+        Export to the compact format: only the arrays generation needs, with no
+        pickle and no scikit-learn objects.
+        """
+        if not self._is_trained:
+            raise RuntimeError("Model is not trained yet. Please call fit() first.")
+        components, mean = self._shape_basis()
+        arrays = {"pca_components": components, "pca_mean": mean}
+        for prefix, gmm in zip(("shape", "global"), self._samplers()):
+            arrays[f"{prefix}_weights"] = gmm.weights
+            arrays[f"{prefix}_means"] = gmm.means
+            arrays[f"{prefix}_cholesky"] = gmm.cholesky
+            arrays[f"{prefix}_mvn_factors"] = gmm.mvn_factors
+        header = {"K": self.K,
+                  "n_shape_pc": self.n_shape_pc,
+                  "n_mix_shape": self.n_mix_shape,
+                  "n_mix_global": self.n_mix_global,
+                  "seed": self.seed}
+        write_compact(filepath, header, arrays)
+
+    @classmethod
+    def load_compact(cls, filepath: str | Path, mmap: bool = True) -> "HumanMouseModel":
+        """
+        从紧凑格式加载；``mmap=True`` 时数组为只读内存映射，可在进程间共享页面
+        Load from the compact format. With ``mmap=True`` the arrays are read-only
+        memory maps whose pages are shared between processes.
+        """
+        header, arrays = read_compact(filepath, mmap=mmap)
+        self = cls(K=header["K"],
+                   n_shape_pc=header["n_shape_pc"],
+                   n_mix_shape=header["n_mix_shape"],
+                   n_mix_global=header["n_mix_global"],
+                   seed=header["seed"])
+        self._pca_basis = (arrays["pca_components"], arrays["pca_mean"])
+        self._frozen_gmms = tuple(
+            FrozenGMM(arrays[f"{prefix}_weights"],
+                      arrays[f"{prefix}_means"],
+                      cholesky=arrays[f"{prefix}_cholesky"],
+                      mvn_factors=arrays[f"{prefix}_mvn_factors"])
+            for prefix in ("shape", "global"))
+        self._is_trained = True
+        return self
+
     # ====================================================
     #                     -------- 私有工具 --------
     #                    ----- Private Utilities -----
@@ -227,70 +833,45 @@ class HumanMouseModel:
     # ---------- 数据加载 ----------
     # ---------- Data Loading ----------
     @staticmethod
-    def _load_traces(csv_dir: Path):
-        """
-        读取目录内全部 CSV 并做基本合法性检查
-        Read all CSVs in the directory and perform basic validation.
-        """
-        xy_list, dt_list = [], []
-        files = sorted(csv_dir.glob("*.csv"))
-        if not files:
-            raise ValueError(f"No CSV files found in directory {csv_dir}")
-
-        print(f"[Loading] Found {len(files)} CSV files.")
-        for fp in files:
-            try:
-                df = pd.read_csv(fp)
-
-                # 必需列
-                # Required columns
-                cols_needed = {"x_coordinate", "y_coordinate", "time_interval_seconds"}
-                if not cols_needed.issubset(df.columns):
-                    print(f"[Skipping] {fp.name} is missing required columns.")
-                    continue
-
-                xy = df[["x_coordinate", "y_coordinate"]].values.astype("float32")
-                dts = df["time_interval_seconds"].values.astype("float32")
-
-                if len(xy) < 10 or len(xy) != len(dts):
-                    print(f"[Skipping] {fp.name} has insufficient data points or mismatched column lengths.")
-                    continue
-
-                # 第一个 dt 应为 0，若不是则修正
-                # The first dt should be 0, correct it if not.
-                if abs(dts[0]) > 1e-6:
-                    # 判断是否累积时间
-                    # Check if it's cumulative time
-                    if np.all(np.diff(dts) >= 0):
-                        dts = np.concatenate(([0.], np.diff(dts)))
-                    else:
-                        dts[0] = 0.
-
-                if np.any(dts[1:] <= 0):
-                    print(f"[Skipping] {fp.name} contains non-positive time intervals.")
-                    continue
-
-                xy_list.append(xy)
-                dt_list.append(dts)
-
-            except Exception as e:
-                print(f"[Error] Failed to read {fp.name}: {e}")
-
-        if not xy_list:
+    @timed("fit.load_traces")
+    def _load_traces(csv_dir: Path, jobs: int = 1) -> tuple["TraceSet", "LoadReport"]:
+        """
+        读取目录内全部 CSV 并做基本合法性检查（见 ``traces.load_traces``）；
+        数据集目录则直接内存映射（见 ``dataset.load_dataset``）
+        Read all CSVs in the directory and perform basic validation (see
+        ``traces.load_traces``); a dataset directory is memory-mapped directly
+        (see ``dataset.load_dataset``).
+        """
+        # 训练模块只在训练时导入 / Training modules are imported only when training
+        from .dataset import is_dataset, load_dataset
+        from .traces import load_traces
+
+        if is_dataset(csv_dir):
+            traces, report = load_dataset(csv_dir)
+        else:
+            traces, report = load_traces(csv_dir, jobs)
+        if not len(traces):
             raise ValueError("No valid trajectories available for training.")
-        print(f"[Load complete] Valid trajectories: {len(xy_list)}")
-        return xy_list, dt_list
+        return traces, report
 
     # ---------- 特征 ----------
     # -------- Features --------
-    def _extract_features(self, xy_list, dt_list):
-        shapes, globals_ = [], []
-        for xy, dts in zip(xy_list, dt_list):
-            xy_n, dist, *_ = self._affine_normalise(xy)
-            xy_rs = self._resample_by_arclength(xy_n, self.K)
-            shapes.append(xy_rs[:, 1])  # 仅保存 y（形状）/ Only save y (the shape)
-            globals_.append(self._global_features(xy, dts))
-        return np.stack(shapes), np.stack(globals_)
+    @timed("fit.extract_features")
+    def _extract_features(self, traces: "TraceSet", cache=None):
+        """
+        在拼接的轨迹上批量提取特征（见 ``features.extract_features``），结果与
+        逐条调用下面三个工具的结果逐位一致；给定 ``cache`` 时只提取未缓存的轨迹
+        Extract features in batches over the concatenated trajectories (see
+        ``features.extract_features``), bit-identical to calling the three
+        utilities below per trace; with a ``cache`` only uncached trajectories are extracted.
+        """
+        from .features import FeatureCache, extract_features
+
+        if cache is None:
+            return extract_features(traces, self.K)
+        if not isinstance(cache, FeatureCache):
+            cache = FeatureCache(cache)
+        return cache.extract(traces, self.K)
 
     # ---------- 归一化 & 重采样 ----------
     # ----- Normalization & Resampling -----
@@ -377,11 +958,25 @@ def diagnose_csv_file(csv_path: str) -> None:
 
 def train_mouse_model(csv_directory: str,
                       model_save_path: str = "mouse_model.pkl",
+                      compact_save_path: Optional[str] = None,
+                      jobs: int = 1,
+                      feature_cache: Optional[str] = None,
+                      streaming: bool = False,
+                      chunk_size: int = 65536,
                       **kwargs) -> None:
     model = HumanMouseModel(**kwargs)
-    model.fit(csv_directory)
+    if streaming:
+        report = model.fit_streaming(csv_directory, chunk_size=chunk_size)
+    else:
+        report = model.fit(csv_directory, jobs=jobs, feature_cache=feature_cache)
+    for name, reason in report.skipped:
+        print(f"[Skipping] {name}: {reason}")
+    print(f"[Load complete] {report.summary()}")
     model.save(model_save_path)
     print(f"[Saved] Model has been written to -> {model_save_path}")
+    if compact_save_path:
+        model.export_compact(compact_save_path)
+        print(f"[Saved] Compact model has been written to -> {compact_save_path}")
 
 def generate_mouse_trajectory(model_path: str,
                               start_point: Tuple[float, float],
@@ -390,7 +985,10 @@ def generate_mouse_trajectory(model_path: str,
                               jitter_amplitude: float = 1.0,
                               seed: Optional[int] = None
                               ) -> Tuple[np.ndarray, np.ndarray]:
-    model = HumanMouseModel.load(model_path)
+    # 经由进程级注册表，避免每次调用都反序列化模型
+    # Go through the process-wide registry so the model is not unpickled on every call
+    from .registry import get_model
+    model = get_model(model_path)
     return model.generate(start_point, end_point,
                           N=num_points,
                           amp_jitter_px=jitter_amplitude,
@@ -402,7 +1000,7 @@ def generate_mouse_trajectory(model_path: str,
 #                Command-Line Interface
 # ====================================================
 
-def _cli():
+def _cli(argv=None):
     parser = argparse.ArgumentParser(
         description="HumanMouseModel Training / Generation CLI",
         formatter_class=argparse.RawDescriptionHelpFormatter
@@ -415,16 +1013,22 @@ def _cli():
 
     # train
     p_t = sub.add_parser("train", help="Train a new model from a directory of CSVs")
-    p_t.add_argument("csv_dir", help="Directory containing trajectory CSV files")
+    p_t.add_argument("csv_dir", help="Directory containing trajectory CSV files, or a dataset built with 'dataset build'")
     p_t.add_argument("--save", default="mouse_model.pkl", help="Path to save the trained model")
+    p_t.add_argument("--save_compact", help=f"Optional path to also save the model in compact ({COMPACT_SUFFIX}) format")
     p_t.add_argument("--K", type=int, default=30, help="Number of points for resampling")
     p_t.add_argument("--n_shape_pc", type=int, default=6, help="Number of PCA components for shape")
     p_t.add_argument("--n_mix_shape", type=int, default=7, help="Number of GMM mixtures for shape")
     p_t.add_argument("--n_mix_global", type=int, default=5, help="Number of GMM mixtures for global features")
+    p_t.add_argument("--jobs", type=int, default=1, help="Worker processes used to read the CSV files")
+    p_t.add_argument("--feature_cache", help="Directory of a persistent feature cache reused across retrains")
+    p_t.add_argument("--streaming", action="store_true",
+                     help="Out-of-core training from a dataset (incremental PCA and online EM)")
+    p_t.add_argument("--chunk_size", type=int, default=65536, help="Trajectories per chunk with --streaming")
 
     # gen
     p_g = sub.add_parser("gen", help="Generate a trajectory from a trained model")
-    p_g.add_argument("model_pkl", help="Path to the trained model .pkl file")
+    p_g.add_argument("model_pkl", help=f"Path to the trained model (.pkl or compact {COMPACT_SUFFIX}) file")
     p_g.add_argument("x0", type=float, help="Start point x-coordinate")
     p_g.add_argument("y0", type=float, help="Start point y-coordinate")
     p_g.add_argument("x1", type=float, help="End point x-coordinate")
@@ -434,7 +1038,26 @@ def _cli():
     p_g.add_argument("--seed", type=int, help="Random seed for reproducibility")
     p_g.add_argument("--out_csv", help="Optional path to save the generated trajectory as a CSV file")
 
-    args = parser.parse_args()
+    # gen-bulk
+    p_b = sub.add_parser("gen-bulk", help="Generate many trajectories into npz shards with a process pool")
+    p_b.add_argument("model_pkl", help=f"Path to the trained model (.pkl or compact {COMPACT_SUFFIX}) file")
+    p_b.add_argument("out_dir", help="Directory for the npz shards and manifest.json")
+    p_b.add_argument("--count", type=int, help="Number of trajectories (default: one per pair in --pairs_file)")
+    p_b.add_argument("--pairs_file", help="CSV (x0,y0,x1,y1) or .npy file of start/end pairs, cycled to --count")
+    p_b.add_argument("--rect", type=float, nargs=4, default=[0, 0, 1920, 1080],
+                     metavar=("X0", "Y0", "X1", "Y1"),
+                     help="Screen rectangle for random start/end points when no pairs file is given")
+    p_b.add_argument("--num_points", type=int, default=120, help="Number of points per trajectory")
+    p_b.add_argument("--jitter", type=float, default=1.0, help="Amplitude of the jitter noise in pixels")
+    p_b.add_argument("--seed", type=int, help="Base seed; output is identical for any --jobs but changes with --chunk_size "
+                          "unless --per_index is given")
+    p_b.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Number of worker processes")
+    p_b.add_argument("--chunk_size", type=int, default=10000, help="Trajectories per shard; also keys the random streams, so it changes the output")
+    p_b.add_argument("--per_index", action="store_true",
+                     help="Key trajectory i on (seed, i) so it equals generate(base_seed=seed, index=i) "
+                          "for any --chunk_size (about 3x slower)")
+
+    args = parser.parse_args(argv)
 
     if args.cmd == "diagnose":
         diagnose_csv_file(args.csv_file)
@@ -443,6 +1066,11 @@ def _cli():
         train_mouse_model(
             args.csv_dir,
             args.save,
+            compact_save_path=args.save_compact,
+            jobs=args.jobs,
+            feature_cache=args.feature_cache,
+            streaming=args.streaming,
+            chunk_size=args.chunk_size,
             K=args.K,
             n_shape_pc=args.n_shape_pc,
             n_mix_shape=args.n_mix_shape,
@@ -471,5 +1099,29 @@ def _cli():
             for i in range(min(5, len(xy))):
                 print(f"{xy[i, 0]:.1f}, {xy[i, 1]:.1f}, {dt[i]:.4f}")
 
+    elif args.cmd == "gen-bulk":
+        from .bulk import generate_bulk, load_pairs
+        pairs = load_pairs(args.pairs_file) if args.pairs_file else None
+        count = args.count if args.count is not None else (len(pairs) if pairs is not None else None)
+        if count is None:
+            parser.error("gen-bulk needs --count or --pairs_file")
+        report = generate_bulk(
+            args.model_pkl,
+            args.out_dir,
+            count,
+            pairs=pairs,
+            rect=args.rect,
+            N=args.num_points,
+            amp_jitter_px=args.jitter,
+            seed=args.seed,
+            jobs=args.jobs,
+            chunk_size=args.chunk_size,
+            per_index=args.per_index,
+            progress=lambda done, total: print(f"\r[Generating] {done}/{total}", end="", flush=True)
+        )
+        print(f"\n[Saved] {report['count']} trajectories in {len(report['shards'])} shards -> {args.out_dir}")
+        print(f"[Throughput] {report['seconds']:.2f}s, {report['rate']:,.0f} trajectories/s "
+              f"with {args.jobs} job(s)")
+
 if __name__ == "__main__":
     _cli()
\ No newline at end of file
@@ -0,0 +1,44 @@
+"""
+共享测试夹具
+Shared test fixtures
+"""
+import warnings
+
+import pytest
+
+from humanmouse.models import get_default_model_path
+from humanmouse.models.trajectory_model import HumanMouseModel
+
+
+@pytest.fixture(scope="session")
+def model():
+    """加载内置模型"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return HumanMouseModel.load(get_default_model_path())
+
+
+class FakeClock:
+    """每次读取前进1微秒的假时钟（纳秒），sleep 直接推进时间"""
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        self.now += 1_000
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += int(seconds * 1e9)
+
+
+@pytest.fixture
+def fake_clock():
+    """回放调度器用的假时钟"""
+    return FakeClock()
+
+
+@pytest.fixture
+def clock_factory():
+    """需要多个独立假时钟的测试使用"""
+    return FakeClock
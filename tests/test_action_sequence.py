@@ -0,0 +1,106 @@
+"""
+测试流水线动作序列
+Test pipelined action sequences
+"""
+import random
+import threading
+
+import numpy as np
+import pytest
+
+from humanmouse.controllers.backends import RecordingBackend
+from humanmouse.controllers.mouse_controller import HumanMouseController, MouseAction
+from humanmouse.controllers.playback import PlaybackScheduler
+
+
+@pytest.fixture
+def recorded(fake_clock):
+    """使用假时钟与录制后端的控制器"""
+    rec = RecordingBackend()
+    rec._clock = lambda: fake_clock.now
+    controller = HumanMouseController(num_points=20, jitter_amplitude=0.0, backend=rec,
+                                      scheduler=PlaybackScheduler(clock=fake_clock, sleep=fake_clock.sleep))
+    return controller, rec
+
+
+class TestRun:
+    """测试HumanMouseController.run"""
+
+    def test_event_order(self, recorded):
+        """测试动作按顺序执行"""
+        controller, rec = recorded
+        reports = controller.run([("click", (300, 200), 1),
+                                  MouseAction("move", (100, 100), seed=2),
+                                  ("drag", (400, 400), 3),
+                                  ("right_click", (50, 50), 4)],
+                                 start_point=(0, 0))
+        assert len(reports) == 4
+        kind = rec.events()["kind"]
+        clicks = np.flatnonzero(kind == rec.CLICK)
+        assert len(clicks) == 2 and clicks[-1] == len(kind) - 1
+        assert (kind == rec.DOWN).sum() == 1 and (kind == rec.UP).sum() == 1
+        assert rec.events()["button"][-1] == rec.BUTTONS['right']
+        assert rec.position() == pytest.approx((50, 50), abs=1e-3)
+
+    def test_matches_single_actions(self, recorded):
+        """测试与逐个生成的轨迹一致"""
+        controller, rec = recorded
+        controller.run([("move", (300, 200), 5), ("move", (10, 400), 6)], start_point=(0, 0))
+        model = controller.preload()
+        xy1, _ = model.generate((0, 0), (300, 200), N=20, amp_jitter_px=0.0, seed=5)
+        xy2, _ = model.generate((300, 200), (10, 400), N=20, amp_jitter_px=0.0, seed=6)
+        _, moved = rec.moves()
+        np.testing.assert_array_equal(moved, np.concatenate([xy1, xy2]).astype("float64"))
+
+    def test_pause_is_only_gap(self, recorded):
+        """测试点击停顿折叠进时间表，下一段轨迹在点击时刻开始"""
+        controller, rec = recorded
+        controller.set_speed(2.0)
+        reports = controller.run([("click", (300, 200), 1), ("move", (100, 100), 2)],
+                                 start_point=(0, 0))
+        events = rec.events()
+        t, kind = events["t_ns"], events["kind"]
+        click = int(np.flatnonzero(kind == rec.CLICK)[0])
+        pause = (t[click] - t[0]) / 1e9 - reports[0].planned
+        assert 0.05 / 2.0 - 1e-4 <= pause <= 0.15 / 2.0 + 1e-4
+        assert (t[click + 1] - t[click]) / 1e9 < 1e-4
+
+    def test_generates_on_worker(self, recorded):
+        """测试后续轨迹在工作线程生成"""
+        controller, _ = recorded
+        threads = []
+        generate = controller._generate_trajectory
+
+        def spy(*args):
+            threads.append(threading.current_thread().name)
+            return generate(*args)
+
+        controller._generate_trajectory = spy
+        controller.run([("move", (300, 200)), ("move", (0, 0)), ("move", (50, 50))], start_point=(0, 0))
+        assert len(threads) == 3
+        assert all(name.startswith("humanmouse-gen") for name in threads)
+
+    def test_unknown_action(self, recorded):
+        """测试未知动作类型"""
+        controller, _ = recorded
+        with pytest.raises(ValueError):
+            controller.run([("jump", (1, 1))])
+
+
+def test_controller_stream_is_reproducible(clock_factory):
+    """测试同一基础种子的控制器重现相同的轨迹与停顿，且不使用全局random"""
+    def record(seed):
+        clock = clock_factory()
+        rec = RecordingBackend()
+        rec._clock = lambda: clock.now
+        controller = HumanMouseController(num_points=20, backend=rec, seed=seed,
+                                          scheduler=PlaybackScheduler(clock=clock, sleep=clock.sleep))
+        controller.run([("click", (300, 200)), ("move", (50, 80))], start_point=(0, 0))
+        return rec.events()
+
+    state = random.getstate()
+    first, second, other = record(5), record(5), record(6)
+    assert random.getstate() == state
+    np.testing.assert_array_equal(first["x"], second["x"])
+    np.testing.assert_array_equal(first["t_ns"], second["t_ns"])
+    assert not np.array_equal(first["x"], other["x"])
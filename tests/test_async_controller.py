@@ -0,0 +1,69 @@
+"""
+测试asyncio控制器
+Test the asyncio controller
+"""
+import asyncio
+
+import numpy as np
+import pytest
+
+from humanmouse.controllers.async_controller import AsyncHumanMouseController
+from humanmouse.controllers.backends import RecordingBackend
+from humanmouse.controllers.playback import PlaybackScheduler
+
+
+def _controller(**kwargs):
+    rec = RecordingBackend(position=(0.0, 0.0))
+    return AsyncHumanMouseController(num_points=20, jitter_amplitude=0.0, backend=rec, **kwargs), rec
+
+
+class TestAsyncHumanMouseController:
+    """测试AsyncHumanMouseController类"""
+
+    def test_click_at(self):
+        """测试移动并点击"""
+        controller, rec = _controller(speed_factor=20.0)
+        report = asyncio.run(controller.click_at((300, 200), seed=1))
+        assert report.points_total == 20
+        assert rec.position() == pytest.approx((300, 200), abs=1e-3)
+        assert rec.events()["kind"][-1] == rec.CLICK
+
+    def test_same_trajectory_as_sync(self):
+        """测试与同步生成的轨迹一致"""
+        controller, rec = _controller(speed_factor=20.0,
+                                      scheduler=PlaybackScheduler(skip_when_behind=False))
+        asyncio.run(controller.move((10, 10), (400, 300), seed=9))
+        xy, _ = controller.preload().generate((10, 10), (400, 300), N=20, amp_jitter_px=0.0, seed=9)
+        np.testing.assert_array_equal(rec.moves()[1], xy.astype("float64"))
+
+    def test_sessions_share_one_thread(self):
+        """测试多个会话并发运行"""
+        sessions = [_controller(speed_factor=10.0) for _ in range(5)]
+
+        async def main():
+            return await asyncio.gather(*(c.run([("move", (200, 100), i), ("click", (50, 300), i)])
+                                          for i, (c, _) in enumerate(sessions)))
+
+        results = asyncio.run(main())
+        assert all(len(reports) == 2 for reports in results)
+        assert all(rec.events()["kind"][-1] == rec.CLICK for _, rec in sessions)
+
+    def test_cancel_stops_within_one_interval(self):
+        """测试取消后在一个点间隔内停止并释放按键"""
+        controller, rec = _controller(speed_factor=0.2)
+
+        async def main():
+            task = asyncio.create_task(controller.drag_to((800, 600), seed=2))
+            await asyncio.sleep(0.8)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            count = len(rec)
+            await asyncio.sleep(0.2)
+            return count
+
+        count = asyncio.run(main())
+        kind = rec.events()["kind"]
+        assert len(rec) == count
+        assert kind[-1] == rec.UP
+        assert (kind == rec.MOVE).sum() < 20
@@ -0,0 +1,131 @@
+"""
+测试光标输出后端
+Test the cursor output backends
+"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from humanmouse.core.trajectory import Trajectory, TrajectoryPoint
+from humanmouse.controllers import backends
+from humanmouse.controllers.backends import NullBackend, PyAutoGUIBackend, RecordingBackend
+from humanmouse.controllers.backend_controller import BackendMouseController
+from humanmouse.controllers.mouse_controller import HumanMouseController
+from humanmouse.controllers.playback import PlaybackScheduler
+
+
+class TestRecordingBackend:
+    """测试RecordingBackend类"""
+
+    def test_records_events(self):
+        """测试事件按顺序记录"""
+        rec = RecordingBackend(capacity=2)
+        rec.move_to(1.0, 2.0)
+        rec.mouse_down()
+        rec.move_to(3.0, 4.0)
+        rec.mouse_up()
+        rec.click(button='right', clicks=2)
+
+        events = rec.events()
+        assert len(rec) == 5
+        assert rec.capacity >= 5
+        np.testing.assert_array_equal(events["kind"], [rec.MOVE, rec.DOWN, rec.MOVE, rec.UP, rec.CLICK])
+        np.testing.assert_array_equal(events["x"], [1.0, 1.0, 3.0, 3.0, 3.0])
+        assert events["button"][-1] == rec.BUTTONS['right']
+        assert events["clicks"][-1] == 2
+        assert np.all(np.diff(events["t_ns"]) >= 0)
+        assert rec.position() == (3.0, 4.0)
+
+    def test_clear(self):
+        """测试清空后保留容量"""
+        rec = RecordingBackend(capacity=4)
+        for i in range(10):
+            rec.move_to(i, i)
+        capacity = rec.capacity
+        rec.clear()
+        assert len(rec) == 0
+        assert rec.capacity == capacity
+
+
+class TestPyAutoGUIBackend:
+    """测试PyAutoGUIBackend的快速移动路径"""
+
+    def test_fast_moves_use_platform_layer(self, monkeypatch):
+        """测试有平台层_moveTo时直接调用它"""
+        calls = []
+        fake = SimpleNamespace(platformModule=SimpleNamespace(_moveTo=lambda x, y: calls.append((x, y))))
+        monkeypatch.setattr(backends, "pyautogui", fake)
+        PyAutoGUIBackend(fast_moves=True).move_to(10.6, 20.2)
+        assert calls == [(11, 20)]
+
+    def test_fast_moves_fall_back_to_move_to(self, monkeypatch):
+        """测试平台层缺少_moveTo时退回不暂停的moveTo"""
+        calls = []
+        fake = SimpleNamespace(platformModule=SimpleNamespace(),
+                               moveTo=lambda x, y, **kwargs: calls.append((x, y, kwargs)))
+        monkeypatch.setattr(backends, "pyautogui", fake)
+        PyAutoGUIBackend(fast_moves=True).move_to(10.6, 20.2)
+        assert calls == [(10.6, 20.2, {"duration": 0, "_pause": False})]
+
+
+class TestHumanMouseControllerBackend:
+    """测试HumanMouseController通过后端输出"""
+
+    def test_move_and_click_recorded(self):
+        """测试无显示器时回放并点击"""
+        rec = RecordingBackend()
+        controller = HumanMouseController(num_points=30, jitter_amplitude=0.0, speed_factor=50.0,
+                                          backend=rec, scheduler=PlaybackScheduler(skip_when_behind=False))
+        controller.move_and_click((100, 100), (400, 300), seed=7)
+
+        t, xy = rec.moves()
+        assert len(t) == 30
+        np.testing.assert_allclose(xy[-1], (400, 300), atol=1e-3)
+        assert rec.events()["kind"][-1] == rec.CLICK
+
+    def test_drag_holds_button(self):
+        """测试拖拽时按键在移动前按下、移动后释放"""
+        rec = RecordingBackend()
+        controller = HumanMouseController(num_points=20, speed_factor=50.0, backend=rec)
+        controller.drag((0, 0), (200, 50), seed=1)
+
+        kind = rec.events()["kind"]
+        assert kind[0] == rec.MOVE and kind[1] == rec.DOWN and kind[-1] == rec.UP
+        assert np.all(kind[2:-1] == rec.MOVE)
+
+    def test_move_to_uses_backend_position(self):
+        """测试从后端当前位置开始移动"""
+        backend = NullBackend(position=(50.0, 60.0))
+        controller = HumanMouseController(num_points=10, jitter_amplitude=0.0, speed_factor=50.0,
+                                          backend=backend)
+        controller.move_to((300, 200), seed=3)
+        assert backend.position() == pytest.approx((300, 200), abs=1e-3)
+
+
+class TestBackendMouseController:
+    """测试BackendMouseController类"""
+
+    def test_move_and_drag(self):
+        """测试按时间戳回放Trajectory"""
+        points = [TrajectoryPoint(float(i), 2.0 * i, timestamp=0.001 * i) for i in range(5)]
+        rec = RecordingBackend()
+        controller = BackendMouseController(rec, speed_factor=2.0)
+
+        controller.move(Trajectory(points=points))
+        assert controller.last_playback.points_total == 5
+        assert controller.last_playback.planned == pytest.approx(0.002)
+        assert rec.position() == (4.0, 8.0)
+
+        rec.clear()
+        controller.drag(Trajectory(points=points))
+        kind = rec.events()["kind"]
+        assert list(kind[:2]) == [rec.MOVE, rec.DOWN] and kind[-1] == rec.UP
+
+        controller.click('middle')
+        assert rec.events()["button"][-1] == rec.BUTTONS['middle']
+
+    def test_set_speed_rejects_non_positive(self):
+        """测试速度因子必须大于0"""
+        with pytest.raises(ValueError):
+            BackendMouseController(NullBackend(), speed_factor=0)
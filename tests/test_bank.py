@@ -0,0 +1,126 @@
+"""
+测试内存映射的归一化轨迹库
+Test the memory-mapped normalized-trajectory bank
+"""
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from humanmouse.cli import main
+from humanmouse.core.trajectory import Trajectory
+from humanmouse.models.bank import BANK_KIND, BankGenerator, build_bank
+from humanmouse.models.compact import write_compact
+
+
+@pytest.fixture(scope="module")
+def bank_path(model, tmp_path_factory):
+    """N=40与N=60各200条的轨迹库"""
+    path = tmp_path_factory.mktemp("bank") / "small.hmb"
+    build_bank(model, path, 200, sizes=(60, 40), batch_size=64, seed=5)
+    return path
+
+
+class TestBuildBank:
+    """测试build_bank函数"""
+
+    def test_header_and_sizes(self, bank_path):
+        """测试文件元数据与各段大小"""
+        gen = BankGenerator(bank_path)
+        assert gen.header["kind"] == BANK_KIND
+        assert gen.sizes == [40, 60]
+        assert len(gen) == 400
+
+    def test_progress_reports_total(self, model, tmp_path):
+        """测试按批报告进度"""
+        calls = []
+        build_bank(model, tmp_path / "p.hmb", 10, sizes=(20,), batch_size=4,
+                   progress=lambda done, total: calls.append((done, total)))
+        assert calls == [(4, 10), (8, 10), (10, 10)]
+
+    def test_rejects_bad_arguments(self, model, tmp_path):
+        """测试非法参数"""
+        with pytest.raises(ValueError):
+            build_bank(model, tmp_path / "x.hmb", 0)
+        with pytest.raises(ValueError):
+            build_bank(model, tmp_path / "x.hmb", 10, sizes=(1,))
+
+
+class TestBankGenerator:
+    """测试BankGenerator类"""
+
+    def test_endpoints_exact_without_jitter(self, bank_path):
+        """测试无抖动时起终点精确"""
+        gen = BankGenerator(bank_path, amp_jitter_px=0.0, seed=1)
+        xy, dt = gen.generate_arrays((10, 20), (410, 320), N=60)
+        assert xy.shape == (60, 2) and dt.shape == (60,)
+        assert xy.dtype == np.float32 and dt.dtype == np.float64
+        np.testing.assert_allclose(xy[0], (10, 20), atol=1e-3)
+        np.testing.assert_allclose(xy[-1], (410, 320), atol=1e-3)
+        assert dt[0] == 0.0 and np.all(dt[1:] > 0)
+
+    def test_matches_model_mapping(self, model, tmp_path):
+        """测试映射结果与模型的仿射映射一致"""
+        path = tmp_path / "one.hmb"
+        build_bank(model, path, 1, sizes=(30,), seed=2)
+        gen = BankGenerator(path, amp_jitter_px=0.0)
+        xy, dt = gen.generate_arrays((5, 5), (305, 105), N=30)
+
+        row = np.array(gen._sections[30].rows[0])
+        op = model._shape_operator(30)
+        traj_norm = np.stack([op.xs_N, row[:30]], axis=-1)[None]
+        ref_dt = model._dt_profile(row[30 + 1:], 30)
+        ref_xy = model._map_to_endpoints(traj_norm, ref_dt, row[30:31],
+                                         np.float32([[5, 5]]), np.float32([[305, 105]]),
+                                         np.zeros((1, 30, 2), "float32"))
+        np.testing.assert_allclose(xy, ref_xy[0], atol=1e-3)
+        np.testing.assert_allclose(dt, ref_dt[0], rtol=1e-5)
+
+    def test_no_allocation_per_call(self, bank_path):
+        """测试传入输出缓冲时每次调用不分配内存"""
+        gen = BankGenerator(bank_path, seed=3)
+        out_xy = np.empty((60, 2), "float32")
+        out_dt = np.empty(60, "float64")
+        gen.generate_arrays((0, 0), (100, 100), out_xy=out_xy, out_dt=out_dt)
+
+        tracemalloc.start()
+        try:
+            for _ in range(200):
+                gen.generate_arrays((0, 0), (500, 300), out_xy=out_xy, out_dt=out_dt)
+            current, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert current < 1024
+
+    def test_generate_returns_trajectory(self, bank_path):
+        """测试ITrajectoryGenerator接口"""
+        traj = BankGenerator(bank_path, seed=4).generate((0, 0), (200, 0), N=40)
+        assert isinstance(traj, Trajectory)
+        assert len(traj.points) == 40
+        assert traj.metadata["source"] == BANK_KIND
+
+    def test_unknown_size(self, bank_path):
+        """测试请求库中没有的N"""
+        with pytest.raises(ValueError):
+            BankGenerator(bank_path).generate_arrays((0, 0), (1, 1), N=77)
+
+    def test_rejects_non_bank_file(self, tmp_path):
+        """测试拒绝非轨迹库文件"""
+        path = tmp_path / "model.hmc"
+        write_compact(path, {"kind": "model"}, {"a": np.zeros(4, "float32")})
+        with pytest.raises(ValueError):
+            BankGenerator(path)
+
+    def test_requires_bank(self):
+        """测试未加载轨迹库时报错"""
+        with pytest.raises(RuntimeError):
+            BankGenerator().generate_arrays((0, 0), (1, 1))
+
+
+def test_cli_bank_build(tmp_path, capsys):
+    """测试命令行生成轨迹库"""
+    path = tmp_path / "cli.hmb"
+    assert main(["bank", "build", "--out", str(path), "--count", "50",
+                 "--points", "25", "35", "--seed", "1"]) == 0
+    assert "100 trajectories" in capsys.readouterr().out
+    assert BankGenerator(path).sizes == [25, 35]
@@ -0,0 +1,113 @@
+"""
+测试多进程批量生成轨迹
+Test multi-process bulk trajectory generation
+"""
+import json
+
+import numpy as np
+import pytest
+
+from humanmouse.models import get_default_model_path
+from humanmouse.models.bulk import MANIFEST_NAME, generate_bulk, load_pairs
+from humanmouse.models.registry import get_model
+from humanmouse.models.trajectory_model import _cli
+
+MODEL = get_default_model_path(compact=True)
+
+
+def _load(out_dir):
+    with open(out_dir / MANIFEST_NAME, encoding="utf-8") as f:
+        manifest = json.load(f)
+    shards = [np.load(out_dir / name) for name in manifest["shards"]]
+    return manifest, {k: np.concatenate([s[k] for s in shards]) for k in ("xy", "dt", "starts", "ends")}
+
+
+class TestGenerateBulk:
+    """测试generate_bulk函数"""
+
+    def test_random_pairs_in_rect(self, tmp_path):
+        """测试随机起终点落在矩形内并按块写出分片"""
+        report = generate_bulk(MODEL, tmp_path, 25, rect=(100, 50, 300, 150), N=30,
+                               amp_jitter_px=0.0, seed=1, chunk_size=10)
+        manifest, data = _load(tmp_path)
+        assert report["rate"] > 0
+        assert manifest["count"] == 25 and len(manifest["shards"]) == 3
+        assert manifest["per_index"] is False
+        assert data["xy"].shape == (25, 30, 2) and data["dt"].shape == (25, 30)
+        assert np.all((data["starts"] >= (100, 50)) & (data["starts"] <= (300, 150)))
+        np.testing.assert_allclose(data["xy"][:, -1], data["ends"], atol=1e-2)
+
+    def test_jobs_do_not_change_output(self, tmp_path):
+        """测试相同种子下输出与进程数无关"""
+        generate_bulk(MODEL, tmp_path / "a", 30, N=20, seed=4, jobs=1, chunk_size=8)
+        generate_bulk(MODEL, tmp_path / "b", 30, N=20, seed=4, jobs=2, chunk_size=8)
+        _, a = _load(tmp_path / "a")
+        _, b = _load(tmp_path / "b")
+        np.testing.assert_array_equal(a["xy"], b["xy"])
+        np.testing.assert_array_equal(a["dt"], b["dt"])
+
+    def test_per_index_matches_generate(self, tmp_path):
+        """测试逐条模式下第i条与generate(base_seed, index=i)一致且与分块无关"""
+        generate_bulk(MODEL, tmp_path / "a", 9, N=20, seed=6, chunk_size=4, per_index=True)
+        generate_bulk(MODEL, tmp_path / "b", 9, N=20, seed=6, chunk_size=9, jobs=2, per_index=True)
+        manifest, a = _load(tmp_path / "a")
+        _, b = _load(tmp_path / "b")
+        assert manifest["per_index"] is True
+        np.testing.assert_array_equal(a["xy"], b["xy"])
+        np.testing.assert_array_equal(a["starts"], b["starts"])
+
+        model = get_model(MODEL)
+        for i in range(9):
+            xy, dt = model.generate(a["starts"][i], a["ends"][i], N=20, base_seed=6, index=i)
+            np.testing.assert_array_equal(a["xy"][i], xy)
+            np.testing.assert_array_equal(a["dt"][i], dt)
+
+    @pytest.mark.parametrize("jobs", [1, 2])
+    def test_pairs_are_cycled(self, tmp_path, jobs):
+        """测试起终点对跨块循环使用"""
+        pairs = np.array([[0, 0, 100, 0], [10, 10, 10, 200], [5, 5, 50, 50]], dtype="float64")
+        generate_bulk(MODEL, tmp_path, 7, pairs=pairs, N=20, jobs=jobs, chunk_size=2)
+        _, data = _load(tmp_path)
+        np.testing.assert_array_equal(data["starts"], pairs[np.arange(7) % 3, :2])
+        np.testing.assert_array_equal(data["ends"], pairs[np.arange(7) % 3, 2:])
+
+    def test_rejects_bad_arguments(self, tmp_path):
+        """测试非法参数"""
+        with pytest.raises(ValueError):
+            generate_bulk(MODEL, tmp_path, 0)
+        with pytest.raises(ValueError):
+            generate_bulk(MODEL, tmp_path, 10, jobs=0)
+
+
+class TestLoadPairs:
+    """测试load_pairs函数"""
+
+    def test_csv_with_header(self, tmp_path):
+        """测试带表头的CSV"""
+        path = tmp_path / "pairs.csv"
+        path.write_text("x0,y0,x1,y1\n1,2,3,4\n5,6,7,8\n")
+        np.testing.assert_array_equal(load_pairs(path), [[1, 2, 3, 4], [5, 6, 7, 8]])
+
+    def test_npy(self, tmp_path):
+        """测试.npy文件"""
+        np.save(tmp_path / "pairs.npy", np.ones((3, 4)))
+        assert load_pairs(tmp_path / "pairs.npy").shape == (3, 4)
+
+    def test_wrong_columns(self, tmp_path):
+        """测试列数错误"""
+        path = tmp_path / "pairs.csv"
+        path.write_text("1,2,3\n")
+        with pytest.raises(ValueError):
+            load_pairs(path)
+
+
+def test_cli_gen_bulk(tmp_path, capsys):
+    """测试gen-bulk命令行"""
+    pairs = tmp_path / "pairs.csv"
+    pairs.write_text("0,0,300,200\n50,50,60,400\n")
+    _cli(["gen-bulk", str(MODEL), str(tmp_path / "out"), "--pairs_file", str(pairs),
+          "--num_points", "25", "--jobs", "1", "--per_index"])
+    assert "trajectories/s" in capsys.readouterr().out
+    manifest, data = _load(tmp_path / "out")
+    assert manifest["count"] == 2 and data["xy"].shape == (2, 25, 2)
+    assert manifest["per_index"] is True
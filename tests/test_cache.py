@@ -0,0 +1,156 @@
+"""
+测试有种子轨迹的结果缓存
+Test the seeded trajectory result cache
+"""
+from pathlib import Path
+
+import numpy as np
+
+from humanmouse.controllers.backends import NullBackend
+from humanmouse.controllers.mouse_controller import HumanMouseController
+from humanmouse.models import get_default_model_path
+from humanmouse.models.cache import TrajectoryCache, model_fingerprint
+from humanmouse.models.trajectory_model import HumanMouseModel
+
+from config.settings import ConfigManager, SystemConfig
+
+CSV_DIR = Path(__file__).resolve().parent.parent / "csv_data"
+
+
+class TestTrajectoryCache:
+    """测试TrajectoryCache类"""
+
+    def test_hit_returns_same_result(self, model):
+        """测试命中时结果与直接生成一致且只读"""
+        cache = TrajectoryCache()
+        xy, dt = cache.generate(model, (0, 0), (300, 200), N=50, seed=9)
+        xy2, dt2 = cache.generate(model, (0, 0), (300, 200), N=50, seed=9)
+        ref_xy, ref_dt = model.generate((0, 0), (300, 200), N=50, seed=9)
+
+        assert xy2 is xy and dt2 is dt
+        np.testing.assert_array_equal(xy, ref_xy)
+        np.testing.assert_array_equal(dt, ref_dt)
+        assert not xy.flags.writeable
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    def test_key_includes_parameters(self, model):
+        """测试起终点、N、抖动与种子都参与键"""
+        cache = TrajectoryCache()
+        cache.generate(model, (0, 0), (300, 200), N=50, seed=9)
+        cache.generate(model, (0, 0), (300, 201), N=50, seed=9)
+        cache.generate(model, (0, 0), (300, 200), N=51, seed=9)
+        cache.generate(model, (0, 0), (300, 200), N=50, amp_jitter_px=0.5, seed=9)
+        cache.generate(model, (0, 0), (300, 200), N=50, seed=10)
+        cache.generate(model, (0, 0), (300, 200), N=50, seed=9, rng_mode="native")
+        assert len(cache) == 6 and cache.hits == 0
+
+    def test_unseeded_not_cached(self, model):
+        """测试无种子调用不缓存"""
+        cache = TrajectoryCache()
+        cache.generate(model, (0, 0), (100, 100), N=20)
+        assert len(cache) == 0 and cache.hits + cache.misses == 0
+
+    def test_rate_applied_after_lookup(self, model):
+        """测试重定时在查找之后进行"""
+        cache = TrajectoryCache()
+        cache.generate(model, (0, 0), (300, 200), N=50, seed=3)
+        xy, dt = cache.generate(model, (0, 0), (300, 200), N=50, seed=3, rate_hz=500)
+        ref_xy, ref_dt = model.generate((0, 0), (300, 200), N=50, seed=3, rate_hz=500)
+        np.testing.assert_array_equal(xy, ref_xy)
+        np.testing.assert_array_equal(dt, ref_dt)
+        assert cache.hits == 1
+
+    def test_lru_byte_budget(self, model):
+        """测试超出字节上限时淘汰最久未用的项"""
+        entry_bytes = 20 * 2 * 4 + 20 * 8
+        cache = TrajectoryCache(max_bytes=3 * entry_bytes)
+        for seed in range(3):
+            cache.generate(model, (0, 0), (100, 0), N=20, seed=seed)
+        cache.generate(model, (0, 0), (100, 0), N=20, seed=0)
+        cache.generate(model, (0, 0), (100, 0), N=20, seed=3)
+
+        assert len(cache) == 3 and cache.nbytes == 3 * entry_bytes
+        cache.generate(model, (0, 0), (100, 0), N=20, seed=0)
+        cache.generate(model, (0, 0), (100, 0), N=20, seed=1)
+        assert cache.hits == 2 and cache.misses == 5
+
+    def test_disk_shards(self, model, tmp_path):
+        """测试磁盘分片在新缓存中复用并合并"""
+        with TrajectoryCache(directory=tmp_path) as cache:
+            xy, dt = cache.generate(model, (1, 2), (300, 200), N=40, seed=5)
+        assert (tmp_path / f"{model_fingerprint(model)}.npz").exists()
+
+        with TrajectoryCache(directory=tmp_path) as cache:
+            xy2, dt2 = cache.generate(model, (1, 2), (300, 200), N=40, seed=5)
+            cache.generate(model, (1, 2), (300, 200), N=40, seed=6)
+            assert cache.hits == 1
+        np.testing.assert_array_equal(xy2, xy)
+        np.testing.assert_array_equal(dt2, dt)
+
+        cache = TrajectoryCache(directory=tmp_path)
+        cache.generate(model, (1, 2), (300, 200), N=40, seed=5)
+        cache.generate(model, (1, 2), (300, 200), N=40, seed=6)
+        assert cache.hits == 2
+
+    def test_evicted_results_are_saved(self, model, tmp_path):
+        """测试写盘前被淘汰的结果仍会写入分片，且超出上限时自动写盘"""
+        entry_bytes = 20 * 2 * 4 + 20 * 8
+        with TrajectoryCache(max_bytes=2 * entry_bytes, directory=tmp_path) as cache:
+            for seed in range(3):
+                cache.generate(model, (0, 0), (100, 0), N=20, seed=seed)
+            assert len(cache) == 2
+        cache = TrajectoryCache(directory=tmp_path)
+        cache.generate(model, (0, 0), (100, 0), N=20, seed=0)
+        assert cache.hits == 1
+
+        cache = TrajectoryCache(max_bytes=entry_bytes, directory=tmp_path / "auto")
+        for seed in range(3):
+            cache.generate(model, (0, 0), (100, 0), N=20, seed=seed)
+        assert (tmp_path / "auto" / f"{model_fingerprint(model)}.npz").exists()
+        assert cache._evicted_bytes == 0
+
+    def test_refit_changes_fingerprint(self):
+        """测试重新训练后指纹与缓存结果都随之改变"""
+        model = HumanMouseModel(seed=0)
+        model.fit(CSV_DIR)
+        cache = TrajectoryCache()
+        before = model_fingerprint(model)
+        xy, _ = cache.generate(model, (0, 0), (300, 200), N=40, seed=3)
+
+        model.seed = 1
+        model.fit(CSV_DIR)
+        assert model_fingerprint(model) != before
+        xy2, _ = cache.generate(model, (0, 0), (300, 200), N=40, seed=3)
+        ref_xy, _ = model.generate((0, 0), (300, 200), N=40, seed=3)
+        np.testing.assert_array_equal(xy2, ref_xy)
+        assert not np.array_equal(xy2, xy)
+
+    def test_fingerprint_shared_by_formats(self, model):
+        """测试.pkl与.hmc模型指纹相同"""
+        compact = HumanMouseModel.load_compact(get_default_model_path(compact=True))
+        assert model_fingerprint(compact) == model_fingerprint(model)
+
+
+class TestFromConfig:
+    """测试按SystemConfig创建缓存"""
+
+    def test_disabled(self):
+        """测试enable_caching为假时不创建缓存"""
+        assert TrajectoryCache.from_config(SystemConfig(enable_caching=False)) is None
+
+    def test_size_from_config(self):
+        """测试cache_size_mb决定字节上限"""
+        cache = TrajectoryCache.from_config(SystemConfig(cache_size_mb=3))
+        assert cache.max_bytes == 3 * 2**20
+        assert TrajectoryCache.from_config(ConfigManager()).max_bytes == 100 * 2**20
+
+
+def test_controller_uses_cache():
+    """测试控制器对给定种子的移动使用缓存"""
+    cache = TrajectoryCache()
+    controller = HumanMouseController(num_points=20, speed_factor=100.0, backend=NullBackend(),
+                                      cache=cache)
+    controller.move((0, 0), (200, 100), seed=4)
+    controller.move((0, 0), (200, 100), seed=4)
+    controller.move((0, 0), (200, 100))
+    assert cache.hits == 1 and cache.misses == 1 and len(cache) == 1
@@ -0,0 +1,75 @@
+"""
+测试紧凑模型文件格式
+Test the compact model file format
+"""
+import numpy as np
+import pytest
+
+from humanmouse.models.compact import MAGIC, is_compact_file, read_compact, write_compact
+from humanmouse.models.trajectory_model import HumanMouseModel, generate_mouse_trajectory
+
+
+@pytest.fixture
+def compact_path(model, tmp_path):
+    """导出紧凑模型"""
+    path = tmp_path / "mouse_model.hmc"
+    model.export_compact(path)
+    return path
+
+
+class TestCompactFormat:
+    """测试读写紧凑格式"""
+
+    def test_roundtrip_arrays(self, tmp_path):
+        """测试数组往返读写"""
+        arrays = {"a": np.arange(7, dtype="float64"), "b": np.ones((3, 4), dtype="float32")}
+        write_compact(tmp_path / "x.hmc", {"K": 3}, arrays)
+        header, loaded = read_compact(tmp_path / "x.hmc")
+        assert header["K"] == 3
+        for name, a in arrays.items():
+            np.testing.assert_array_equal(loaded[name], a)
+            assert loaded[name].dtype == a.dtype
+        assert not loaded["a"].flags.writeable
+
+    def test_rejects_unknown_version(self, tmp_path):
+        """测试未知版本号报错"""
+        path = tmp_path / "x.hmc"
+        write_compact(path, {}, {"a": np.zeros(2)})
+        raw = path.read_bytes()
+        body = raw[len(MAGIC) + 8:].replace(b'"format_version": 1', b'"format_version": 9')
+        path.write_bytes(raw[:len(MAGIC) + 8] + body)
+        with pytest.raises(ValueError):
+            read_compact(path)
+
+    def test_detects_pickle(self, tmp_path, compact_path, model):
+        """测试按魔数识别格式"""
+        model.save(tmp_path / "model.pkl")
+        assert is_compact_file(compact_path)
+        assert not is_compact_file(tmp_path / "model.pkl")
+        assert not is_compact_file(tmp_path / "missing.hmc")
+
+
+class TestCompactModel:
+    """测试紧凑格式模型"""
+
+    @pytest.mark.parametrize("rng_mode", ["compat", "native"])
+    def test_generation_matches_pickle(self, model, compact_path, rng_mode):
+        """测试紧凑模型生成结果与原模型一致"""
+        compact = HumanMouseModel.load(compact_path)
+        assert compact.pca is None and compact.gmm_shape is None
+        for seed in range(5):
+            a = model.generate((5, 5), (640, 480), N=70, seed=seed, rng_mode=rng_mode)
+            b = compact.generate((5, 5), (640, 480), N=70, seed=seed, rng_mode=rng_mode)
+            np.testing.assert_array_equal(a[0], b[0])
+            np.testing.assert_array_equal(a[1], b[1])
+
+    def test_generate_mouse_trajectory_accepts_compact(self, model, compact_path):
+        """测试generate_mouse_trajectory接受紧凑格式"""
+        xy, dt = generate_mouse_trajectory(str(compact_path), (0, 0), (100, 100), seed=4)
+        np.testing.assert_array_equal(xy, model.generate((0, 0), (100, 100), seed=4)[0])
+
+    def test_compact_model_cannot_be_pickled(self, compact_path, tmp_path):
+        """测试紧凑模型不能保存为pickle"""
+        compact = HumanMouseModel.load_compact(compact_path, mmap=False)
+        with pytest.raises(RuntimeError):
+            compact.save(tmp_path / "model.pkl")
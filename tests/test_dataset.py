@@ -0,0 +1,117 @@
+"""
+测试合并的二进制训练数据集
+Test the consolidated binary training dataset
+"""
+import json
+import os
+
+import numpy as np
+import pytest
+
+from humanmouse.cli import main
+from humanmouse.models.dataset import MANIFEST_NAME, build_dataset, is_dataset, load_dataset
+from humanmouse.models.trajectory_model import HumanMouseModel
+from humanmouse.models.traces import load_traces
+
+
+def _write(path, n, dt=0.01):
+    rows = "\n".join(f"{i},{2 * i},{0.0 if i == 0 else dt}" for i in range(n))
+    path.write_text("x_coordinate,y_coordinate,time_interval_seconds\n" + rows + "\n")
+
+
+@pytest.fixture
+def csv_dir(tmp_path):
+    """含有效与无效文件的CSV目录"""
+    d = tmp_path / "csv"
+    d.mkdir()
+    for i in range(5):
+        _write(d / f"t{i}.csv", 10 + i)
+    _write(d / "short.csv", 3)
+    return d
+
+
+class TestBuildDataset:
+    """测试build_dataset函数"""
+
+    def test_matches_csv_loader(self, csv_dir, tmp_path):
+        """测试数据集与直接读取CSV一致且为内存映射"""
+        summary = build_dataset(csv_dir, tmp_path / "ds")
+        assert summary["ingested"] == 6 and summary["count"] == 5 and summary["skipped"] == 1
+        assert is_dataset(tmp_path / "ds") and not is_dataset(csv_dir)
+
+        traces, report = load_dataset(tmp_path / "ds")
+        ref, ref_report = load_traces(csv_dir)
+        assert isinstance(traces.xy, np.memmap)
+        np.testing.assert_array_equal(traces.xy, ref.xy)
+        np.testing.assert_array_equal(traces.dt, ref.dt)
+        np.testing.assert_array_equal(traces.offsets, ref.offsets)
+        assert traces.names == ref.names and report.skipped == ref_report.skipped
+
+    def test_incremental(self, csv_dir, tmp_path):
+        """测试重建只读取新增或变化的文件"""
+        out = tmp_path / "ds"
+        build_dataset(csv_dir, out)
+        again = build_dataset(csv_dir, out)
+        assert again["ingested"] == 0 and again["reused"] == 6
+
+        _write(csv_dir / "t1.csv", 20)
+        _write(csv_dir / "t9.csv", 12)
+        (csv_dir / "t0.csv").unlink()
+        stat = (csv_dir / "t2.csv").stat()
+        os.utime(csv_dir / "t2.csv", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        summary = build_dataset(csv_dir, out, jobs=2)
+        assert summary["ingested"] == 2 and summary["reused"] == 4 and summary["removed"] == 1
+
+        traces, _ = load_dataset(out)
+        ref, _ = load_traces(csv_dir)
+        np.testing.assert_array_equal(traces.xy, ref.xy)
+        assert traces.names == ref.names == ["t1.csv", "t2.csv", "t3.csv", "t4.csv", "t9.csv"]
+
+        # 只保留当前代的数组 / Only the current generation's arrays remain
+        with open(out / MANIFEST_NAME, encoding="utf-8") as f:
+            manifest = json.load(f)
+        assert sorted(os.listdir(out)) == sorted([MANIFEST_NAME, manifest["file_index"],
+                                                  *manifest["arrays"].values()])
+        with open(out / manifest["file_index"], encoding="utf-8") as f:
+            assert all(len(e["sha256"]) == 64 for e in json.load(f))
+
+        # 不读取逐文件记录 / Without the per-file records
+        traces, report = load_dataset(out, names=False)
+        assert traces.names is None and report.loaded == 5
+        assert len(traces.take([0, 2])) == 2
+
+    def test_not_a_dataset(self, csv_dir):
+        """测试打开非数据集目录"""
+        with pytest.raises(ValueError):
+            load_dataset(csv_dir)
+
+
+def test_fit_accepts_dataset(tmp_path):
+    """测试fit可直接使用数据集"""
+    csv_dir = tmp_path / "csv"
+    csv_dir.mkdir()
+    rng = np.random.default_rng(0)
+    for i in range(30):
+        n = 15 + i % 7
+        x = np.linspace(0, 200 + 10 * i, n)
+        y = np.sin(np.linspace(0, np.pi, n)) * rng.uniform(5, 40)
+        dt = np.r_[0.0, rng.uniform(0.005, 0.02, n - 1)]
+        np.savetxt(csv_dir / f"t{i:02d}.csv", np.c_[x, y, dt], delimiter=",",
+                   header="x_coordinate,y_coordinate,time_interval_seconds", comments="")
+    build_dataset(csv_dir, tmp_path / "ds")
+
+    from_csv = HumanMouseModel(n_mix_shape=2, n_mix_global=2)
+    from_csv.fit(csv_dir)
+    from_ds = HumanMouseModel(n_mix_shape=2, n_mix_global=2)
+    report = from_ds.fit(tmp_path / "ds")
+    assert report.loaded == 30
+    np.testing.assert_array_equal(from_ds.generate((0, 0), (300, 0), N=20, seed=1)[0],
+                                  from_csv.generate((0, 0), (300, 0), N=20, seed=1)[0])
+
+
+def test_cli_dataset_build(csv_dir, tmp_path, capsys):
+    """测试dataset build命令行"""
+    assert main(["dataset", "build", str(csv_dir), "--out", str(tmp_path / "ds")]) == 0
+    assert "5 trajectories" in capsys.readouterr().out
+    assert main(["dataset", "build", str(csv_dir), "--out", str(tmp_path / "ds")]) == 0
+    assert "0 ingested, 6 reused" in capsys.readouterr().out
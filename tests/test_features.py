@@ -0,0 +1,137 @@
+"""
+测试训练特征的批量提取
+Test batched training-feature extraction
+"""
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from humanmouse.models import features
+from humanmouse.models.features import FeatureCache, extract_features
+from humanmouse.models.trajectory_model import HumanMouseModel
+from humanmouse.models.traces import TraceSet, load_traces
+
+CSV_DIR = Path(__file__).resolve().parent.parent / "csv_data"
+
+
+def _loop_features(traces, K):
+    """原逐条实现 / The original per-trace loop"""
+    shapes, globals_ = [], []
+    for xy, dts in zip(*traces.split()):
+        xy_n, *_ = HumanMouseModel._affine_normalise(xy)
+        shapes.append(HumanMouseModel._resample_by_arclength(xy_n, K)[:, 1])
+        globals_.append(HumanMouseModel._global_features(xy, dts))
+    return np.stack(shapes), np.stack(globals_)
+
+
+def _random_traces(M, seed=0):
+    rng = np.random.default_rng(seed)
+    xy_list, dt_list = [], []
+    for i in range(M):
+        n = int(rng.integers(10, 200))
+        xy = np.cumsum(rng.normal(0, 5, (n, 2)), axis=0) * rng.choice([0.1, 1, 10])
+        if i % 3 == 0:
+            xy = np.round(xy)
+        if i % 7 == 0:
+            xy[4] = xy[3]                      # 重复点 / Repeated point
+        dt = np.r_[0, rng.uniform(0.001, 0.05, n - 1)]
+        if i % 11 == 0:
+            dt[5] = 0                          # 非正间隔走回退分支 / Non-positive interval takes the fallback
+        xy_list.append(xy.astype("float32"))
+        dt_list.append(dt.astype("float32"))
+    return TraceSet.from_lists(xy_list, dt_list)
+
+
+class TestExtractFeatures:
+    """测试extract_features函数"""
+
+    def test_identical_on_bundled_data(self):
+        """测试在内置数据上与逐条循环逐位一致"""
+        traces, _ = load_traces(CSV_DIR)
+        shapes, globals_ = extract_features(traces, 30)
+        ref_shapes, ref_globals = _loop_features(traces, 30)
+        assert shapes.dtype == ref_shapes.dtype and globals_.dtype == ref_globals.dtype
+        np.testing.assert_array_equal(shapes, ref_shapes)
+        np.testing.assert_array_equal(globals_, ref_globals)
+
+    @pytest.mark.parametrize("K", [2, 17, 30])
+    def test_identical_on_random_data(self, K):
+        """测试随机长度、重复点与回退分支下逐位一致"""
+        traces = _random_traces(400)
+        shapes, globals_ = extract_features(traces, K)
+        ref_shapes, ref_globals = _loop_features(traces, K)
+        np.testing.assert_array_equal(shapes, ref_shapes)
+        np.testing.assert_array_equal(globals_, ref_globals)
+
+    def test_chunking(self):
+        """测试分批大小不影响结果"""
+        traces = _random_traces(50, seed=3)
+        a = extract_features(traces, 30)
+        b = extract_features(traces, 30, chunk_size=7)
+        np.testing.assert_array_equal(a[0], b[0])
+        np.testing.assert_array_equal(a[1], b[1])
+
+    def test_rejects_degenerate(self):
+        """测试点数不足或路径长度为零"""
+        one = TraceSet.from_lists([np.zeros((1, 2), "float32")], [np.zeros(1, "float32")])
+        with pytest.raises(ValueError):
+            extract_features(one, 30)
+        still = TraceSet.from_lists([np.ones((5, 2), "float32")], [np.full(5, 0.01, "float32")])
+        with pytest.raises(ValueError):
+            extract_features(still, 30)
+
+
+class TestFeatureCache:
+    """测试FeatureCache类"""
+
+    def test_hits_match_extraction(self, tmp_path):
+        """测试命中结果与直接提取一致"""
+        traces = _random_traces(60)
+        cache = FeatureCache(tmp_path)
+        first = cache.extract(traces, 30)
+        second = FeatureCache(tmp_path).extract(traces, 30)
+        ref = extract_features(traces, 30)
+        for a, b, c in zip(first, second, ref):
+            np.testing.assert_array_equal(a, c)
+            np.testing.assert_array_equal(b, c)
+        assert cache.misses == 60 and cache.hits == 0
+
+    def test_only_new_traces_extracted(self, tmp_path):
+        """测试新增轨迹才需要提取"""
+        traces = _random_traces(60)
+        cache = FeatureCache(tmp_path)
+        cache.extract(traces.take(np.arange(40)), 30)
+        shapes, _ = cache.extract(traces, 30)
+        assert cache.hits == 40 and cache.misses == 60
+        np.testing.assert_array_equal(shapes, extract_features(traces, 30)[0])
+
+    def test_key_includes_k_and_version(self, tmp_path, monkeypatch):
+        """测试K与特征版本参与键，旧版本分片被删除"""
+        traces = _random_traces(10)
+        cache = FeatureCache(tmp_path)
+        cache.extract(traces, 30)
+        cache.extract(traces, 20)
+        assert cache.hits == 0
+        monkeypatch.setattr(features, "FEATURE_VERSION", features.FEATURE_VERSION + 1)
+        cache.extract(traces, 30)
+        assert cache.hits == 0
+        assert sorted(p.name for p in tmp_path.iterdir()) == [f"features-K30-v{features.FEATURE_VERSION}.npz"]
+        cache.clear()
+        assert not list(tmp_path.iterdir())
+
+
+def test_fit_with_feature_cache(tmp_path):
+    """测试使用特征缓存训练的模型与不使用时相同"""
+    csv_dir = tmp_path / "csv"
+    csv_dir.mkdir()
+    traces, _ = load_traces(CSV_DIR)
+    for name in traces.names[:40]:
+        (csv_dir / name).write_bytes((CSV_DIR / name).read_bytes())
+    plain = HumanMouseModel(n_mix_shape=2, n_mix_global=2)
+    plain.fit(csv_dir)
+    for _ in range(2):
+        cached = HumanMouseModel(n_mix_shape=2, n_mix_global=2)
+        cached.fit(csv_dir, feature_cache=tmp_path / "features")
+        np.testing.assert_array_equal(cached.generate((0, 0), (300, 0), N=20, seed=1)[0],
+                                      plain.generate((0, 0), (300, 0), N=20, seed=1)[0])
@@ -0,0 +1,71 @@
+"""
+测试导入开销预算
+Test the import-time budget
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+# 仅生成轨迹时不应导入的重依赖
+HEAVY_MODULES = ("pyautogui", "pandas", "scipy", "sklearn")
+# humanmouse 自身模块的导入耗时预算（不含 numpy）
+IMPORT_BUDGET_US = 100_000
+# 同步控制器导入路径上不应出现的标准库与训练模块（自身耗时预算看不到它们）
+CONTROLLER_EXCLUDED = ("asyncio", "multiprocessing", "concurrent.futures.process",
+                       "humanmouse.models.traces", "humanmouse.models.dataset",
+                       "humanmouse.models.features", "humanmouse.models.streaming")
+
+GENERATION_SCRIPT = """
+import sys
+import humanmouse
+from humanmouse.models import get_default_model_path
+from humanmouse.models.trajectory_model import HumanMouseModel
+model = HumanMouseModel.load(get_default_model_path(compact=True))
+model.generate((0, 0), (300, 200), seed=1)
+print(",".join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def _run(script):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    return subprocess.run([sys.executable, "-X", "importtime", "-c", script],
+                          capture_output=True, text=True, env=env, check=True)
+
+
+def test_generation_needs_only_numpy():
+    """测试从紧凑模型生成轨迹不导入重依赖"""
+    result = _run(GENERATION_SCRIPT.format(heavy=HEAVY_MODULES))
+    assert result.stdout.strip() == ""
+
+
+def test_import_time_budget():
+    """测试humanmouse自身的导入耗时"""
+    result = _run("import humanmouse, humanmouse.models, humanmouse.controllers.mouse_controller")
+    self_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if fields[2].strip().startswith("humanmouse") and fields[0].strip().isdigit():
+            self_us += int(fields[0])
+    assert 0 < self_us < IMPORT_BUDGET_US
+
+
+def test_controller_import_skips_async_and_training():
+    """测试导入同步控制器不加载asyncio、进程池与训练模块"""
+    result = _run("import sys, humanmouse, humanmouse.models, humanmouse.controllers.mouse_controller\n"
+                  f"print(','.join(m for m in {CONTROLLER_EXCLUDED!r} if m in sys.modules))")
+    assert result.stdout.strip() == ""
+
+
+def test_lazy_controller_export():
+    """测试控制器按需导入"""
+    import humanmouse
+    from humanmouse.controllers.mouse_controller import HumanMouseController
+
+    assert humanmouse.HumanMouseController is HumanMouseController
+    assert "HumanMouseController" in dir(humanmouse)
+    with pytest.raises(AttributeError):
+        humanmouse.NoSuchThing
@@ -0,0 +1,98 @@
+"""
+测试模型注册表
+Test the process-wide model registry
+"""
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from humanmouse.models import get_default_model_path
+from humanmouse.models.registry import ModelRegistry
+from humanmouse.controllers.mouse_controller import HumanMouseController
+
+
+@pytest.fixture
+def model_copy(tmp_path):
+    """复制内置模型到临时目录"""
+    dst = tmp_path / "mouse_model.pkl"
+    shutil.copy2(get_default_model_path(), dst)
+    return dst
+
+
+class TestModelRegistry:
+    """测试ModelRegistry类"""
+
+    def test_get_is_cached(self, model_copy):
+        """测试重复获取返回同一实例"""
+        registry = ModelRegistry()
+        first = registry.get(model_copy)
+        assert registry.get(str(model_copy)) is first
+        assert model_copy in registry
+        assert len(registry) == 1
+
+    def test_changed_file_is_reloaded(self, model_copy):
+        """测试文件修改后重新加载"""
+        registry = ModelRegistry()
+        first = registry.get(model_copy)
+        st = os.stat(model_copy)
+        os.utime(model_copy, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert registry.get(model_copy) is not first
+
+    def test_reload_and_invalidate(self, model_copy):
+        """测试强制重新加载和失效"""
+        registry = ModelRegistry(use_hash=True)
+        first = registry.get(model_copy)
+        assert registry.reload(model_copy) is not first
+        registry.invalidate(model_copy)
+        assert model_copy not in registry
+
+
+class TestControllerModelLoading:
+    """测试控制器的模型加载"""
+
+    def test_controllers_share_model(self, model_copy):
+        """测试多个控制器共享同一模型"""
+        registry = ModelRegistry()
+        a = HumanMouseController(model_pkl=str(model_copy), registry=registry)
+        b = HumanMouseController(model_pkl=str(model_copy), registry=registry,
+                                 background_load=True)
+        assert a.preload() is b._get_model()
+        assert len(registry) == 1
+
+    def test_controllers_follow_registry(self, model_copy):
+        """测试一个控制器reload或文件被替换后，其他控制器都使用新模型"""
+        registry = ModelRegistry()
+        a = HumanMouseController(model_pkl=str(model_copy), registry=registry)
+        b = HumanMouseController(model_pkl=str(model_copy), registry=registry)
+        first = b.preload()
+        reloaded = a.reload()
+        assert reloaded is not first and b._get_model() is reloaded
+
+        st = os.stat(model_copy)
+        os.utime(model_copy, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        replaced = b._get_model()
+        assert replaced is not reloaded and a._get_model() is replaced
+
+    def test_generation_matches_direct_load(self, model_copy):
+        """测试缓存模型生成结果与直接加载一致"""
+        from humanmouse.models.trajectory_model import generate_mouse_trajectory
+
+        controller = HumanMouseController(model_pkl=str(model_copy),
+                                          registry=ModelRegistry())
+        xy, dt = controller._generate_trajectory((10, 20), (400, 300), seed=7)
+        xy_ref, dt_ref = generate_mouse_trajectory(str(model_copy), (10, 20), (400, 300),
+                                                   num_points=controller.num_points,
+                                                   jitter_amplitude=controller.jitter_amplitude,
+                                                   seed=7)
+        np.testing.assert_array_equal(xy, xy_ref)
+        np.testing.assert_array_equal(dt, dt_ref)
+
+    def test_background_load_error_is_raised(self, tmp_path):
+        """测试后台加载失败时在前台抛出"""
+        controller = HumanMouseController(model_pkl=str(tmp_path / "missing.pkl"),
+                                          registry=ModelRegistry(),
+                                          background_load=True)
+        with pytest.raises(FileNotFoundError):
+            controller._get_model()
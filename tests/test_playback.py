@@ -0,0 +1,180 @@
+"""
+测试轨迹回放调度器
+Test the trajectory playback scheduler
+"""
+import numpy as np
+import pytest
+
+from humanmouse.controllers.playback import PlaybackScheduler, coalesce_points
+
+
+def _trajectory(n, interval):
+    xy = np.stack([np.arange(n, dtype="float32"), np.zeros(n, dtype="float32")], axis=1)
+    dt = np.full(n, interval)
+    dt[0] = 0.0
+    return xy, dt
+
+
+class TestPlaybackScheduler:
+    """测试PlaybackScheduler类"""
+
+    def test_schedule_is_cumulative(self):
+        """测试截止时间为累积和除以速度因子"""
+        scheduler = PlaybackScheduler()
+        deadlines = scheduler.schedule([0.0, 0.01, 0.02], speed_factor=2.0)
+        np.testing.assert_array_equal(deadlines, [0, 5_000_000, 15_000_000])
+        with pytest.raises(ValueError):
+            scheduler.schedule([0.0], speed_factor=0)
+
+    def test_emits_every_point_on_time(self, fake_clock):
+        """测试不落后时逐点按时发出"""
+        scheduler = PlaybackScheduler(clock=fake_clock, sleep=fake_clock.sleep)
+        xy, dt = _trajectory(50, 0.01)
+        seen = []
+        report = scheduler.play(xy, dt, lambda x, y: seen.append((x, fake_clock.now)))
+        assert [x for x, _ in seen] == list(range(50))
+        assert report.points_emitted == 50 and report.points_skipped == 0
+        assert report.planned == pytest.approx(0.49)
+        assert abs(report.drift) < 1e-3 and report.max_lateness < 1e-4
+
+    def test_skips_when_behind(self, fake_clock):
+        """测试落后时跳过已到期的点并保留终点"""
+        scheduler = PlaybackScheduler(clock=fake_clock, sleep=fake_clock.sleep)
+        xy, dt = _trajectory(100, 0.001)
+
+        def slow_move(x, y):
+            seen.append(x)
+            fake_clock.sleep(0.005)
+
+        seen = []
+        report = scheduler.play(xy, dt, slow_move)
+        assert seen[-1] == 99
+        assert report.points_skipped > 50
+        assert report.points_emitted + report.points_skipped == 100
+        assert report.drift < 0.007
+
+        seen = []
+        strict = PlaybackScheduler(skip_when_behind=False, clock=fake_clock, sleep=fake_clock.sleep)
+        assert strict.play(xy, dt, slow_move).points_emitted == 100
+
+    def test_real_clock_has_no_drift(self):
+        """测试真实时钟下的总时长误差"""
+        xy, dt = _trajectory(40, 0.0025)
+        report = PlaybackScheduler().play(xy, dt, lambda x, y: None)
+        assert report.points_emitted + report.points_skipped == 40
+        assert abs(report.drift) < 0.02
+
+    def test_shared_timeline(self, fake_clock):
+        """测试start_ns把多段轨迹接在同一时间线上"""
+        scheduler = PlaybackScheduler(clock=fake_clock, sleep=fake_clock.sleep)
+        xy, dt = _trajectory(10, 0.01)
+        t0 = fake_clock()
+        scheduler.play(xy, dt, lambda x, y: None, start_ns=t0)
+        seen = []
+        scheduler.play(xy, dt, lambda x, y: seen.append(fake_clock.now), start_ns=t0 + 200_000_000)
+        assert seen[0] == pytest.approx(t0 + 200_000_000, abs=10_000)
+        scheduler.wait_until(t0 + 500_000_000)
+        assert fake_clock.now == pytest.approx(t0 + 500_000_000, abs=10_000)
+
+
+class TestPlayStream:
+    """测试逐块回放"""
+
+    def test_matches_play(self, clock_factory):
+        """测试分块回放与整条回放的时间一致"""
+        xy, dt = _trajectory(30, 0.01)
+        times = {}
+        for mode in ("play", "stream"):
+            clock = clock_factory()
+            scheduler = PlaybackScheduler(clock=clock, sleep=clock.sleep)
+            seen = times[mode] = []
+            t0 = clock()
+            if mode == "play":
+                report = scheduler.play(xy, dt, lambda x, y: seen.append((x, clock.now)), start_ns=t0)
+            else:
+                chunks = ((xy[i:i + 7], dt[i:i + 7]) for i in range(0, 30, 7))
+                report = scheduler.play_stream(chunks, lambda x, y: seen.append((x, clock.now)), start_ns=t0)
+            assert report.points_total == 30 and report.planned == pytest.approx(0.29)
+        assert [x for x, _ in times["stream"]] == [x for x, _ in times["play"]]
+        np.testing.assert_allclose([t for _, t in times["stream"]], [t for _, t in times["play"]], atol=5_000)
+
+    def test_consumes_chunks_lazily(self, fake_clock):
+        """测试第一块到达即开始发出"""
+        scheduler = PlaybackScheduler(clock=fake_clock, sleep=fake_clock.sleep)
+        xy, dt = _trajectory(12, 0.01)
+        log = []
+
+        def chunks():
+            for i in range(0, 12, 4):
+                log.append(("chunk", i))
+                yield xy[i:i + 4], dt[i:i + 4]
+
+        scheduler.play_stream(chunks(), lambda x, y: log.append(("move", x)))
+        assert log[:3] == [("chunk", 0), ("move", 0.0), ("move", 1.0)]
+        assert log.index(("chunk", 4)) == 5
+
+    def test_coalesces_across_chunks(self, fake_clock):
+        """测试合并的格点跨块对齐"""
+        scheduler = PlaybackScheduler(min_interval=0.004, dedupe_pixels=False, clock=fake_clock, sleep=fake_clock.sleep)
+        xy, dt = _trajectory(40, 0.001)
+        chunks = ((xy[i:i + 10], dt[i:i + 10]) for i in range(0, 40, 10))
+        report = scheduler.play_stream(chunks, lambda x, y: None)
+        assert report.points_total == 40
+        assert report.points_emitted + report.points_coalesced == 40
+        assert report.points_emitted <= 14
+
+    def test_chunked_coalescing_matches_play(self, clock_factory):
+        """测试跨块的格点只发出一次、跨块重复像素被去掉，结果与整条回放相同"""
+        xy = np.repeat(np.arange(20, dtype="float32"), 2)[:, None] * [1, 0]
+        dt = np.full(40, 0.001)
+        dt[0] = 0.0
+        seen = {}
+        for mode in ("play", "stream"):
+            clock = clock_factory()
+            scheduler = PlaybackScheduler(min_interval=0.003, clock=clock, sleep=clock.sleep)
+            events = seen[mode] = []
+            move = lambda x, y: events.append((x, clock.now))
+            if mode == "play":
+                scheduler.play(xy, dt, move, start_ns=0)
+            else:
+                # 块边界落在格点内部、重复像素之间 / Chunk boundaries fall inside ticks and between duplicate pixels
+                chunks = ((xy[i:i + 7], dt[i:i + 7]) for i in range(0, 40, 7))
+                scheduler.play_stream(chunks, move, start_ns=0)
+        assert seen["stream"] == seen["play"]
+        pixels = [x for x, _ in seen["stream"]]
+        assert len(pixels) == len(set(pixels))
+
+
+class TestCoalescePoints:
+    """测试coalesce_points函数"""
+
+    def test_aligns_to_interval(self):
+        """测试每个间隔只保留最后一个点并对齐到格点"""
+        xy = np.array([[0, 0], [1, 0], [2, 0], [3, 0], [4, 0], [5.3, 0.2]])
+        times = np.array([0, 200, 900, 1000, 1500, 2300])
+        out_xy, out_t = coalesce_points(xy, times, 1000)
+        np.testing.assert_array_equal(out_xy[:, 0], [0, 3, 4, 5.3])
+        np.testing.assert_array_equal(out_t, [0, 1000, 2000, 2300])
+        assert out_t.dtype == times.dtype
+
+    def test_end_point_exact_and_pixels_deduped(self):
+        """测试终点精确且去掉重复整数像素"""
+        xy = np.array([[0.0, 0.0], [0.2, 0.1], [0.4, 0.3], [1.2, 0.0], [1.4, 0.1], [1.45, 0.2]])
+        times = np.arange(6) * 0.01
+        out_xy, out_t = coalesce_points(xy, times, 0.0)
+        np.testing.assert_array_equal(out_xy, xy[[0, 3, 5]])
+        assert out_t[-1] == times[-1]
+
+    def test_scheduler_emits_fewer_moves(self, fake_clock):
+        """测试启用合并后回放调用更少且路径终点不变"""
+        scheduler = PlaybackScheduler(min_interval=0.001, clock=fake_clock, sleep=fake_clock.sleep)
+        xy = np.stack([np.linspace(0, 40, 200), np.zeros(200)], axis=1)
+        dt = np.full(200, 0.0001)
+        dt[0] = 0.0
+        seen = []
+        report = scheduler.play(xy, dt, lambda x, y: seen.append((x, y)), speed_factor=2.0)
+        assert len(seen) < 20
+        assert seen[-1] == (40.0, 0.0)
+        assert report.points_total == 200
+        assert report.points_emitted + report.points_skipped + report.points_coalesced == 200
+        assert report.planned == pytest.approx(199 * 0.0001 / 2.0)
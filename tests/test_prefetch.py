@@ -0,0 +1,103 @@
+"""
+测试归一化轨迹预取池
+Test the normalized-trajectory prefetch pool
+"""
+import numpy as np
+import pytest
+
+from humanmouse.controllers.backends import NullBackend
+from humanmouse.controllers.mouse_controller import HumanMouseController
+from humanmouse.models.prefetch import ShapePrefetchPool
+
+
+@pytest.fixture
+def pool(model):
+    """深度为8的预取池"""
+    with ShapePrefetchPool(model, depth=8) as pool:
+        yield pool
+
+
+class TestShapePrefetchPool:
+    """测试ShapePrefetchPool类"""
+
+    def test_hits_after_fill(self, pool):
+        """测试补满后命中并只做仿射映射"""
+        pool.fill(50)
+        xy, dt = pool.generate((10, 20), (410, 320), N=50, amp_jitter_px=0.0)
+        assert xy.shape == (50, 2) and dt.shape == (50,)
+        assert xy.dtype == np.float32 and dt.dtype == np.float64
+        np.testing.assert_allclose(xy[0], (10, 20), atol=1e-3)
+        np.testing.assert_allclose(xy[-1], (410, 320), atol=1e-3)
+        assert dt[0] == 0.0 and np.all(dt[1:] > 0)
+        assert pool.stats()["hits"] == 1 and pool.stats()["misses"] == 0
+
+    def test_miss_registers_size(self, pool):
+        """测试未命中时回退到直接生成并开始预取"""
+        xy, _ = pool.generate((0, 0), (100, 0), N=33)
+        assert xy.shape == (33, 2)
+        assert pool.stats()["misses"] == 1
+        assert 33 in pool.stats()["available"]
+
+    def test_ring_is_bounded(self, pool):
+        """测试队列深度有上限"""
+        pool.fill(40)
+        pool.fill(40)
+        assert pool.stats()["available"][40] == 8
+        for _ in range(20):
+            pool.generate((0, 0), (100, 100), N=40)
+        assert pool.hits + pool.misses == 20
+
+    def test_seed_bypasses_pool(self, pool, model):
+        """测试给定种子时结果与直接生成一致"""
+        pool.fill(60)
+        xy, dt = pool.generate((0, 0), (300, 100), N=60, seed=11)
+        ref_xy, ref_dt = model.generate((0, 0), (300, 100), N=60, seed=11)
+        np.testing.assert_array_equal(xy, ref_xy)
+        np.testing.assert_array_equal(dt, ref_dt)
+        assert pool.hits == 0 and pool.misses == 0
+
+    def test_thread_error_is_reraised(self, pool, monkeypatch):
+        """测试后台线程出错后在取用与统计时重新抛出"""
+        def broken(N, count):
+            raise MemoryError("boom")
+
+        monkeypatch.setattr(pool, "_sample", broken)
+        pool.register(30)
+        pool._thread.join(timeout=5)
+        assert not pool._thread.is_alive()
+        with pytest.raises(RuntimeError) as excinfo:
+            pool.generate((0, 0), (100, 0), N=30)
+        assert isinstance(excinfo.value.__cause__, MemoryError)
+        with pytest.raises(RuntimeError):
+            pool.stats()
+
+
+def test_controller_uses_pool():
+    """测试控制器无种子移动走预取池"""
+    controller = HumanMouseController(num_points=25, speed_factor=100.0, prefetch_depth=4,
+                                      backend=NullBackend())
+    try:
+        controller.preload()
+        controller.prefetch_pool.fill(25)
+        controller.move((0, 0), (200, 100))
+        controller.move((0, 0), (200, 100), seed=1)
+        assert controller.prefetch_pool.hits == 1
+        assert controller.prefetch_pool.misses == 0
+    finally:
+        controller.close()
+
+
+def test_seeded_controller_skips_pool():
+    """测试给定控制器种子时不用预取池，输出可复现"""
+    def record(prefetch_depth):
+        controller = HumanMouseController(num_points=25, speed_factor=100.0, seed=3,
+                                          prefetch_depth=prefetch_depth, backend=NullBackend())
+        try:
+            controller.preload()
+            assert controller.prefetch_pool is None
+            return [controller._generate_trajectory((0, 0), (200, 100))[0] for _ in range(3)]
+        finally:
+            controller.close()
+
+    for got, ref in zip(record(4), record(0)):
+        np.testing.assert_array_equal(got, ref)
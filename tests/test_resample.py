@@ -0,0 +1,70 @@
+"""
+测试按轮询率重新定时
+Test polling-rate re-timing
+"""
+import numpy as np
+import pytest
+
+from humanmouse.controllers.backends import RecordingBackend
+from humanmouse.controllers.mouse_controller import HumanMouseController
+from humanmouse.controllers.playback import PlaybackScheduler
+from humanmouse.models.resample import resample_batch, resample_to_rate
+
+
+class TestResampleToRate:
+    """测试resample_to_rate函数"""
+
+    def test_uniform_clock(self, model):
+        """测试均匀时钟、时长与首尾点不变"""
+        xy, dt = model.generate((0, 0), (600, 400), N=100, seed=1)
+        out, out_dt = resample_to_rate(xy, dt, 500)
+        assert out.dtype == np.float32 and out_dt.dtype == np.float64
+        assert len(out) == int(np.floor(dt.sum() * 500)) + 2
+        assert out_dt[0] == 0.0
+        np.testing.assert_allclose(out_dt[1:-1], 1 / 500)
+        assert out_dt.sum() == pytest.approx(dt.sum())
+        np.testing.assert_array_equal(out[[0, -1]], xy[[0, -1]])
+
+    def test_interpolates_at_cumulative_time(self):
+        """测试按累积时间线性插值"""
+        xy = np.array([[0.0, 0.0], [10.0, 0.0], [10.0, 30.0]])
+        dt = np.array([0.0, 0.01, 0.03])
+        out, out_dt = resample_to_rate(xy, dt, 100)
+        np.testing.assert_allclose(out, [[0, 0], [10, 0], [10, 10], [10, 20], [10, 30]], atol=1e-5)
+        np.testing.assert_allclose(out_dt, [0, 0.01, 0.01, 0.01, 0.01])
+
+    def test_count_scales_with_duration(self, model):
+        """测试点数随时长而非N变化"""
+        short = model.generate((0, 0), (40, 10), N=100, seed=2, rate_hz=125)[0]
+        long = model.generate((0, 0), (1800, 900), N=100, seed=2, rate_hz=125)[0]
+        assert len(short) < 100 < len(long)
+
+    def test_batch_matches_single(self, model):
+        """测试批量结果与逐条一致"""
+        rng = np.random.default_rng(0)
+        xy, dt = model.generate_many(rng.uniform(0, 1000, (20, 2)), rng.uniform(0, 1000, (20, 2)),
+                                     N=60, seeds=range(20))
+        out, out_dt, offsets = resample_batch(xy, dt, 1000)
+        assert offsets[0] == 0 and offsets[-1] == len(out)
+        for i in range(20):
+            single, single_dt = resample_to_rate(xy[i], dt[i], 1000)
+            np.testing.assert_array_equal(out[offsets[i]:offsets[i + 1]], single)
+            np.testing.assert_array_equal(out_dt[offsets[i]:offsets[i + 1]], single_dt)
+
+    def test_invalid_input(self):
+        """测试非法参数"""
+        with pytest.raises(ValueError):
+            resample_to_rate(np.zeros((3, 2)), np.zeros(3), 0)
+        with pytest.raises(ValueError):
+            resample_batch(np.zeros((3, 2)), np.zeros(3), 125)
+
+
+def test_controller_polling_rate():
+    """测试控制器按实际时间的轮询率回放"""
+    rec = RecordingBackend()
+    controller = HumanMouseController(jitter_amplitude=0.0, speed_factor=4.0, polling_rate=125,
+                                      backend=rec, scheduler=PlaybackScheduler(skip_when_behind=False))
+    controller.move((0, 0), (500, 300), seed=3)
+    report = controller.last_playback
+    assert report.points_total == int(np.floor(report.planned * 125 + 1e-9)) + 2
+    np.testing.assert_allclose(rec.moves()[1][-1], (500, 300), atol=1e-3)
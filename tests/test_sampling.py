@@ -0,0 +1,108 @@
+"""
+测试冻结的GMM采样器
+Test the frozen GMM sampler
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from humanmouse.models.sampling import FrozenGMM, trajectory_rng
+
+
+@pytest.fixture(scope="module")
+def frozen(model):
+    """由内置模型的形状GMM构建"""
+    return FrozenGMM.from_sklearn(model.gmm_shape)
+
+
+class TestFrozenGMM:
+    """测试FrozenGMM类"""
+
+    @pytest.mark.parametrize("n_samples", [1, 9])
+    def test_compat_matches_sklearn(self, model, frozen, n_samples):
+        """测试兼容模式与sklearn采样逐位一致"""
+        old = model.gmm_shape.random_state
+        model.gmm_shape.random_state = np.random.RandomState(123)
+        try:
+            expected = model.gmm_shape.sample(n_samples)[0]
+        finally:
+            model.gmm_shape.random_state = old
+        actual = frozen.sample_compat(n_samples, np.random.RandomState(123))
+        np.testing.assert_array_equal(actual, expected)
+
+    def test_alias_table_reproduces_weights(self, frozen):
+        """测试别名表的成分概率等于混合权重"""
+        n = frozen.n_components
+        probs = frozen._alias_prob / n
+        for i in range(n):
+            probs[frozen._alias_index[i]] += (1 - frozen._alias_prob[i]) / n
+        np.testing.assert_allclose(probs, frozen.weights, atol=1e-12)
+
+    def test_native_batch_matches_moments(self, frozen):
+        """测试原生模式样本矩"""
+        x = frozen.sample(200_000, np.random.default_rng(0))
+        assert x.shape == (200_000, frozen.n_features)
+        np.testing.assert_allclose(x.mean(axis=0), frozen.weights @ frozen.means, atol=5e-3)
+
+    def test_requires_covariances(self):
+        """测试缺少协方差时报错"""
+        with pytest.raises(ValueError):
+            FrozenGMM(np.ones(1), np.zeros((1, 2)))
+
+
+class TestRngModes:
+    """测试模型的随机流模式"""
+
+    def test_native_batch_matches_single(self, model):
+        """测试原生模式下批量与单条生成一致"""
+        xy, dt = model.generate_many([(0, 0)] * 4, [(300, 100)] * 4, N=50,
+                                     seeds=[1, 2, 3, 4], rng_mode="native")
+        for i, seed in enumerate([1, 2, 3, 4]):
+            xy_i, dt_i = model.generate((0, 0), (300, 100), N=50, seed=seed, rng_mode="native")
+            np.testing.assert_array_equal(xy[i], xy_i)
+            np.testing.assert_array_equal(dt[i], dt_i)
+
+    def test_invalid_mode(self, model):
+        """测试非法模式报错"""
+        with pytest.raises(ValueError):
+            model.generate((0, 0), (1, 1), seed=1, rng_mode="fast")
+
+
+class TestCounterStreams:
+    """测试按(base_seed, index)派生的计数器随机流"""
+
+    def test_stream_depends_only_on_key(self):
+        """测试随机流只取决于(base_seed, index)"""
+        a = trajectory_rng(7, 3).random(4)
+        np.testing.assert_array_equal(a, trajectory_rng(7, 3).random(4))
+        child = np.random.Generator(np.random.Philox(np.random.SeedSequence(7).spawn(4)[3]))
+        np.testing.assert_array_equal(a, child.random(4))
+        assert not np.array_equal(a, trajectory_rng(7, 4).random(4))
+        assert not np.array_equal(a, trajectory_rng(8, 3).random(4))
+
+    def test_batch_and_threads_match_single(self, model):
+        """测试批量、乱序与多线程生成的第i条轨迹一致"""
+        indices = [5, 0, 1_000_003, 2]
+        xy, dt = model.generate_many([(0, 0)] * 4, [(300, 100)] * 4, N=40,
+                                     base_seed=11, indices=indices)
+
+        def single(i):
+            return model.generate((0, 0), (300, 100), N=40, base_seed=11, index=i)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(single, reversed(indices)))[::-1]
+        for k, (xy_i, dt_i) in enumerate(results):
+            np.testing.assert_array_equal(xy[k], xy_i)
+            np.testing.assert_array_equal(dt[k], dt_i)
+
+    def test_default_indices(self, model):
+        """测试默认序号为0..M-1"""
+        xy, _ = model.generate_many([(0, 0)] * 3, [(200, 0)] * 3, N=30, base_seed=2)
+        xy_2, _ = model.generate((0, 0), (200, 0), N=30, base_seed=2, index=2)
+        np.testing.assert_array_equal(xy[2], xy_2)
+
+    def test_exclusive_with_seeds(self, model):
+        """测试seeds与base_seed互斥"""
+        with pytest.raises(ValueError):
+            model.generate_many([(0, 0)], [(1, 1)], seeds=[1], base_seed=1)
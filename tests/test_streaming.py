@@ -0,0 +1,89 @@
+"""
+测试外存流式训练
+Test out-of-core streaming training
+"""
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from humanmouse.models.dataset import build_dataset, load_dataset
+from humanmouse.models.features import extract_features
+from humanmouse.models.streaming import OnlineGMM, _chunks
+from humanmouse.models.trajectory_model import HumanMouseModel
+
+CSV_DIR = Path(__file__).resolve().parent.parent / "csv_data"
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    out = tmp_path_factory.mktemp("dataset")
+    build_dataset(CSV_DIR, out)
+    return out
+
+
+class TestOnlineGMM:
+    """测试逐步EM"""
+
+    def test_recovers_mixture(self):
+        """测试从偏离的初值恢复两个分量的均值与权重"""
+        rng = np.random.default_rng(0)
+        X = np.concatenate([rng.normal([-5, 0], 1, (6000, 2)), rng.normal([5, 2], 0.5, (2000, 2))])
+        gmm = OnlineGMM([0.5, 0.5], [[-3, 1], [3, 1]], np.stack([np.eye(2) * 4] * 2))
+        for _ in range(5):
+            for batch in np.array_split(rng.permutation(X), 40):
+                gmm.partial_fit(batch)
+        order = np.argsort(gmm.means[:, 0])
+        np.testing.assert_allclose(gmm.means[order], [[-5, 0], [5, 2]], atol=0.1)
+        np.testing.assert_allclose(gmm.weights[order], [0.75, 0.25], atol=0.02)
+        assert np.all(np.isfinite(gmm.score_samples(X)))
+
+    def test_chunks_merge_short_tail(self):
+        """测试过短的末块并入前一块"""
+        assert _chunks(10, 4, 3) == [(0, 4), (4, 10)]
+        assert _chunks(10, 4, 2) == [(0, 4), (4, 8), (8, 10)]
+        assert _chunks(3, 4, 5) == [(0, 3)]
+
+
+class TestFitStreaming:
+    """测试流式训练"""
+
+    def test_matches_batch_fit(self, dataset, tmp_path):
+        """测试流式训练可生成轨迹且似然接近批量训练"""
+        batch = HumanMouseModel(seed=0)
+        batch.fit(dataset)
+        streaming = HumanMouseModel(seed=0)
+        report = streaming.fit_streaming(dataset, chunk_size=100, batch_size=32,
+                                         n_epochs=3, scratch_dir=tmp_path)
+        assert report.loaded == len(load_dataset(dataset, names=False)[0])
+        assert list(tmp_path.iterdir()) == []
+
+        shapes, globals_ = extract_features(load_dataset(dataset)[0], batch.K)
+        def log_likelihood(model):
+            return model.gmm_shape.score(model.pca.transform(shapes)), model.gmm_global.score(globals_)
+
+        for got, ref in zip(log_likelihood(streaming), log_likelihood(batch)):
+            assert got > ref - 1.0
+
+        xy, dt = streaming.generate((0, 0), (400, 300), N=60, seed=1)
+        assert xy.shape == (60, 2) and np.all(np.isfinite(xy)) and np.all(dt[1:] > 0)
+
+    def test_short_tail_batches_are_merged(self, dataset, monkeypatch):
+        """测试不足半批的末批并入前一批"""
+        sizes = []
+        partial_fit = OnlineGMM.partial_fit
+
+        def record(self, X):
+            sizes.append(len(X))
+            return partial_fit(self, X)
+
+        monkeypatch.setattr(OnlineGMM, "partial_fit", record)
+        HumanMouseModel(seed=0).fit_streaming(dataset, chunk_size=100, batch_size=32, n_epochs=1)
+        assert min(sizes) >= 16 and max(sizes) < 48
+
+    def test_requires_dataset(self):
+        """测试CSV目录不能直接流式训练"""
+        with pytest.raises(ValueError):
+            HumanMouseModel().fit_streaming(CSV_DIR)
+        with pytest.raises(ValueError):
+            HumanMouseModel().fit_streaming(CSV_DIR, chunk_size=2)
@@ -0,0 +1,81 @@
+"""
+测试分阶段计时统计
+Test per-stage timing statistics
+"""
+import pytest
+
+from humanmouse.controllers.backends import NullBackend
+from humanmouse.controllers.mouse_controller import HumanMouseController
+from humanmouse.core import timing
+from humanmouse.core.timing import enable_stats, get_stats, reset_stats, stage, timed
+
+
+@pytest.fixture
+def stats():
+    """开启计时并在结束后恢复"""
+    previous = timing.stats_enabled()
+    reset_stats()
+    enable_stats(True)
+    yield
+    enable_stats(previous)
+    reset_stats()
+
+
+class TestTiming:
+    """测试计时工具"""
+
+    def test_disabled_records_nothing(self):
+        """测试关闭时不记录"""
+        previous = timing.stats_enabled()
+        enable_stats(False)
+        try:
+            reset_stats()
+            with stage("test.block"):
+                pass
+            assert timing.lap_start() == 0
+            assert get_stats() == {}
+        finally:
+            enable_stats(previous)
+
+    def test_stage_and_decorator(self, stats):
+        """测试with块与装饰器计时"""
+        @timed("test.func")
+        def func(x):
+            return x * 2
+
+        assert func(3) == 6
+        with stage("test.block"):
+            func(1)
+        result = get_stats("test.")
+        assert result["test.func"]["count"] == 2
+        assert result["test.block"]["count"] == 1
+        assert result["test.block"]["total"] >= result["test.block"]["min"] > 0
+
+    def test_histogram(self, stats):
+        """测试按2的幂分桶与分位数"""
+        for ns in (100, 100, 100, 5_000):
+            timing.record("test.hist", ns)
+        s = get_stats()["test.hist"]
+        assert s["histogram"] == {128e-9: 3, 8192e-9: 1}
+        assert s["p50"] == pytest.approx(128e-9)
+        assert s["p99"] == pytest.approx(5_000e-9)
+        assert s["mean"] == pytest.approx(1_325e-9)
+        assert s["min"] == pytest.approx(100e-9) and s["max"] == pytest.approx(5_000e-9)
+
+
+def test_generate_stages(stats, model):
+    """测试generate各阶段都有计数"""
+    for _ in range(3):
+        model.generate((0, 0), (300, 200), N=50, rate_hz=500)
+    counts = {name: s["count"] for name, s in get_stats("generate.").items()}
+    for name in ("sample", "shape", "timing", "rotate", "jitter", "resample"):
+        assert counts[f"generate.{name}"] == 3
+
+
+def test_controller_stages(stats):
+    """测试控制器生成与执行的计时"""
+    controller = HumanMouseController(num_points=10, speed_factor=100.0, backend=NullBackend())
+    controller.move((0, 0), (100, 100), seed=1)
+    result = get_stats("controller.")
+    assert result["controller.generate"]["count"] == 1
+    assert result["controller.execute"]["count"] == 1
@@ -0,0 +1,134 @@
+"""
+测试轨迹CSV的并行加载
+Test parallel trajectory CSV loading
+"""
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from humanmouse.models.trajectory_model import HumanMouseModel
+from humanmouse.models.traces import TraceSet, load_traces, parse_trace
+
+CSV_DIR = Path(__file__).resolve().parent.parent / "csv_data"
+
+
+def _csv(rows, header="x_coordinate,y_coordinate,time_interval_seconds"):
+    return (header + "\n" + "\n".join(",".join(map(str, r)) for r in rows) + "\n").encode()
+
+
+def _rows(n=12, dt=0.01):
+    return [(i, 2 * i, 0.0 if i == 0 else dt) for i in range(n)]
+
+
+class TestParseTrace:
+    """测试parse_trace函数"""
+
+    def test_basic(self):
+        """测试基本解析"""
+        xy, dt = parse_trace(_csv(_rows()))
+        assert xy.dtype == np.float32 and dt.dtype == np.float32
+        assert xy.shape == (12, 2) and xy[3].tolist() == [3, 6]
+        assert dt[0] == 0 and np.all(dt[1:] == np.float32(0.01))
+
+    def test_column_order_and_extra_columns(self):
+        """测试列顺序任意且允许多余列"""
+        rows = [(dt, 7, y, x) for x, y, dt in _rows()]
+        data = _csv(rows, "time_interval_seconds,extra,y_coordinate,x_coordinate").replace(b"\n", b"\r\n")
+        xy, dt = parse_trace(data)
+        assert xy[3].tolist() == [3, 6] and dt[0] == 0
+
+    def test_cumulative_time(self):
+        """测试首项非零的累积时间被差分"""
+        rows = [(i, i, 0.5 + 0.01 * i) for i in range(12)]
+        _, dt = parse_trace(_csv(rows))
+        assert dt[0] == 0
+        np.testing.assert_allclose(dt[1:], 0.01, atol=1e-6)
+
+    def test_quoted_numbers(self):
+        """测试带引号的数值（电子表格导出）"""
+        rows = [tuple(f'"{v}"' for v in row) for row in _rows()]
+        xy, dt = parse_trace(_csv(rows, '"x_coordinate","y_coordinate","time_interval_seconds"'))
+        assert xy[3].tolist() == [3, 6] and dt[0] == 0
+        assert np.all(dt[1:] == np.float32(0.01))
+
+    @pytest.mark.parametrize("header", ["x_coordinate,y_coordinate,time_interval_seconds",
+                                        "x_coordinate,y_coordinate,time_interval_seconds,"])
+    def test_trailing_comma(self, header):
+        """测试忽略行尾的空字段"""
+        rows = [(*row, "") for row in _rows()]
+        xy, dt = parse_trace(_csv(rows, header).replace(b"\n", b"\r\n"))
+        assert xy.shape == (12, 2) and xy[3].tolist() == [3, 6]
+        assert dt[0] == 0 and np.all(dt[1:] == np.float32(0.01))
+
+    @pytest.mark.parametrize("data, reason", [
+        (_csv(_rows(), "x,y,t"), "missing required columns"),
+        (_csv(_rows(5)), "insufficient data points"),
+        (_csv(_rows()).replace(b"5,10,0.01", b"5,10"), "mismatched column lengths"),
+        (_csv(_rows()).replace(b"5,10", b"5,abc"), "unparsable value"),
+        (_csv(_rows(dt=0.0)), "non-positive time intervals"),
+    ])
+    def test_invalid(self, data, reason):
+        """测试各类非法内容的原因"""
+        with pytest.raises(ValueError, match=reason):
+            parse_trace(data)
+
+
+class TestLoadTraces:
+    """测试load_traces函数"""
+
+    def test_matches_pandas(self):
+        """测试与pandas逐个读取的结果一致"""
+        traces, report = load_traces(CSV_DIR)
+        assert report.files == len(list(CSV_DIR.glob("*.csv")))
+        assert report.loaded == len(traces) and report.loaded + len(report.skipped) == report.files
+        for i in range(0, len(traces), 37):
+            df = pd.read_csv(CSV_DIR / traces.names[i])
+            xy, dt = traces[i]
+            np.testing.assert_array_equal(xy, df[["x_coordinate", "y_coordinate"]].values.astype("float32"))
+            np.testing.assert_array_equal(dt[1:], df["time_interval_seconds"].values[1:].astype("float32"))
+
+    def test_report_and_jobs(self, tmp_path):
+        """测试报告记录跳过原因且多进程结果一致"""
+        for i in range(6):
+            (tmp_path / f"ok{i}.csv").write_bytes(_csv(_rows(10 + i)))
+        (tmp_path / "short.csv").write_bytes(_csv(_rows(3)))
+        traces, report = load_traces(tmp_path)
+        assert report.skipped == [("short.csv", "insufficient data points")]
+        assert traces.lengths().tolist() == [10, 11, 12, 13, 14, 15]
+        assert traces.offsets[-1] == len(traces.xy) == len(traces.dt)
+
+        parallel, _ = load_traces(tmp_path, jobs=2)
+        np.testing.assert_array_equal(parallel.xy, traces.xy)
+        np.testing.assert_array_equal(parallel.offsets, traces.offsets)
+        assert parallel.names == traces.names
+
+    def test_empty_directory(self, tmp_path):
+        """测试空目录"""
+        with pytest.raises(ValueError):
+            load_traces(tmp_path)
+
+
+def test_split_round_trip():
+    """测试拆分与from_lists互逆"""
+    xy_list = [np.ones((n, 2), "float32") * n for n in (3, 1, 4)]
+    dt_list = [np.arange(n, dtype="float32") for n in (3, 1, 4)]
+    traces = TraceSet.from_lists(xy_list, dt_list)
+    xs, ds = traces.split()
+    assert [len(x) for x in xs] == [3, 1, 4]
+    assert all(np.array_equal(a, b) for a, b in zip(xs + ds, xy_list + dt_list))
+
+
+def test_fit_returns_report(tmp_path):
+    """测试fit返回加载报告"""
+    traces, _ = load_traces(CSV_DIR)
+    for name in traces.names[:40]:
+        shutil.copy(CSV_DIR / name, tmp_path)
+    (tmp_path / "broken.csv").write_bytes(b"x_coordinate\n1\n")
+    model = HumanMouseModel(n_mix_shape=2, n_mix_global=2)
+    report = model.fit(tmp_path)
+    assert report.loaded == 40 and report.skipped == [("broken.csv", "missing required columns")]
+    xy, _ = model.generate((0, 0), (100, 100), N=20, seed=1)
+    assert xy.shape == (20, 2)
@@ -0,0 +1,212 @@
+"""
+测试轨迹生成模型
+Test the trajectory generation model
+"""
+import threading
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from humanmouse.controllers.backends import RecordingBackend
+from humanmouse.controllers.playback import PlaybackScheduler
+from humanmouse.models.trajectory_model import _cubic_spline_basis
+
+
+class TestGenerate:
+    """测试单条生成"""
+
+    def test_shapes_and_endpoints(self, model):
+        """测试输出形状与起终点"""
+        xy, dt = model.generate((100, 100), (800, 600), N=80, amp_jitter_px=0.0, seed=3)
+        assert xy.shape == (80, 2) and xy.dtype == np.float32
+        assert dt.shape == (80,) and dt[0] == 0
+        np.testing.assert_allclose(xy[0], (100, 100), atol=1e-3)
+        np.testing.assert_allclose(xy[-1], (800, 600), atol=1e-2)
+
+    def test_matches_stored_baseline(self, model):
+        """测试有种子的结果与批量生成引入前的单条实现一致（坐标仅差float32舍入）"""
+        baseline_xy = np.array([[10.0, 20.0], [9.770322, 29.937101], [30.772757, 49.241043],
+                                [86.86569, 74.21967], [169.68604, 115.61291], [273.1077, 167.35593],
+                                [385.52927, 217.59753], [493.63577, 261.1719], [578.4383, 296.7369],
+                                [623.4298, 338.9146], [634.8435, 376.044], [638.73254, 380.2713]],
+                               dtype=np.float32)
+        baseline_dt = np.array([0.0, 0.0034077188948455385, 0.02510584685707013, 0.05582940658260861,
+                                0.08519296680607114, 0.10577837346802818, 0.11313471354207293,
+                                0.10577837346802818, 0.08519296680607114, 0.05582940658260861,
+                                0.02510584685707013, 0.0034077188948455385])
+        xy, dt = model.generate((10, 20), (640, 380), N=12, amp_jitter_px=1.0, seed=7)
+        np.testing.assert_allclose(xy, baseline_xy, rtol=0, atol=1e-4)
+        np.testing.assert_array_equal(dt, baseline_dt)
+
+    def test_seed_is_reproducible(self, model):
+        """测试相同种子生成相同轨迹"""
+        a = model.generate((0, 0), (300, 200), seed=11)
+        b = model.generate((0, 0), (300, 200), seed=11)
+        np.testing.assert_array_equal(a[0], b[0])
+        np.testing.assert_array_equal(a[1], b[1])
+
+
+class TestGenerateMany:
+    """测试批量生成"""
+
+    def test_matches_single_path(self, model):
+        """测试批量结果与单条生成逐位一致"""
+        rng = np.random.default_rng(0)
+        starts = rng.uniform(0, 1200, (25, 2))
+        ends = rng.uniform(0, 1200, (25, 2))
+        seeds = list(range(100, 125))
+        xy, dt = model.generate_many(starts, ends, N=60, amp_jitter_px=0.5, seeds=seeds)
+        assert xy.shape == (25, 60, 2) and dt.shape == (25, 60)
+        for i, seed in enumerate(seeds):
+            xy_i, dt_i = model.generate(starts[i], ends[i], N=60, amp_jitter_px=0.5, seed=seed)
+            np.testing.assert_array_equal(xy[i], xy_i)
+            np.testing.assert_array_equal(dt[i], dt_i)
+
+    def test_unseeded_batch(self, model):
+        """测试无种子批量生成"""
+        xy, dt = model.generate_many([(0, 0)] * 10, [(500, 0)] * 10, N=40, amp_jitter_px=0.0)
+        assert np.isfinite(xy).all() and np.all(dt[:, 1:] > 0)
+        np.testing.assert_allclose(xy[:, -1], [(500, 0)] * 10, atol=1e-2)
+
+    def test_mismatched_inputs(self, model):
+        """测试输入长度不一致时报错"""
+        with pytest.raises(ValueError):
+            model.generate_many([(0, 0)], [(1, 1), (2, 2)])
+        with pytest.raises(ValueError):
+            model.generate_many([(0, 0)], [(1, 1)], seeds=[1, 2])
+
+
+class TestGenerateInto:
+    """测试写入调用方缓冲的生成"""
+
+    def test_matches_generate_many(self, model):
+        """测试形状与时间和计数器随机流的批量生成一致"""
+        out_xy = np.empty((70, 2), np.float32)
+        out_dt = np.empty(70, np.float32)
+        model.generate_into((10, 20), (610, 420), out_xy, out_dt, amp_jitter_px=0.0,
+                            base_seed=5, index=2)
+        xy, dt = model.generate_many([(10, 20)], [(610, 420)], N=70, amp_jitter_px=0.0,
+                                     base_seed=5, indices=[2])
+        assert out_xy.dtype == np.float32 and out_dt.dtype == np.float32
+        np.testing.assert_allclose(out_xy, xy[0], atol=1e-3)
+        np.testing.assert_allclose(out_dt, dt[0], rtol=1e-5, atol=1e-9)
+        assert out_dt[0] == 0
+
+    def test_rejects_non_float32(self, model):
+        """测试拒绝非float32缓冲"""
+        with pytest.raises(ValueError):
+            model.generate_into((0, 0), (1, 1), np.empty((10, 2), np.float32), np.empty(10))
+        with pytest.raises(ValueError):
+            model.generate_into((0, 0), (1, 1), np.empty((10, 2), np.float32), np.empty(9, np.float32))
+
+    def test_no_allocation_after_warmup(self, model):
+        """测试预热后每次调用几乎不分配内存"""
+        out_xy = np.empty((100, 2), np.float32)
+        out_dt = np.empty(100, np.float32)
+        for _ in range(3):
+            model.generate_into((0, 0), (300, 200), out_xy, out_dt)
+
+        tracemalloc.start()
+        try:
+            for _ in range(500):
+                model.generate_into((0, 0), (500, 300), out_xy, out_dt)
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert current < 2048 and peak < 16384
+
+    def test_threads_use_own_scratch(self, model):
+        """测试多线程并发写入各自缓冲，结果与单线程一致"""
+        expected = []
+        for i in range(4):
+            out = (np.empty((50, 2), np.float32), np.empty(50, np.float32))
+            expected.append(model.generate_into((0, 0), (400, 100), *out, base_seed=9, index=i))
+
+        results = [None] * 4
+
+        def worker(i):
+            out_xy, out_dt = np.empty((50, 2), np.float32), np.empty(50, np.float32)
+            for _ in range(50):
+                model.generate_into((0, 0), (400, 100), out_xy, out_dt, base_seed=9, index=i)
+            results[i] = (out_xy, out_dt)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        for (xy, dt), (ref_xy, ref_dt) in zip(results, expected):
+            np.testing.assert_array_equal(xy, ref_xy)
+            np.testing.assert_array_equal(dt, ref_dt)
+
+
+class TestGenerateStream:
+    """测试逐块惰性生成"""
+
+    def test_chunks_match_generate_into(self, model):
+        """测试拼接后的块与generate_into一致"""
+        out_xy = np.empty((60, 2), np.float32)
+        out_dt = np.empty(60, np.float32)
+        model.generate_into((5, 5), (405, 305), out_xy, out_dt, base_seed=8, index=4)
+        chunks = list(model.generate_stream((5, 5), (405, 305), N=60, chunk_size=7,
+                                            base_seed=8, index=4))
+        assert [len(xy) for xy, _ in chunks] == [7] * 8 + [4]
+        np.testing.assert_allclose(np.concatenate([xy for xy, _ in chunks]), out_xy, atol=1e-4)
+        np.testing.assert_allclose(np.concatenate([dt for _, dt in chunks]), out_dt, rtol=1e-6)
+        assert chunks[0][1][0] == 0
+
+    def test_plays_through_scheduler(self, model):
+        """测试直接交给调度器回放"""
+        rec = RecordingBackend()
+        stream = model.generate_stream((0, 0), (300, 100), N=40, amp_jitter_px=0.0)
+        report = PlaybackScheduler(skip_when_behind=False).play_stream(stream, rec.move_to, speed_factor=50.0)
+        assert report.points_total == 40 and report.points_emitted == 40
+        np.testing.assert_allclose(rec.position(), (300, 100), atol=1e-2)
+
+    def test_invalid_chunk_size(self, model):
+        """测试非法块大小"""
+        with pytest.raises(ValueError):
+            next(model.generate_stream((0, 0), (1, 1), chunk_size=0))
+
+
+class TestShapeOperator:
+    """测试融合形状算子"""
+
+    def test_basis_matches_scipy(self):
+        """测试样条基矩阵与 scipy CubicSpline 一致"""
+        interpolate = pytest.importorskip("scipy.interpolate")
+        x = np.sort(np.random.default_rng(1).uniform(0, 1, 12))
+        x_eval = np.linspace(x[0], x[-1], 50)
+        basis = _cubic_spline_basis(x, x_eval)
+        expected = interpolate.CubicSpline(x, np.eye(len(x)))(x_eval).T
+        np.testing.assert_allclose(basis, expected, atol=1e-10)
+
+    def test_matches_spline_path(self, model):
+        """测试融合算子与逐次样条插值结果一致"""
+        interpolate = pytest.importorskip("scipy.interpolate")
+        coeff = model.gmm_shape.means_[2].astype("float32")
+        xs_k = model._min_jerk_position(np.linspace(0, 1, model.K, dtype="float32"))
+        ys_k = coeff @ model.pca.components_ + model.pca.mean_
+        xs_N = model._min_jerk_position(np.linspace(0, 1, 90, dtype="float32"))
+        expected = interpolate.CubicSpline(xs_k.astype("float64"), ys_k)(xs_N)
+        traj = model._normalized_shapes(coeff[None, :], 90)[0]
+        np.testing.assert_allclose(traj[:, 1], expected, atol=1e-6)
+
+    def test_operator_is_memoized(self, model):
+        """测试算子按 N 缓存并受 LRU 容量限制"""
+        assert model._shape_operator(77) is model._shape_operator(77)
+        for n in range(10, 10 + model.OPERATOR_CACHE_SIZE + 2):
+            model._shape_operator(n)
+        assert len(model._operator_cache) == model.OPERATOR_CACHE_SIZE
+
+    def test_save_skips_operator_cache(self, model, tmp_path):
+        """测试保存模型时不写入算子缓存"""
+        from humanmouse.models.trajectory_model import HumanMouseModel
+
+        model._shape_operator(50)
+        model.save(tmp_path / "model.pkl")
+        loaded = HumanMouseModel.load(tmp_path / "model.pkl")
+        assert len(loaded._operator_cache) == 0
+        np.testing.assert_array_equal(loaded.generate((0, 0), (100, 50), N=50, seed=1)[0],
+                                      model.generate((0, 0), (100, 50), N=50, seed=1)[0])